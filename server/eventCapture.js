@@ -0,0 +1,42 @@
+const fs = require('fs');
+const path = require('path');
+
+// Appends ingested events to a JSONL file for later replay (see test/utils/replay_events.py).
+// Lines are buffered in memory and written in one chunk per flush instead of one write per event.
+class EventCapture {
+  constructor(filePath, { flushIntervalMs = 200, maxBufferedBytes = 1 << 20 } = {}) {
+    fs.mkdirSync(path.dirname(path.resolve(filePath)), { recursive: true });
+    this.stream = fs.createWriteStream(filePath, { flags: 'a' });
+    this.maxBufferedBytes = maxBufferedBytes;
+    this.lines = [];
+    this.bufferedBytes = 0;
+    this.timer = setInterval(() => this.flush(), flushIntervalMs);
+    this.timer.unref();
+  }
+
+  append(record) {
+    const line = JSON.stringify(record) + '\n';
+    this.lines.push(line);
+    this.bufferedBytes += line.length;
+    if (this.bufferedBytes >= this.maxBufferedBytes) {
+      this.flush();
+    }
+  }
+
+  flush() {
+    if (!this.lines.length) {
+      return;
+    }
+    this.stream.write(this.lines.join(''));
+    this.lines = [];
+    this.bufferedBytes = 0;
+  }
+
+  close(callback) {
+    clearInterval(this.timer);
+    this.flush();
+    this.stream.end(callback);
+  }
+}
+
+module.exports = { EventCapture };
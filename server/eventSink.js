@@ -0,0 +1,73 @@
+// Bounded in-memory store of ingested events, queried by tests through GET /api/events.
+// Every event gets a monotonically increasing sequence number that doubles as the query cursor.
+const matches = (record, { userId, type }) =>
+  (userId === undefined || record.userId === userId) && (type === undefined || record.type === type);
+
+class EventSink {
+  constructor(capacity) {
+    this.capacity = capacity;
+    this.buffer = new Array(capacity);
+    this.nextSeq = 1;
+    this.waiters = new Set();
+  }
+
+  get oldestSeq() {
+    return Math.max(1, this.nextSeq - this.capacity);
+  }
+
+  get cursor() {
+    return this.nextSeq - 1;
+  }
+
+  push(event) {
+    const seq = this.nextSeq++;
+    const record = { ...event, seq, receivedAt: new Date().toISOString() };
+    this.buffer[seq % this.capacity] = record;
+    for (const waiter of this.waiters) {
+      waiter(record);
+    }
+    return record;
+  }
+
+  // Events newer than `since` matching the filters, oldest first
+  query({ userId, type, since = 0, limit = Infinity }) {
+    const events = [];
+    for (let seq = Math.max(since + 1, this.oldestSeq); seq < this.nextSeq && events.length < limit; seq++) {
+      const record = this.buffer[seq % this.capacity];
+      if (matches(record, { userId, type })) {
+        events.push(record);
+      }
+    }
+    return {
+      events,
+      // Resume from the last returned event when the limit cut the page short, otherwise from the newest event
+      cursor: events.length && events.length >= limit ? events[events.length - 1].seq : this.cursor,
+      // Older events than requested were already evicted from the ring
+      truncated: since + 1 < this.oldestSeq
+    };
+  }
+
+  // Resolves with the query result as soon as it is non-empty, or with an empty result after `waitMs`
+  waitFor(filters, waitMs) {
+    const result = this.query(filters);
+    if (result.events.length || waitMs <= 0) {
+      return Promise.resolve(result);
+    }
+    return new Promise((resolve) => {
+      const done = () => {
+        clearTimeout(timer);
+        this.waiters.delete(check);
+        resolve(this.query(filters));
+      };
+      const check = (record) => {
+        if (matches(record, filters)) {
+          done();
+        }
+      };
+      const timer = setTimeout(done, waitMs);
+      this.waiters.add(check);
+    });
+  }
+}
+
+module.exports = { EventSink };
@@ -1,18 +1,116 @@
 const express = require('express');
 const bodyParser = require('body-parser');
 const path = require('path');
+const { EventSink } = require('./eventSink');
+const { EventCapture } = require('./eventCapture');
 
 const app = express();
 app.use(bodyParser.json());
 
 app.use(express.static(path.join(__dirname, '../client')));
 
+const sink = new EventSink(Number(process.env.EVENT_BUFFER_SIZE) || 10000);
+const MAX_WAIT_MS = 30000;
+const MAX_BATCH_SIZE = 100;
+// Set EVENT_CAPTURE_PATH to record every ingested event as JSONL for replay
+const capture = process.env.EVENT_CAPTURE_PATH ? new EventCapture(process.env.EVENT_CAPTURE_PATH) : null;
+
+const ingest = (event) => {
+  const record = sink.push(event);
+  if (capture) {
+    capture.append(record);
+  }
+  return record;
+};
+
+const REQUIRED_FIELDS = ['userId', 'type', 'videoTime', 'timestamp'];
+
+// Returns an error message for an invalid event, or null when it is valid
+const validateEvent = (event) => {
+  if (!event || typeof event !== 'object' || Array.isArray(event)) {
+    return 'Event must be a JSON object';
+  }
+  const missing = REQUIRED_FIELDS.filter((field) => !(field in event));
+  if (missing.length) {
+    return `Missing required fields: ${missing.join(', ')}`;
+  }
+  for (const field of ['userId', 'type', 'timestamp']) {
+    if (typeof event[field] !== 'string' || !event[field]) {
+      return `'${field}' must be a non-empty string`;
+    }
+  }
+  if (typeof event.videoTime !== 'number' || !Number.isFinite(event.videoTime) || event.videoTime < 0) {
+    return '\'videoTime\' must be a non-negative number';
+  }
+  if (Number.isNaN(Date.parse(event.timestamp))) {
+    return '\'timestamp\' must be an ISO-8601 date';
+  }
+  return null;
+};
+
 app.post('/api/event', (req, res) => {
+  const error = validateEvent(req.body);
+  if (error) {
+    return res.status(400).send({ error });
+  }
   console.log('📩 Event received:', req.body);
-  res.status(200).send({ ok: true });
+  const { seq } = ingest(req.body);
+  res.status(200).send({ ok: true, seq });
+});
+
+// Bulk ingest used by the client transport: { events: [...] }, the batch is accepted or rejected as a whole
+app.post('/api/events', (req, res) => {
+  const events = req.body && req.body.events;
+  if (!Array.isArray(events) || !events.length) {
+    return res.status(400).send({ error: '\'events\' must be a non-empty array' });
+  }
+  if (events.length > MAX_BATCH_SIZE) {
+    return res.status(413).send({ error: `At most ${MAX_BATCH_SIZE} events per batch` });
+  }
+  const errors = events
+    .map((event, index) => ({ index, error: validateEvent(event) }))
+    .filter(({ error }) => error);
+  if (errors.length) {
+    return res.status(400).send({ error: 'Invalid events in batch', errors });
+  }
+  console.log(`📦 Batch of ${events.length} events received`);
+  const seqs = events.map((event) => ingest(event).seq);
+  res.status(200).send({ ok: true, accepted: events.length, seqs });
+});
+
+// Query ingested events: ?userId=&type=&since=<cursor>&limit=&wait=<ms to long-poll while nothing matches>
+app.get('/api/events', async (req, res) => {
+  const { userId, type } = req.query;
+  const since = Number(req.query.since || 0);
+  const limit = req.query.limit === undefined ? Infinity : Number(req.query.limit);
+  const wait = Math.min(Number(req.query.wait || 0), MAX_WAIT_MS);
+  if (![since, limit, wait].every((value) => value >= 0)) {
+    return res.status(400).send({ error: '\'since\', \'limit\' and \'wait\' must be non-negative numbers' });
+  }
+  res.status(200).send(await sink.waitFor({ userId, type, since, limit }, wait));
+});
+
+// body-parser rejects malformed JSON with a SyntaxError, answer it as JSON like the other errors
+// eslint-disable-next-line no-unused-vars
+app.use((err, req, res, next) => {
+  const status = err.status || 500;
+  res.status(status).send({ error: status === 400 ? `Malformed JSON: ${err.message}` : 'Internal server error' });
 });
 
 const PORT = process.env.PORT || 3000;
 app.listen(PORT, () => {
   console.log(`📺 Server is running at http://localhost:${PORT}`);
+  if (capture) {
+    console.log(`🎙️ Capturing events to ${process.env.EVENT_CAPTURE_PATH}`);
+  }
 });
+
+// Flush buffered captured events before exiting
+for (const signal of ['SIGINT', 'SIGTERM']) {
+  process.on(signal, () => {
+    if (!capture) {
+      process.exit(0);
+    }
+    capture.close(() => process.exit(0));
+  });
+}
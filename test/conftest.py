@@ -1,53 +1,215 @@
 import os
-import time
-import subprocess
+import re
+import uuid
 import pytest
-import requests
-from datetime import datetime
 from playwright.sync_api import sync_playwright
+from pages.video_page import VideoPage
+from utils.browser_pool import BrowserPool, ConnectedBrowserPool, LocalBrowserPools, parse_browser_names
+from utils.browser_server import BrowserServerGroup, BrowserServerPool
+from utils.duration_history import DEFAULT_HISTORY_PATH, DurationEstimates
+from utils.media_route import MediaCache
+from utils.docker_server import DockerComposeServer
+from utils.server_readiness import SharedServer
+from utils.stub_server import StubEventServer
+from utils.phase_timing import PhaseTimingPlugin, instrument, instrument_steps
+from utils.sharding import assign_shards, parse_shard
+from utils.run_profiles import PROFILES, PROFILE_ENV_VAR, RunProfile, default_profile_name, get_profile
 import logging
 
 logger = logging.getLogger(__name__)
+DOCKER_SERVER_URL = "http://localhost:3000"
+DOCKER_START_TIMEOUT = 120  # seconds, includes the image build
+BROWSER_SERVER_START_TIMEOUT = 60  # seconds
+# Seconds a test waits for a free context on the browser servers
+CONTEXT_SLOT_TIMEOUT = float(os.environ.get("CONTEXT_SLOT_TIMEOUT", 300))
+TIMED_FIXTURES = ("start_server", "browser_pool", "shared_pages", "media_cache", "page")
 
 
-def wait_for_server(url, timeout=30):
-    start = datetime.now()
-    for i in range(timeout):
-        try:
-            r = requests.get(url)
-            if r.status_code == 200:
-                elapsed = (datetime.now() - start).total_seconds()
-                logger.info(f"✅ Server is up after {elapsed:.2f} seconds (attempt {i + 1})")
-                return True
-        except Exception:
-            time.sleep(1)
-    logger.error("❌ Server failed to start in time.")
-    return False
+def pytest_addoption(parser):
+    parser.addoption(
+        "--profile",
+        action="store",
+        default=default_profile_name(),
+        help=f"Run profile: {', '.join(PROFILES)} (default: ${PROFILE_ENV_VAR}, "
+             f"or 'ci' when CI=true, otherwise 'debug')",
+    )
+    parser.addoption(
+        "--remote-media",
+        action="store_true",
+        default=False,
+        help="Load the test video from its original URL instead of serving it from test/fixtures/media",
+    )
+    parser.addoption(
+        "--server",
+        action="store",
+        choices=("docker", "stub", "auto"),
+        default=os.environ.get("TEST_SERVER", "docker"),
+        help="Backend to test against: 'docker' runs docker compose, 'stub' an in-process Python stand-in, "
+             "'auto' uses the stub when no collected test needs a browser (default: $TEST_SERVER or 'docker')",
+    )
+    parser.addoption(
+        "--reuse-server",
+        action="store_true",
+        default=os.environ.get("REUSE_SERVER", "false").lower() == "true",
+        help="Attach to an already running server, rebuild the image only when server/ or client/ changed "
+             "and leave the container running after the session (default: $REUSE_SERVER)",
+    )
+    parser.addoption(
+        "--schedule-by-duration",
+        action="store_true",
+        default=os.environ.get("SCHEDULE_BY_DURATION", "false").lower() == "true",
+        help="With -n, hand out the historically longest tests first instead of in collection order "
+             "(default: $SCHEDULE_BY_DURATION)",
+    )
+    parser.addoption(
+        "--duration-history",
+        action="store",
+        default=os.environ.get("DURATION_HISTORY", str(DEFAULT_HISTORY_PATH)),
+        help="Result store (.sqlite) or allure-results directory to read test durations from "
+             "(default: $DURATION_HISTORY or the analyzer's result store)",
+    )
+    parser.addoption(
+        "--shard",
+        action="store",
+        default=os.environ.get("TEST_SHARD"),
+        help="Run only shard i of n, e.g. 2/4; tests are split by historical duration (default: $TEST_SHARD)",
+    )
+    parser.addoption(
+        "--browsers",
+        action="store",
+        default=os.environ.get("BROWSERS", "firefox"),
+        help="Comma separated browsers to run the UI tests in, e.g. firefox,chromium,webkit "
+             "(default: $BROWSERS or 'firefox')",
+    )
+    parser.addoption(
+        "--browser-servers",
+        action="store",
+        type=int,
+        default=int(os.environ.get("BROWSER_SERVERS", "0")),
+        help="Start this many browser servers per browser, shared by all workers on the host, instead of "
+             "a browser per worker; 0 disables (default: $BROWSER_SERVERS or 0)",
+    )
+    parser.addoption(
+        "--contexts-per-server",
+        action="store",
+        type=int,
+        default=int(os.environ.get("CONTEXTS_PER_SERVER", "4")),
+        help="Maximum number of tests running on one browser server at a time (default: $CONTEXTS_PER_SERVER or 4)",
+    )
+    parser.addoption(
+        "--phase-timings",
+        action="store",
+        default=os.environ.get("PHASE_TIMINGS", "reports/phase-timings"),
+        help="Directory for the per-test phase timings, disable with -p no:phase_timing "
+             "(default: $PHASE_TIMINGS or reports/phase-timings)",
+    )
 
 
-@pytest.fixture(scope="session", autouse=True)
-def start_server(request):
-    if not os.environ.get("PYTEST_XDIST_WORKER", "gw0") == "gw0":
+def pytest_configure(config):
+    try:
+        config.run_profile = get_profile(config.getoption("--profile"))
+        shard = config.getoption("--shard")
+        config.shard = parse_shard(shard) if shard else None
+        config.browser_names = parse_browser_names(config.getoption("--browsers"))
+    except ValueError as e:
+        raise pytest.UsageError(str(e))
+
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER", "master")
+    plugin = PhaseTimingPlugin(config.getoption("--phase-timings"), worker_id, fixtures=TIMED_FIXTURES)
+    # register() returns None when the plugin is blocked with -p no:phase_timing
+    if config.pluginmanager.register(plugin, "phase_timing"):
+        instrument_steps(VideoPage)
+        instrument(VideoPage, "wait_for_state", "VideoPage.wait_for_state (wait_for_function)")
+        instrument(BrowserPool, "_launch", "browser launch")
+        instrument(ConnectedBrowserPool, "_launch", "browser connect")
+        instrument(BrowserServerGroup, "start", "browser servers start")
+        instrument(DockerComposeServer, "start", "docker compose start")
+        instrument(DockerComposeServer, "stop", "docker compose stop")
+        instrument(SharedServer, "acquire", "shared server acquire")
+        instrument(SharedServer, "release", "shared server release")
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    """
+    Keeps only this machine's share of the tests when --shard is given.
+    Runs last, so only the tests left after `-m`/`-k` deselection are split.
+    """
+    if not config.shard:
         return
+    index, count = config.shard
+    estimates = DurationEstimates.load(config.getoption("--duration-history"))
+    assignment = assign_shards([item.nodeid for item in items], count, estimates)
+    selected = [item for item in items if assignment[item.nodeid] == index]
+    deselected = [item for item in items if assignment[item.nodeid] != index]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+    expected = sum(estimates.estimate(item.nodeid) for item in selected)
+    logger.info(f"🧩 Shard {index}/{count}: {len(selected)} tests, about {expected:.0f}s expected")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    """Longest-first scheduling for the default --dist=load; returning None keeps xdist's own scheduler."""
+    if not config.getoption("--schedule-by-duration") or config.getoption("dist") != "load":
+        return None
+    from utils.duration_scheduler import DurationScheduling
+    estimates = DurationEstimates.load(config.getoption("--duration-history"))
+    logger.info(f"⏱️ Scheduling by duration with a history of {len(estimates)} tests")
+    return DurationScheduling(config, log, estimates)
+
+
+def pytest_generate_tests(metafunc):
+    """Runs every test that uses a browser (`page` or `browser_name`) once per browser when --browsers lists several."""
+    browser_names = metafunc.config.browser_names
+    if "browser_name" in metafunc.fixturenames and len(browser_names) > 1:
+        metafunc.parametrize("browser_name", browser_names)
+
+
+def shared_state_dir(tmp_path_factory, worker_id: str):
+    """Directory shared by all xdist workers of the run, for state they coordinate through."""
+    state_dir = tmp_path_factory.getbasetemp()
+    # xdist workers get sibling basetemp dirs, their common parent is shared by the whole run
+    if worker_id != "master":
+        state_dir = state_dir.parent
+    return state_dir
+
 
-    logger.info("🔧 Starting docker-compose...")
-    proc = subprocess.Popen(
-        ["docker", "compose", "up", "--build"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE
+def resolve_server_mode(session) -> str:
+    mode = session.config.getoption("--server")
+    if mode == "auto":
+        needs_browser = any("page" in getattr(item, "fixturenames", ()) for item in session.items)
+        mode = "docker" if needs_browser else "stub"
+    return mode
+
+
+@pytest.fixture(scope="session", autouse=True)
+def start_server(request, tmp_path_factory):
+    """Starts the backend for the session and returns its base URL."""
+    if resolve_server_mode(request.session) == "stub":
+        server = StubEventServer()
+        request.addfinalizer(server.stop)
+        return server.start()
+
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER", "master")
+    state_dir = shared_state_dir(tmp_path_factory, worker_id)
+    shared_server = SharedServer(state_dir, worker_id, DOCKER_SERVER_URL)
+    docker = DockerComposeServer(
+        DOCKER_SERVER_URL,
+        log_path=state_dir / "docker-compose.log",
+        start_timeout=DOCKER_START_TIMEOUT,
+        reuse=request.config.getoption("--reuse-server"),
     )
 
-    if not wait_for_server("http://localhost:3000"):
-        proc.terminate()
-        raise RuntimeError("❌ Server failed to start")
+    shared_server.acquire(docker.start)
+    request.addfinalizer(lambda: shared_server.release(docker.stop))
+    return DOCKER_SERVER_URL
 
-    def fin():
-        logger.info("🧹 Shutting down docker-compose...")
-        proc.terminate()
-        proc.wait()
-        logger.info("🛑 Server stopped.")
 
-    request.addfinalizer(fin)
+@pytest.fixture(scope="session")
+def server_url(start_server) -> str:
+    return start_server
 
 
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
@@ -57,24 +219,165 @@ def pytest_runtest_makereport(item, call):
     setattr(item, f"rep_{rep.when}", rep)
 
 
-@pytest.fixture(scope="function")
-def page(request):
+@pytest.fixture(scope="session")
+def run_profile(pytestconfig) -> RunProfile:
+    return pytestconfig.run_profile
+
+
+@pytest.fixture
+def perf_profile(run_profile):
+    """Skips tests that measure wall-clock time unless they run under --profile perf (no slow_mo, video or tracing)."""
+    if run_profile.name != "perf":
+        pytest.skip(f"measurements are only meaningful with --profile perf, not '{run_profile.name}'")
+
+
+@pytest.fixture(scope="session")
+def browser_pool(pytestconfig, run_profile, tmp_path_factory):
+    """
+    One browser per browser name and xdist worker, shared by every test that runs on it.
+    With --browser-servers the browsers run as servers shared by all workers on the host instead.
+    """
+    servers_per_browser = pytestconfig.getoption("--browser-servers")
     with sync_playwright() as p:
-        # If you want to run local
-        browser = p.firefox.launch(headless=False, slow_mo=500)
-        #headless_mode = os.environ.get("CI", "false").lower() == "true"
-        #browser = p.firefox.launch(headless=headless_mode, slow_mo=0)
-        context = browser.new_context(record_video_dir="videos/")
-        page = context.new_page()
-        yield page
-
-        video = page.video
-        video_path = video.path() if video else None
-        context.close()
-        browser.close()
-
-        rep_call = getattr(request.node, "rep_call", None)
-        if rep_call and rep_call.passed and video_path and os.path.exists(video_path):
-            os.remove(video_path)
-        elif rep_call and rep_call.failed and video_path:
-            logger.info(f"❗ Test failed. Video saved at: {video_path}")
\ No newline at end of file
+        if not servers_per_browser:
+            pool = LocalBrowserPools(p, **run_profile.launch_options())
+            yield pool
+            pool.close()
+            return
+
+        worker_id = os.environ.get("PYTEST_XDIST_WORKER", "master")
+        state_dir = shared_state_dir(tmp_path_factory, worker_id)
+        # slow_mo is a client side option, it is applied when connecting
+        launch_options = run_profile.launch_options()
+        slow_mo = launch_options.pop("slow_mo", 0)
+        group = BrowserServerGroup(pytestconfig.browser_names, servers_per_browser,
+                                   state_dir / "browser-servers", **launch_options)
+        shared_servers = SharedServer(state_dir, worker_id, None, start_timeout=BROWSER_SERVER_START_TIMEOUT,
+                                      name="browser-servers")
+        endpoints = shared_servers.acquire(group.start)
+        pool = BrowserServerPool(p, endpoints, state_dir / "context-slots",
+                                 pytestconfig.getoption("--contexts-per-server"),
+                                 slot_timeout=CONTEXT_SLOT_TIMEOUT, slow_mo=slow_mo)
+        try:
+            yield pool
+        finally:
+            pool.close()
+            shared_servers.release(group.stop)
+
+
+@pytest.fixture(scope="session")
+def browser_name(pytestconfig) -> str:
+    """Browser the UI tests run in, parametrized per test when --browsers lists several."""
+    return pytestconfig.browser_names[0]
+
+
+@pytest.fixture(scope="session")
+def media_cache(pytestconfig):
+    """Media bytes are read from disk once per worker and served to every test from memory."""
+    if pytestconfig.getoption("--remote-media"):
+        return None
+    return MediaCache()
+
+
+def new_test_context(browser_pool, browser_name, run_profile, media_cache, server_url, **context_options):
+    context = browser_pool.new_context(browser_name, base_url=server_url, **context_options)
+    return prepare_test_context(context, run_profile, media_cache)
+
+
+def prepare_test_context(context, run_profile, media_cache):
+    if media_cache is not None:
+        media_cache.install(context)
+    context.set_default_timeout(run_profile.default_timeout)
+    context.set_default_navigation_timeout(run_profile.navigation_timeout)
+    if run_profile.tracing:
+        context.tracing.start(screenshots=True, snapshots=True, sources=True)
+    return context
+
+
+def trace_path_for(item) -> str:
+    return os.path.join("traces", re.sub(r"[^\w.-]", "_", item.name) + ".zip")
+
+
+@pytest.fixture(scope="session")
+def shared_pages(browser_pool, run_profile, media_cache, server_url):
+    """
+    One page per browser name, kept open by the worker for the tests marked reuse_page. They only get a
+    VideoPage.reset() in between instead of a new context, a navigation and a media load each.
+    The shared pages are not recorded on video, their traces are cut per test with tracing chunks.
+    Their contexts are opened on the browser directly, so with --browser-servers they don't hold a context slot
+    for the whole session (which could leave none for the worker's other tests).
+    """
+    pages = {}
+
+    def get(browser_name: str):
+        page = pages.get(browser_name)
+        if page is None or page.is_closed():
+            context = browser_pool.browser(browser_name).new_context(base_url=server_url)
+            prepare_test_context(context, run_profile, media_cache)
+            page = pages[browser_name] = context.new_page()
+            VideoPage(page).navigate()
+        return page
+
+    yield get
+    for page in pages.values():
+        if not page.is_closed():
+            page.context.close()
+
+
+@pytest.fixture(scope="function")
+def page(request, browser_pool, browser_name, run_profile, media_cache, server_url):
+    if request.node.get_closest_marker("reuse_page"):
+        yield from reused_page(request, browser_name, run_profile)
+        return
+
+    context = new_test_context(browser_pool, browser_name, run_profile, media_cache, server_url,
+                               **run_profile.context_options())
+    page = context.new_page()
+    yield page
+
+    rep_call = getattr(request.node, "rep_call", None)
+    if run_profile.tracing:
+        if rep_call and rep_call.failed:
+            trace_path = trace_path_for(request.node)
+            context.tracing.stop(path=trace_path)
+            logger.info(f"❗ Test failed. Trace saved at: {trace_path}")
+        else:
+            context.tracing.stop()
+
+    video = page.video
+    # Videos of a browser server are recorded on its side, they only exist locally once saved
+    video_path = video.path() if video and not browser_pool.remote else None
+    # Closing the context flushes the video file, the browser itself stays up for the next test
+    context.close()
+
+    if video and browser_pool.remote:
+        if rep_call and rep_call.failed:
+            video_path = os.path.join(run_profile.record_video_dir, f"{uuid.uuid4().hex}.webm")
+            video.save_as(video_path)
+        video.delete()
+    if rep_call and rep_call.passed and video_path and os.path.exists(video_path):
+        os.remove(video_path)
+    elif rep_call and rep_call.failed and video_path:
+        logger.info(f"❗ Test failed. Video saved at: {video_path}")
+
+
+def reused_page(request, browser_name, run_profile):
+    """The worker's shared page, reset to a paused player at 0s; discarded after a failure."""
+    page = request.getfixturevalue("shared_pages")(browser_name)
+    VideoPage(page).reset()
+    if run_profile.tracing:
+        page.context.tracing.start_chunk()
+    yield page
+
+    rep_call = getattr(request.node, "rep_call", None)
+    failed = rep_call is not None and rep_call.failed
+    if run_profile.tracing:
+        if failed:
+            trace_path = trace_path_for(request.node)
+            page.context.tracing.stop_chunk(path=trace_path)
+            logger.info(f"❗ Test failed. Trace saved at: {trace_path}")
+        else:
+            page.context.tracing.stop_chunk()
+    # A failed test may have left the page in a state reset() doesn't cover, the next one gets a new page
+    if failed:
+        page.context.close()
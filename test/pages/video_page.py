@@ -1,19 +1,248 @@
+from dataclasses import dataclass
+import json
 from playwright.sync_api import Page
 import allure
+from utils.playback_metrics import PlaybackBudgets, PlaybackMetrics
+
+# Reads the whole player state in one go, shared by snapshot() and wait_for_state()
+SNAPSHOT_JS = """
+() => {
+    const video = document.querySelector('#video');
+    const buffered = [];
+    for (let i = 0; i < video.buffered.length; i++) {
+        buffered.push([video.buffered.start(i), video.buffered.end(i)]);
+    }
+    return {
+        paused: video.paused,
+        ended: video.ended,
+        currentTime: video.currentTime,
+        duration: video.duration,
+        readyState: video.readyState,
+        buffered: buffered,
+        playbackRate: video.playbackRate,
+        seeking: video.seeking
+    };
+}
+"""
+
+# Puts the player back in its freshly loaded state, see VideoPage.reset()
+RESET_JS = """
+async () => {
+    const video = document.querySelector('#video');
+    if (!video) {
+        return false;
+    }
+    const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+    // The events the reset itself causes (pause, seeked, scroll) are dropped instead of being sent later,
+    // while the next test is already collecting events
+    const realFetch = window.fetch;
+    window.fetch = () => Promise.resolve(new Response(null, { status: 204 }));
+    try {
+        video.pause();
+        video.playbackRate = video.defaultPlaybackRate;
+        if (video.currentTime !== 0 || video.seeking) {
+            const seeked = new Promise(resolve => video.addEventListener('seeked', resolve, { once: true }));
+            video.currentTime = 0;
+            await Promise.race([seeked, sleep(5000)]);
+        }
+        window.scrollTo(0, 0);
+        // Let the scroll throttle window run out, so the next test's first scroll is sent right away
+        const transport = window.eventTransport;
+        await sleep((transport ? transport.config.scrollThrottleMs : 0) + 50);
+        if (transport) {
+            transport.flush();
+        }
+    } finally {
+        window.fetch = realFetch;
+    }
+    return true;
+}
+"""
+
+# Perf mode: counts stalls in the page and returns the counters, optionally starting them from zero
+PERF_PROBE_JS = """
+(resetCounters) => {
+    const video = document.querySelector('#video');
+    if (!window.__playbackProbe) {
+        const probe = window.__playbackProbe = { waiting: 0, stalled: 0, started: false };
+        // Waiting before the first 'playing' is the startup (time to first frame), while seeking it is
+        // the seek, both are measured separately
+        video.addEventListener('playing', () => { probe.started = true; });
+        video.addEventListener('waiting', () => { if (probe.started && !video.seeking) probe.waiting++; });
+        video.addEventListener('stalled', () => probe.stalled++);
+    }
+    const probe = window.__playbackProbe;
+    if (resetCounters) {
+        probe.waiting = 0;
+        probe.stalled = 0;
+    }
+    const quality = video.getVideoPlaybackQuality ? video.getVideoPlaybackQuality() : null;
+    return {
+        waiting: probe.waiting,
+        stalled: probe.stalled,
+        droppedFrames: quality ? quality.droppedVideoFrames : 0,
+        totalFrames: quality ? quality.totalVideoFrames : 0
+    };
+}
+"""
+
+# Perf mode: starts playback and returns the ms until the first new frame, null on timeout
+PLAY_MEASURED_JS = """
+async (timeoutMs) => {
+    const video = document.querySelector('#video');
+    const start = performance.now();
+    const startTime = video.currentTime;
+    const firstFrame = new Promise(resolve => {
+        if (video.requestVideoFrameCallback) {
+            video.requestVideoFrameCallback(() => resolve(true));
+        }
+        // Browsers without requestVideoFrameCallback: the first time update after playback moved on
+        const onTimeUpdate = () => {
+            if (video.currentTime > startTime) {
+                video.removeEventListener('timeupdate', onTimeUpdate);
+                resolve(true);
+            }
+        };
+        video.addEventListener('timeupdate', onTimeUpdate);
+    });
+    video.play();
+    const reached = await Promise.race([firstFrame, new Promise(resolve => setTimeout(resolve, timeoutMs, false))]);
+    return reached ? performance.now() - start : null;
+}
+"""
+
+# Perf mode: seeks and returns the ms until 'seeked', null on timeout
+SEEK_MEASURED_JS = """
+async ([seconds, timeoutMs]) => {
+    const video = document.querySelector('#video');
+    const start = performance.now();
+    const seeked = new Promise(resolve => video.addEventListener('seeked', () => resolve(true), { once: true }));
+    video.currentTime = seconds;
+    const reached = await Promise.race([seeked, new Promise(resolve => setTimeout(resolve, timeoutMs, false))]);
+    return reached ? performance.now() - start : null;
+}
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class PlayerState:
+    """A point-in-time view of the <video> element, read with a single page.evaluate."""
+    paused: bool
+    ended: bool
+    current_time: float
+    duration: float
+    ready_state: int
+    buffered: tuple[tuple[float, float], ...]
+    playback_rate: float
+    seeking: bool
+
+    @classmethod
+    def from_js(cls, data: dict) -> "PlayerState":
+        return cls(
+            paused=data["paused"],
+            ended=data["ended"],
+            current_time=data["currentTime"],
+            duration=data["duration"],
+            ready_state=data["readyState"],
+            buffered=tuple((start, end) for start, end in data["buffered"]),
+            playback_rate=data["playbackRate"],
+            seeking=data["seeking"],
+        )
+
+    @property
+    def is_playing(self) -> bool:
+        return not self.paused and not self.ended and self.current_time > 0
 
 
 class VideoPage:
-    def __init__(self, page: Page):
+    def __init__(self, page: Page, budgets: PlaybackBudgets | None = None):
+        """
+        :param budgets: Enables perf mode: play() and seek() are timed in the page, stalls and dropped frames
+                        are counted, and assert_playback_budgets() checks them against these budgets.
+        """
         self.page = page
         self.video_selector = "#video"  # More specific using the element's unique ID
+        self.metrics = PlaybackMetrics(budgets) if budgets else None
+        self._probe_started = False
+
+    def _read_perf_counters(self) -> dict:
+        # The counters start at zero for every VideoPage, also on a page reused from an earlier test
+        counters = self.page.evaluate(PERF_PROBE_JS, not self._probe_started)
+        self._probe_started = True
+        return counters
 
     @allure.step("Navigate to video player page")
     def navigate(self):
-        self.page.goto("http://localhost:3000")
+        self.page.goto("/")  # Relative to the base_url of the browser context
         self.page.wait_for_selector(self.video_selector, state="visible")  # Ensure video is loaded
 
+    @allure.step("Reset the video player")
+    def reset(self):
+        """
+        Brings a page that already shows the player back to its just-navigated state without reloading it:
+        paused at 0s, default playback rate, scrolled to the top, no queued client events and no request
+        routes or listeners left on the page. Used for the shared page of tests marked reuse_page; falls back to
+        navigate() when the page no longer shows the player.
+        """
+        self.page.unroute_all(behavior="ignoreErrors")
+        self._remove_test_listeners()
+        if not self.page.evaluate(RESET_JS):
+            self.navigate()
+
+    def _remove_test_listeners(self):
+        """
+        Removes the listeners added with page.on() since the previous reset(). The first reset() of a page
+        starts recording them, page.on and page.remove_listener are wrapped on that page object only.
+        """
+        page = self.page
+        listeners = getattr(page, "_test_listeners", None)
+        if listeners is None:
+            listeners = page._test_listeners = []
+            on, remove_listener = page.on, page.remove_listener
+
+            def tracked_on(event, f):
+                listeners.append((event, f))
+                return on(event, f)
+
+            def tracked_remove_listener(event, f):
+                if (event, f) in listeners:
+                    listeners.remove((event, f))
+                return remove_listener(event, f)
+
+            page.on, page.remove_listener = tracked_on, tracked_remove_listener
+            return
+        while listeners:
+            event, f = listeners[-1]
+            page.remove_listener(event, f)
+
+    def snapshot(self) -> PlayerState:
+        """Returns the current player state using a single round trip to the browser."""
+        return PlayerState.from_js(self.page.evaluate(SNAPSHOT_JS))
+
+    def wait_for_state(self, predicate: str, timeout: float = 5000) -> PlayerState:
+        """
+        Waits inside the page until `predicate` holds for the player state and returns that state.
+        :param predicate: JavaScript function that receives the raw snapshot object,
+                          e.g. "s => !s.paused && s.currentTime > 0".
+        :param timeout: Maximum wait in milliseconds.
+        """
+        handle = self.page.wait_for_function(
+            f"""() => {{
+                const state = ({SNAPSHOT_JS})();
+                return ({predicate})(state) ? state : null;
+            }}""",
+            timeout=timeout
+        )
+        return PlayerState.from_js(handle.json_value())
+
     @allure.step("Play the video using JavaScript")
     def play(self):
+        if self.metrics is not None:
+            self._read_perf_counters()
+            self.metrics.first_frame_ms.append(
+                self.page.evaluate(PLAY_MEASURED_JS, self.metrics.budgets.measure_timeout_ms))
+            self.wait_until_playing()
+            return
         self.page.evaluate(
             """
             () => {
@@ -25,13 +254,7 @@ class VideoPage:
         # Smart wait: instead of a fixed sleep, wait until the video is confirmed to be playing
         # The condition checks that the video is not paused, not ended, and has started progressing in time (currentTime > 0)
         # This ensures the test proceeds only when playback has actually begun
-        self.page.wait_for_function(
-            """() => {
-                const video = document.querySelector('#video');
-                return !video.paused && !video.ended && video.currentTime > 0;
-            }""",
-            timeout=5000  # 5 seconds max
-        )
+        self.wait_until_playing()
 
     @allure.step("Pause the video using JavaScript")
     def pause(self):
@@ -46,6 +269,12 @@ class VideoPage:
 
     @allure.step("Seek to {seconds} seconds")
     def seek(self, seconds: float):
+        if self.metrics is not None:
+            # Perf mode waits for 'seeked' to time the seek
+            self._read_perf_counters()
+            self.metrics.seek_ms.append(
+                self.page.evaluate(SEEK_MEASURED_JS, [seconds, self.metrics.budgets.measure_timeout_ms]))
+            return
         self.page.evaluate(
             f"""
             () => {{
@@ -55,70 +284,59 @@ class VideoPage:
             """
         )
 
-    @allure.step("Scroll the page")
-    def scroll(self):
-        self.page.mouse.wheel(0, 1000)
+    @allure.step("Scroll the page by {delta_y}px")
+    def scroll(self, delta_y: int = 1000):
+        self.page.mouse.wheel(0, delta_y)
 
     @allure.step("Assert that video is playing")
     def assert_is_playing(self):
-        is_playing = self.page.evaluate(
-            """
-            () => {
-                const video = document.querySelector('#video');
-                return !video.paused && !video.ended && video.currentTime > 0;
-            }
-            """
-        )
-        assert is_playing, "❌ Video is not playing"
+        state = self.snapshot()
+        assert state.is_playing, f"❌ Video is not playing: {state}"
 
     @allure.step("Assert that video is paused")
     def assert_is_paused(self):
-        is_paused = self.page.evaluate("""
-            () => {
-                const video = document.querySelector('video');
-                return video.paused === true;
-            }
-        """)
-        assert is_paused, "❌ Video is not paused"
+        state = self.snapshot()
+        assert state.paused, f"❌ Video is not paused: {state}"
 
     @allure.step("Assert that video currentTime >= {min_expected} seconds")
     def assert_seek_position(self, min_expected: float):
-        current_time = self.page.evaluate("""
-            () => {
-                const video = document.querySelector('#video');
-                return video.currentTime;
-            }
-        """)
+        current_time = self.snapshot().current_time
         assert current_time >= min_expected, f"❌ Expected video time >= {min_expected}, but got {current_time}"
 
-    @allure.step("Scroll the page")
-    def scroll(self):
-        self.page.mouse.wheel(0, 1000)
-        self.page.wait_for_timeout(1000)  # give backend time to receive
+    @allure.step("Assert that video has ended")
+    def assert_is_ended(self):
+        state = self.snapshot()
+        assert state.ended, f"❌ Video did not reach ended state: {state}"
+
+    @allure.step("Assert that playback stayed within its performance budgets")
+    def assert_playback_budgets(self) -> PlaybackMetrics:
+        """Perf mode only: attaches the playback metrics to the report and fails on any exceeded budget."""
+        assert self.metrics is not None, "❌ VideoPage was created without budgets, perf mode is off"
+        self.metrics.update_counters(self._read_perf_counters())
+        allure.attach(json.dumps(self.metrics.to_dict(), indent=2), name="Playback metrics",
+                      attachment_type=allure.attachment_type.JSON)
+        violations = self.metrics.budget_violations()
+        assert not violations, (
+            f"❌ Playback budgets exceeded: {'; '.join(violations)} ({self.metrics.summary()})"
+        )
+        return self.metrics
 
     @allure.step("Get video duration")
     def get_duration(self) -> float:
-        return self.page.evaluate("() => document.querySelector('#video').duration")
+        return self.snapshot().duration
 
     @allure.step("Wait until video is playing")
-    def wait_until_playing(self):
-        self.page.wait_for_function(
-            """() => {
-                const video = document.querySelector('#video');
-                return !video.paused && !video.ended && video.currentTime > 0;
-            }""",
-            timeout=5000
-        )
-
-    @allure.step("Wait until video is paused")
-    def wait_until_paused(self):
-        self.page.wait_for_function(
-            """() => {
-                const video = document.querySelector('#video');
-                return video.paused === true;
-            }""",
-            timeout=5000
-        )
+    def wait_until_playing(self) -> PlayerState:
+        return self.wait_for_state("s => !s.paused && !s.ended && s.currentTime > 0")
 
+    @allure.step("Wait until video finished seeking")
+    def wait_until_seeked(self) -> PlayerState:
+        return self.wait_for_state("s => !s.seeking && s.readyState >= 2")
 
+    @allure.step("Wait until video has ended")
+    def wait_until_ended(self, timeout: float = 5000) -> PlayerState:
+        return self.wait_for_state("s => s.ended", timeout=timeout)
 
+    @allure.step("Wait until video is paused")
+    def wait_until_paused(self) -> PlayerState:
+        return self.wait_for_state("s => s.paused")
@@ -0,0 +1,280 @@
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+import pytest
+import allure
+import logging
+from utils import analyze_report_using_ai
+from utils.analyze_report_using_ai import AllureReportAnalyzer
+from utils.llm_backends import GeminiBackend, LLMBackend, StubBackend, create_backend
+from utils.llm_cache import LLMResponseCache
+
+logger = logging.getLogger(__name__)
+ANALYZER_SCRIPT = Path(__file__).resolve().parent / "utils" / "analyze_report_using_ai.py"
+
+
+class CountingBackend(StubBackend):
+    """Stub backend that counts its calls and keeps the prompts, to tell cached answers from generated ones."""
+
+    def __init__(self):
+        self.prompts = []
+
+    @property
+    def calls(self) -> int:
+        return len(self.prompts)
+
+    def generate(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        return super().generate(prompt)
+
+
+class OtherModelBackend(CountingBackend):
+    name = "other-model"
+
+
+@pytest.fixture
+def results_dir(tmp_path):
+    """An Allure results directory with 2 passed, 1 failed and 1 skipped result."""
+    path = tmp_path / "allure-results"
+    path.mkdir()
+    for i, status in enumerate(["passed", "passed", "failed", "skipped"]):
+        result = {"name": f"test {i}", "status": status, "start": 1000, "stop": 2000, "uuid": f"uuid-{i}"}
+        if status == "failed":
+            result["statusDetails"] = {"message": "TimeoutError: video did not start playing"}
+        (path / f"{i}-result.json").write_text(json.dumps(result), encoding="utf-8")
+    return path
+
+
+@allure.epic("Report Analyzer")
+@allure.feature("Offline LLM backend, response cache and summary")
+class TestAnalyzerOffline:
+
+    @allure.title("LLM backends must implement generate()")
+    def test_backend_is_abstract(self):
+        with pytest.raises(TypeError):
+            LLMBackend()
+
+    @allure.title("Stub backend answers equal prompts equally")
+    def test_stub_backend_is_deterministic(self):
+        backend = StubBackend()
+        answer = backend.generate("Analyze\n\nText: Timeout waiting for play")
+
+        assert answer == backend.generate("Analyze\n\nText: Timeout waiting for play")
+        assert answer != backend.generate("Analyze\n\nText: Timeout waiting for seek")
+        assert answer.endswith("Timeout waiting for play"), f"❌ Unexpected stub answer: {answer}"
+
+    @allure.title("Gemini backend is named after the model it fell back to")
+    def test_gemini_name_follows_selected_model(self, monkeypatch):
+        genai = pytest.importorskip("google.generativeai")
+        monkeypatch.setattr(genai, "configure", lambda **kwargs: None)
+        monkeypatch.setattr(genai, "list_models", lambda: [
+            SimpleNamespace(name="models/gemini-1.5-flash", supported_generation_methods=["generateContent"])
+        ])
+        monkeypatch.setattr(genai, "GenerativeModel", lambda model_name: SimpleNamespace(model_name=model_name))
+
+        assert GeminiBackend("test-key").name == "gemini:gemini-1.5-flash"
+
+    @allure.title("Cached responses are returned until they expire")
+    def test_response_cache(self, tmp_path):
+        cache = LLMResponseCache(tmp_path, ttl_seconds=60, max_entries=2)
+        cache.put("stub", "prompt", "answer")
+
+        assert cache.get("stub", "prompt") == "answer"
+        assert cache.get("gemini:gemini-pro", "prompt") is None, "❌ Another model's answer was returned"
+
+        path = tmp_path / f"{LLMResponseCache.key('stub', 'prompt')}.json"
+        entry = json.loads(path.read_text(encoding="utf-8"))
+        entry["created_at"] = time.time() - 120
+        path.write_text(json.dumps(entry), encoding="utf-8")
+        assert cache.get("stub", "prompt") is None, "❌ Expired entry was returned"
+        assert not path.exists(), "❌ Expired entry was not removed"
+
+    @allure.title("The cache keeps at most max_entries responses")
+    def test_response_cache_evicts_oldest(self, tmp_path):
+        cache = LLMResponseCache(tmp_path, max_entries=2)
+        for i in range(3):
+            cache.put("stub", f"prompt {i}", f"answer {i}")
+            path = tmp_path / f"{LLMResponseCache.key('stub', f'prompt {i}')}.json"
+            os.utime(path, (1000 + i, 1000 + i))
+
+        cache.put("stub", "prompt 3", "answer 3")
+        assert len(list(tmp_path.glob("*.json"))) == 2
+        assert cache.get("stub", "prompt 0") is None
+        assert cache.get("stub", "prompt 3") == "answer 3"
+
+    @allure.title("Cache keys are the SHA-256 of model and prompt, stable across processes")
+    def test_response_cache_key(self):
+        key = LLMResponseCache.key("stub", "Timeout waiting for play")
+
+        assert key == hashlib.sha256("stub\0Timeout waiting for play".encode("utf-8")).hexdigest()
+        assert key == LLMResponseCache.key("stub", "Timeout waiting for play")
+        assert key != LLMResponseCache.key("other-model", "Timeout waiting for play")
+        assert key != LLMResponseCache.key("stub", "Timeout waiting for seek")
+        # The separator keeps the model/prompt boundary from being ambiguous
+        assert LLMResponseCache.key("a", "bc") != LLMResponseCache.key("ab", "c")
+
+    @allure.title("Cache entries are JSON files named by their key")
+    def test_response_cache_file_format(self, tmp_path):
+        cache = LLMResponseCache(tmp_path)
+        before = time.time()
+        cache.put("stub", "prompt", "answer ✓")
+
+        files = list(tmp_path.iterdir())
+        assert [path.name for path in files] == [f"{LLMResponseCache.key('stub', 'prompt')}.json"], \
+            f"❌ Unexpected cache files: {files}"
+        entry = json.loads(files[0].read_text(encoding="utf-8"))
+        assert set(entry) == {"created_at", "model", "response"}
+        assert (entry["model"], entry["response"]) == ("stub", "answer ✓")
+        assert before <= entry["created_at"] <= time.time()
+
+    @allure.title("Failure analysis misses the cache once, then is served from disk, per model")
+    def test_failure_analysis_cache_hit_and_miss(self, tmp_path, results_dir):
+        cache_path = str(tmp_path / "llm-cache")
+
+        def analyze(backend):
+            analyzer = AllureReportAnalyzer(reports_path=str(results_dir), llm_cache_path=cache_path,
+                                            llm_backend=backend)
+            analyzer.load_allure_results()
+            return analyzer.analyze_failures_with_llm()
+
+        first_backend, second_backend, other_model = CountingBackend(), CountingBackend(), OtherModelBackend()
+        first = analyze(first_backend)
+        second = analyze(second_backend)
+        analyze(other_model)
+
+        assert first_backend.calls == 1, f"❌ Expected 1 LLM call on a cold cache, got {first_backend.calls}"
+        assert second_backend.calls == 0, "❌ A new analyzer didn't use the answer cached on disk"
+        assert first == second
+        assert other_model.calls == 1, "❌ Another model was served the cached answer"
+        assert len(list((tmp_path / "llm-cache").glob("*.json"))) == 2
+
+    @allure.title("With the 'none' backend failures are not sent anywhere")
+    def test_none_backend(self, tmp_path, results_dir):
+        assert create_backend("none") is None
+        analyzer = AllureReportAnalyzer(reports_path=str(results_dir), llm_cache_path=str(tmp_path / "llm-cache"),
+                                        llm_backend="none")
+        analyzer.load_allure_results()
+
+        assert analyzer.llm_model is None
+        assert analyzer.analyze_failures_with_llm() == \
+            "LLM model is not initialized. Cannot analyze failures with LLM."
+        assert not list((tmp_path / "llm-cache").glob("*.json")), "❌ Something was cached without a backend"
+
+    @allure.title("Unknown backend names are rejected")
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError, match="Unknown LLM backend"):
+            create_backend("gpt-unknown")
+
+    @allure.title("Equal prompts reach the LLM once")
+    def test_llm_insights_are_cached(self, tmp_path, results_dir):
+        backend = CountingBackend()
+        analyzer = AllureReportAnalyzer(reports_path=str(results_dir), llm_cache_path=str(tmp_path / "llm-cache"),
+                                        llm_backend=backend)
+
+        first = analyzer.get_llm_insights("Timeout waiting for play")
+        second = analyzer.get_llm_insights("Timeout waiting for play")
+
+        assert first == second
+        assert backend.calls == 1, f"❌ Expected 1 LLM call, got {backend.calls}"
+
+    @allure.title("The same failure with other timings and ids reaches the LLM once across runs")
+    def test_cluster_prompt_is_stable_across_runs(self, tmp_path):
+        backend = CountingBackend()
+        for run, (timeout, element_id) in enumerate([(30000, "a1b2c3d4-0000-4000-8000-000000000001"),
+                                                     (30512, "9f8e7d6c-1111-4111-8111-000000000002")]):
+            path = tmp_path / f"run-{run}"
+            path.mkdir()
+            result = {"name": f"test play {run}", "status": "failed", "start": 1000, "stop": 2000 + run,
+                      "uuid": f"uuid-{run}",
+                      "statusDetails": {"message": f"TimeoutError: Timeout {timeout}ms exceeded waiting for "
+                                                   f"video {element_id} to play"}}
+            (path / "0-result.json").write_text(json.dumps(result), encoding="utf-8")
+            analyzer = AllureReportAnalyzer(reports_path=str(path), llm_cache_path=str(tmp_path / "llm-cache"),
+                                            llm_backend=backend)
+            analyzer.load_allure_results()
+            analyzer.analyze_failures_with_llm()
+
+        assert backend.calls == 1, f"❌ Expected 1 LLM call, got {backend.calls}: {backend.prompts}"
+        assert "30000" not in backend.prompts[0], f"❌ Unmasked details in the prompt: {backend.prompts[0]}"
+
+    @allure.title("orjson, the json fallback and the process pool parse results into the same frame")
+    def test_parse_paths_agree(self, monkeypatch, results_dir):
+        orjson = pytest.importorskip("orjson")
+        testing = pytest.importorskip("pandas.testing")
+        extra = [
+            {"name": "tést ünïcode ▶", "status": "failed", "start": 1000, "stop": 1250, "uuid": "uuid-4",
+             "statusDetails": {"trace": "AssertionError: paused\n  at line 3"}, "historyId": "h4",
+             "labels": [{"name": "epic", "value": "Video"}, {"name": "subSuite", "value": "Seek"}]},
+            {"name": "no timing", "status": "broken", "uuid": "uuid-5", "testCaseId": "tc5"},
+        ]
+        for i, result in enumerate(extra, start=4):
+            (results_dir / f"{i}-result.json").write_text(json.dumps(result), encoding="utf-8")
+        (results_dir / "6-result.json").write_text('{"name": "torn', encoding="utf-8")
+        analyzer = AllureReportAnalyzer(reports_path=str(results_dir), llm_cache_path=None)
+        result_files = sorted(analyzer._list_result_files())
+
+        def parse(use_processes=False):
+            rows = analyzer._parse_files(result_files, max_workers=2, use_processes=use_processes)
+            return AllureReportAnalyzer._frame_from_rows([row for _, row in rows], "run-1")
+
+        monkeypatch.setattr(analyze_report_using_ai, "_json_backend", orjson)
+        with_orjson = parse()
+        in_processes = parse(use_processes=True)
+        monkeypatch.setattr(analyze_report_using_ai, "_json_backend", json)
+        with_json = parse()
+
+        assert len(with_json) == 6, f"❌ Expected the 6 valid results, got:\n{with_json}"
+        testing.assert_frame_equal(with_orjson, with_json)
+        testing.assert_frame_equal(in_processes, with_json)
+
+    @allure.title("Quick summary counts the statuses of the result files")
+    def test_quick_summary(self, results_dir):
+        summary = AllureReportAnalyzer(reports_path=str(results_dir), llm_cache_path=None).quick_summary()
+        logger.info(summary)
+
+        for line in ("Total Tests: 4", "Passed: 2", "Failed: 1", "Skipped: 1", "Pass Rate: 50.00%"):
+            assert line in summary, f"❌ '{line}' missing from summary: {summary}"
+
+    @allure.title("--summary-only prints the summary without contacting an LLM")
+    def test_summary_only_cli(self, results_dir):
+        completed = subprocess.run(
+            [sys.executable, str(ANALYZER_SCRIPT), "--summary-only", "--reports-path", str(results_dir),
+             "--llm-backend", "none"],
+            capture_output=True, text=True, timeout=60, env={**os.environ, "GOOGLE_API_KEY": ""}
+        )
+        output = completed.stdout + completed.stderr
+
+        assert completed.returncode == 0, f"❌ Analyzer exited with {completed.returncode}: {output}"
+        assert "Total Tests: 4" in output, f"❌ Summary missing from output: {output}"
+        assert "Failed Tests Details" not in output, f"❌ More than the summary was printed: {output}"
+
+    @allure.title("Failure details and prompts of a failed test without a video")
+    def test_failed_test_without_video(self, tmp_path, results_dir):
+        backend = CountingBackend()
+        analyzer = AllureReportAnalyzer(reports_path=str(results_dir), videos_path=str(tmp_path / "videos"),
+                                        llm_cache_path=None, llm_backend=backend)
+        analyzer.load_allure_results()
+
+        details = analyzer.get_failed_tests_details()
+        assert "Test Name: test 2" in details, f"❌ Failed test missing from details: {details}"
+        assert "Video Link" not in details, f"❌ Video link for a test without a video: {details}"
+
+        analyzer.get_llm_insight_for_specific_test("test 2")
+        assert "Associated Video" not in backend.prompts[-1], f"❌ Unexpected prompt: {backend.prompts[-1]}"
+
+    @allure.title("Watching a run ends with the failure details of tests without a video")
+    def test_watch_failed_test_without_video(self, tmp_path, results_dir):
+        analyzer = AllureReportAnalyzer(reports_path=str(results_dir), videos_path=str(tmp_path / "videos"),
+                                        llm_cache_path=None, llm_backend="none")
+        aggregates = analyzer.watch(poll_interval=0.1, idle_timeout=0.5, analyze_failures=False)
+        logger.info(aggregates.summary_line())
+
+        assert len(analyzer.df_results) == 4
+        details = analyzer.get_failed_tests_details()
+        assert "Test Name: test 2" in details, f"❌ Failed test missing from details: {details}"
+        assert "Video Link" not in details, f"❌ Video link for a test without a video: {details}"
@@ -1,11 +1,19 @@
+import uuid
 import pytest
 import requests
 import logging
 import allure
 from datetime import datetime
+from utils.event_sink_client import EventSinkClient
 
 logger = logging.getLogger(__name__)
-BASE_URL = "http://localhost:3000/api/event"
+EVENT_PATH = "/api/event"
+EVENTS_PATH = "/api/events"
+
+
+@pytest.fixture
+def event_url(server_url):
+    return server_url + EVENT_PATH
 
 
 @allure.epic("Backend API Validation")
@@ -14,7 +22,7 @@ class TestApiEvent:
 
     @allure.title("Send valid event and expect 200 OK")
     @allure.step("Sending valid POST /api/event request")
-    def test_post_valid_event(self):
+    def test_post_valid_event(self, event_url):
         payload = {
             "userId": "user-123",
             "type": "play",
@@ -22,19 +30,19 @@ class TestApiEvent:
             "timestamp": datetime.utcnow().isoformat() + "Z"
         }
 
-        response = requests.post(BASE_URL, json=payload)
+        response = requests.post(event_url, json=payload)
         logger.info(f"Response status: {response.status_code}, body: {response.text}")
         assert response.status_code == 200
 
     @allure.title("Send event with missing 'type' field")
-    def test_post_missing_type(self):
+    def test_post_missing_type(self, event_url):
         payload = {
             "userId": "user-123",
             "videoTime": 12.0,
             "timestamp": datetime.utcnow().isoformat() + "Z"
         }
 
-        response = requests.post(BASE_URL, json=payload)
+        response = requests.post(event_url, json=payload)
         logger.info(f"Missing 'type' field - Status: {response.status_code}")
         assert response.status_code >= 400, (
             "❗ Expected validation error for missing 'type', "
@@ -42,7 +50,7 @@ class TestApiEvent:
         )
 
     @allure.title("Send event with wrong data type for videoTime")
-    def test_post_invalid_video_time(self):
+    def test_post_invalid_video_time(self, event_url):
         payload = {
             "userId": "user-123",
             "type": "pause",
@@ -50,7 +58,7 @@ class TestApiEvent:
             "timestamp": datetime.utcnow().isoformat() + "Z"
         }
 
-        response = requests.post(BASE_URL, json=payload)
+        response = requests.post(event_url, json=payload)
         logger.info(f"Invalid 'videoTime' type - Status: {response.status_code}")
         assert response.status_code >= 400, (
             "❗ Expected validation error for bad 'videoTime', but got "
@@ -58,14 +66,14 @@ class TestApiEvent:
         )
 
     @allure.title("Send event with missing 'timestamp' field")
-    def test_post_missing_timestamp(self):
+    def test_post_missing_timestamp(self, event_url):
         payload = {
             "userId": "user-123",
             "type": "seeked",
             "videoTime": 5.5
         }
 
-        response = requests.post(BASE_URL, json=payload)
+        response = requests.post(event_url, json=payload)
         logger.info(f"Missing 'timestamp' - Status: {response.status_code}")
         assert response.status_code >= 400, (
             "❗ Expected validation error for missing 'timestamp', but got "
@@ -73,7 +81,7 @@ class TestApiEvent:
         )
 
     @allure.title("Send event with extra unexpected fields")
-    def test_post_with_extra_fields(self):
+    def test_post_with_extra_fields(self, event_url):
         payload = {
             "userId": "user-123",
             "type": "scroll",
@@ -82,16 +90,16 @@ class TestApiEvent:
             "extra": "not-needed"
         }
 
-        response = requests.post(BASE_URL, json=payload)
+        response = requests.post(event_url, json=payload)
         logger.info(f"Payload with extra field - Status: {response.status_code}")
         assert response.status_code == 200
 
     @allure.title("Send malformed JSON and verify backend handles gracefully")
-    def test_malformed_backend_response(self):
+    def test_malformed_backend_response(self, event_url):
         malformed_payload = "{userId: 'abc', type: play}"  # invalid JSON
 
         response = requests.post(
-            BASE_URL,
+            event_url,
             headers={"Content-Type": "application/json"},
             data=malformed_payload
         )
@@ -102,11 +110,11 @@ class TestApiEvent:
         )
 
     @allure.title("Send malformed JSON body (not valid JSON at all)")
-    def test_post_completely_invalid_json(self):
+    def test_post_completely_invalid_json(self, event_url):
         malformed_body = "{userId: 123, type: play"  # missing closing }
 
         response = requests.post(
-            BASE_URL,
+            event_url,
             data=malformed_body,
             headers={"Content-Type": "application/json"}
         )
@@ -119,7 +127,7 @@ class TestApiEvent:
 
     @allure.title("Send event with missing required fields")
     @pytest.mark.parametrize("missing_field", ["userId", "type", "videoTime", "timestamp"])
-    def test_post_missing_fields(self, missing_field):
+    def test_post_missing_fields(self, event_url, missing_field):
         payload = {
             "userId": "user-123",
             "type": "scroll",
@@ -128,10 +136,82 @@ class TestApiEvent:
         }
         del payload[missing_field]
 
-        response = requests.post(BASE_URL, json=payload)
+        response = requests.post(event_url, json=payload)
         logger.info(f"Missing '{missing_field}' - Status: {response.status_code}")
         assert response.status_code >= 400, (
             f"❗ Expected validation error for missing '{missing_field}', "
             f"but got {response.status_code}"
         )
 
+    @allure.title("Ingested events can be queried back from the server")
+    def test_posted_events_are_queryable(self, event_url, server_url):
+        sink = EventSinkClient(server_url)
+        user_id = f"user-{uuid.uuid4().hex[:8]}"  # unique, so parallel workers don't see each other's events
+        cursor = sink.cursor()
+        types = ["play", "pause", "scroll", "scroll"]
+
+        for event_type in types:
+            payload = {
+                "userId": user_id,
+                "type": event_type,
+                "videoTime": 1.0,
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            }
+            assert requests.post(event_url, json=payload).status_code == 200
+
+        events = sink.events(user_id=user_id, since=cursor)
+        assert [event["type"] for event in events] == types, f"❌ Unexpected ingested events: {events}"
+        scrolls = sink.wait_for("scroll", count=2, user_id=user_id, since=cursor, timeout=1000)
+        assert len(scrolls) == 2, f"❌ Expected 2 scroll events, got {len(scrolls)}"
+
+    @allure.title("Client fields cannot overwrite the server-assigned seq and receivedAt")
+    def test_server_fields_are_not_overwritten(self, event_url, server_url):
+        sink = EventSinkClient(server_url)
+        user_id = f"user-{uuid.uuid4().hex[:8]}"
+        cursor = sink.cursor()
+        payload = {
+            "userId": user_id,
+            "type": "play",
+            "videoTime": 1.0,
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "seq": 0,
+            "receivedAt": "1970-01-01T00:00:00.000Z"
+        }
+
+        response = requests.post(event_url, json=payload)
+        assert response.status_code == 200
+        seq = response.json()["seq"]
+        assert seq > cursor, f"❌ Server returned the client's seq {seq}"
+
+        events = sink.events(user_id=user_id, since=cursor)
+        assert [event["seq"] for event in events] == [seq], f"❌ Unexpected ingested events: {events}"
+        assert events[0]["receivedAt"] != payload["receivedAt"], "❌ Client receivedAt was stored"
+
+    @allure.title("Send a batch of events to the bulk endpoint")
+    def test_post_event_batch(self, server_url):
+        sink = EventSinkClient(server_url)
+        user_id = f"user-{uuid.uuid4().hex[:8]}"
+        cursor = sink.cursor()
+        events = [
+            {"userId": user_id, "type": "scroll", "videoTime": float(i), "timestamp": datetime.utcnow().isoformat() + "Z"}
+            for i in range(5)
+        ]
+
+        response = requests.post(server_url + EVENTS_PATH, json={"events": events})
+        logger.info(f"Batch of {len(events)} - Status: {response.status_code}, body: {response.text}")
+        assert response.status_code == 200
+        assert response.json()["accepted"] == len(events)
+        assert len(sink.events("scroll", user_id=user_id, since=cursor)) == len(events)
+
+    @allure.title("Reject a batch that contains an invalid event")
+    def test_post_event_batch_with_invalid_event(self, server_url):
+        events = [
+            {"userId": "user-123", "type": "play", "videoTime": 1.0, "timestamp": datetime.utcnow().isoformat() + "Z"},
+            {"userId": "user-123", "type": "play", "videoTime": "not-a-number",
+             "timestamp": datetime.utcnow().isoformat() + "Z"},
+        ]
+
+        response = requests.post(server_url + EVENTS_PATH, json={"events": events})
+        logger.info(f"Batch with invalid event - Status: {response.status_code}, body: {response.text}")
+        assert response.status_code == 400, f"❗ Expected the batch to be rejected, but got {response.status_code}"
+        assert [error["index"] for error in response.json()["errors"]] == [1]
@@ -0,0 +1,29 @@
+import pytest
+import allure
+import logging
+from utils.load_generator import LoadConfig, run_load
+
+logger = logging.getLogger(__name__)
+EVENT_PATH = "/api/event"
+
+
+@allure.epic("Backend API Performance")
+@allure.feature("POST /api/event under load")
+@pytest.mark.load
+class TestApiEventLoad:
+    """
+    Drives POST /api/event at a fixed rate with pooled connections and checks the latency,
+    throughput and error budgets. Rate, concurrency, duration and budgets are read from
+    LOAD_* env vars, e.g. LOAD_RATE=200 LOAD_DURATION=30 pytest -m load
+    """
+
+    @allure.title("Event endpoint stays within latency and error budgets under load")
+    def test_event_endpoint_under_load(self, server_url):
+        config = LoadConfig.from_env()
+        result = run_load(server_url + EVENT_PATH, config)
+
+        logger.info(f"📈 Load result: {result.summary()}")
+        allure.attach(result.summary(), name="Load summary", attachment_type=allure.attachment_type.TEXT)
+
+        violations = result.budget_violations()
+        assert not violations, f"❌ Load budgets exceeded: {'; '.join(violations)} ({result.summary()})"
@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+import allure
+import logging
+
+logger = logging.getLogger(__name__)
+TEST_DIR = Path(__file__).resolve().parent
+
+
+@allure.epic("Test Infrastructure")
+@allure.feature("Shared browser servers")
+@pytest.mark.infra
+class TestBrowserServers:
+
+    @allure.title("Shared reuse_page contexts leave the context slots to the other tests")
+    def test_reuse_page_with_single_context_slot(self, tmp_path):
+        """
+        Runs a reuse_page test and then a test with its own page in one session with a single context slot.
+        The shared page stays open for the whole session, if it held the slot the second test could never get one.
+        """
+        # A separate session of its own, not a worker of this one
+        env = {key: value for key, value in os.environ.items() if not key.startswith("PYTEST_XDIST")}
+        env["CONTEXT_SLOT_TIMEOUT"] = "20"
+        completed = subprocess.run(
+            [sys.executable, "-m", "pytest",
+             "test_edge_cases.py::TestEdgeCases::test_seek_to_end",
+             "test_edge_cases.py::TestEdgeCases::test_scroll_storm_is_batched",
+             "--server", "stub", "--profile", "ci", "--browser-servers", "1", "--contexts-per-server", "1",
+             "--basetemp", str(tmp_path / "basetemp"), "-p", "no:phase_timing", "-p", "no:cacheprovider", "-q"],
+            cwd=TEST_DIR, env=env, capture_output=True, text=True, timeout=300
+        )
+        output = completed.stdout + completed.stderr
+        logger.info(output)
+
+        assert "No free" not in output, f"❌ A test waited for a context slot held by the shared page:\n{output}"
+        assert completed.returncode == 0, f"❌ Session exited with {completed.returncode}:\n{output}"
@@ -1,6 +1,7 @@
 import pytest
 import allure
 from pages.video_page import VideoPage
+from utils.event_collector import EventCollector
 from utils.logger import logger
 
 
@@ -10,13 +11,13 @@ from utils.logger import logger
 @allure.epic("UI edge cases tests")
 class TestEdgeCases:
 
+    @pytest.mark.reuse_page
     @pytest.mark.parametrize("action", ["play", "pause"])
     @pytest.mark.parametrize("clicks", [2])
     @pytest.mark.flaky(reruns=3, reruns_delay=2)
     @allure.title("Double-click '{action}' button keeps video in expected state")
     def test_double_click_play_pause(self, page, action, clicks):
         video = VideoPage(page)
-        video.navigate()
 
         if action == "play":
             with allure.step(f"Double-clicking 'play' button ({clicks} clicks)"):
@@ -44,39 +45,98 @@ class TestEdgeCases:
         else:
             pytest.fail(f"❌ Unknown action '{action}'")
 
+    @pytest.mark.reuse_page
     @allure.title("Rapid scroll generates multiple scroll events")
     @pytest.mark.flaky(reruns=3, reruns_delay=2)
     @pytest.mark.parametrize("scrolls", [3])
     def test_rapid_scroll_event(self, page, scrolls):
         video = VideoPage(page)
-        video.navigate()
-
-        events = []
-
-        def handle_request(request):
-            if "/api/event" in request.url:
-                data = request.post_data_json
-                if data.get("type") == "scroll":
-                    events.append(data)
-
-        page.on("request", handle_request)
 
-        with allure.step(f"Scroll {scrolls} times rapidly"):
-            for _ in range(scrolls):
-                video.scroll()
-                page.wait_for_timeout(500)  # short delay between scrolls
-
-        page.remove_listener("request", handle_request)
+        with EventCollector(page) as collector:
+            with allure.step(f"Scroll {scrolls} times rapidly"):
+                for i in range(scrolls):
+                    video.scroll()
+                    # Move on as soon as this scroll was reported instead of sleeping a fixed time
+                    collector.wait_for("scroll", count=i + 1)
+            events = collector.of_type("scroll")
 
         assert len(events) >= scrolls, f"❌ Expected {scrolls} scroll events, got {len(events)}"
         logger.info(f"✅ Scroll events captured: {len(events)}")
 
+    @allure.title("Scroll storm is throttled and sent in batches")
+    @pytest.mark.flaky(reruns=3, reruns_delay=2)
+    @pytest.mark.parametrize("ticks", [60])
+    def test_scroll_storm_is_batched(self, page, ticks):
+        video = VideoPage(page)
+        video.navigate()
+        transport = page.evaluate("() => window.eventTransport.config")
+        page.evaluate("""() => {
+            window.__scrollTicks = 0;
+            window.addEventListener('scroll', () => window.__scrollTicks++);
+            // Send times of the event requests, on the page's clock like the storm window below
+            window.__eventRequestTimes = [];
+            const fetch = window.fetch;
+            window.fetch = (url, ...args) => {
+                if (String(url).includes('/api/event')) {
+                    window.__eventRequestTimes.push(performance.now());
+                }
+                return fetch(url, ...args);
+            };
+        }""")
+
+        with EventCollector(page) as collector:
+            with allure.step(f"Scroll {ticks} times, once per animation frame"):
+                # One call for the whole storm, so neither slow_mo nor the round trips spread it out
+                storm = page.evaluate("""async ticks => {
+                    const start = performance.now();
+                    for (let i = 0; i < ticks; i++) {
+                        window.scrollBy(0, i % 2 ? -40 : 40);
+                        await new Promise(requestAnimationFrame);
+                    }
+                    return { start, end: performance.now() };
+                }""", ticks)
+            with allure.step("Wait until the trailing scroll event and every queued batch were sent"):
+                collector.wait_until_quiet(transport["scrollThrottleMs"] + transport["flushIntervalMs"])
+                page.evaluate("() => window.eventTransport.flush()")
+                collector.wait_until_quiet(transport["flushIntervalMs"])
+
+        scroll_ticks = page.evaluate("() => window.__scrollTicks")
+        scroll_events = len(collector.of_type("scroll"))
+        storm_ms = storm["end"] - storm["start"]
+        storm_requests = len([t for t in page.evaluate("() => window.__eventRequestTimes")
+                              if storm["start"] <= t <= storm["end"]])
+        requests_per_second = storm_requests / (storm_ms / 1000)
+        # One flush per interval, plus one that may fall anywhere in the window
+        max_requests_per_second = 1000 / transport["flushIntervalMs"] + 1000 / storm_ms
+        events_per_request = len(collector.events) / max(collector.requests, 1)
+        logger.info(
+            f"📦 {scroll_ticks} scroll ticks -> {scroll_events} scroll events in {collector.requests} requests "
+            f"({events_per_request:.1f} events/request), {storm_requests} requests during the {storm_ms:.0f}ms storm "
+            f"({requests_per_second:.1f} req/s)"
+        )
+
+        assert scroll_events >= 1, "❌ No scroll event was sent"
+        assert requests_per_second <= max_requests_per_second, (
+            f"❌ Expected at most {max_requests_per_second:.1f} requests/s during the storm, got {requests_per_second:.1f}"
+        )
+        assert events_per_request > 1, (
+            f"❌ Expected events to be batched, got {len(collector.events)} events in {collector.requests} requests"
+        )
+        assert scroll_events <= scroll_ticks / 3, (
+            f"❌ Expected scrolls to be throttled to at most 1 event per 3 ticks, got {scroll_events} events "
+            f"for {scroll_ticks} ticks"
+        )
+        assert collector.requests <= scroll_ticks / 3, (
+            f"❌ Expected at most 1 HTTP request per 3 scroll ticks, got {collector.requests} requests "
+            f"for {scroll_ticks} ticks"
+        )
+
+    @pytest.mark.reuse_page
     @allure.title("Seek to near end of video and validate end state")
     @pytest.mark.flaky(reruns=3, reruns_delay=2)
     @pytest.mark.video
     def test_seek_to_end(self, page):
         video = VideoPage(page)
-        video.navigate()
 
         with allure.step("Get video duration"):
             duration = video.get_duration()
@@ -85,18 +145,12 @@ class TestEdgeCases:
 
         with allure.step("Seek to near-end of video (duration - 0.5s)"):
             video.seek(duration - 0.5)
-            page.wait_for_timeout(1000)
+            video.wait_until_seeked()
 
         with allure.step("Play the video briefly to trigger end"):
             video.play()
-            page.wait_for_timeout(2000)
+            video.wait_until_ended()
 
         with allure.step("Assert video ended"):
-            is_ended = video.page.evaluate(
-                """() => {
-                    const video = document.querySelector("#video");
-                    return video.ended;
-                }"""
-            )
-            assert is_ended, "❌ Video did not reach ended state"
+            video.assert_is_ended()
             logger.info("✅ Video successfully reached ended state")
@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+import pytest
+import allure
+from utils.media_route import MediaCache, parse_range
+
+CLIP = bytes(range(256)) * 4  # 1024 bytes
+CLIP_URL = "https://example.com/media/clip.mp4"
+
+
+class FakeRoute:
+    """Records what MediaCache.handle() answers instead of sending it to a browser."""
+
+    def __init__(self, url: str, headers: dict):
+        self.request = SimpleNamespace(url=url, headers=headers)
+        self.response = None
+        self.continued = False
+
+    def fulfill(self, status: int, headers: dict, body: bytes):
+        self.response = SimpleNamespace(status=status, headers=headers, body=body)
+
+    def continue_(self):
+        self.continued = True
+
+
+def offline_download(url, path):
+    raise OSError("offline")
+
+
+@pytest.fixture
+def clip_cache(tmp_path):
+    """A MediaCache over a directory that already holds the clip, so nothing is downloaded."""
+    (tmp_path / "clip.mp4").write_bytes(CLIP)
+    return MediaCache(tmp_path)
+
+
+@allure.epic("Test Infrastructure")
+@allure.feature("Local media route")
+class TestParseRange:
+
+    @allure.title("Range '{header}' of a 1000 byte file is {expected}")
+    @pytest.mark.parametrize("header, expected", [
+        (None, None),
+        ("", None),
+        ("bytes=0-99", (0, 99)),
+        ("bytes=500-", (500, 999)),          # open-ended
+        ("bytes=-100", (900, 999)),          # suffix
+        ("bytes=-2000", (0, 999)),           # suffix longer than the file
+        ("bytes=900-5000", (900, 999)),      # end past the file
+        ("bytes=0-99,200-299", (0, 99)),     # multi-range: only the first range is served
+        (" bytes=1-1 ", (1, 1)),
+        ("bytes=-", None),                   # malformed: serve the whole file
+        ("items=0-99", None),
+    ])
+    def test_satisfiable(self, header, expected):
+        assert parse_range(header, 1000) == expected
+
+    @allure.title("Range '{header}' of a 1000 byte file is unsatisfiable")
+    @pytest.mark.parametrize("header", ["bytes=1000-", "bytes=2000-3000", "bytes=500-100", "bytes=-0"])
+    def test_unsatisfiable(self, header):
+        with pytest.raises(ValueError):
+            parse_range(header, 1000)
+
+
+@allure.epic("Test Infrastructure")
+@allure.feature("Local media route")
+class TestMediaCacheRoute:
+
+    @allure.title("A request without Range gets the whole clip")
+    def test_full_response(self, clip_cache):
+        route = FakeRoute(CLIP_URL, {})
+        clip_cache.handle(route)
+
+        assert route.response.status == 200
+        assert route.response.body == CLIP
+        assert route.response.headers["Content-Length"] == str(len(CLIP))
+        assert route.response.headers["Accept-Ranges"] == "bytes"
+        assert route.response.headers["Content-Type"] == "video/mp4"
+
+    @allure.title("A Range request gets 206 with the requested bytes")
+    def test_partial_response(self, clip_cache):
+        route = FakeRoute(CLIP_URL, {"range": "bytes=1000-"})
+        clip_cache.handle(route)
+
+        assert route.response.status == 206
+        assert route.response.body == CLIP[1000:]
+        assert route.response.headers["Content-Range"] == f"bytes 1000-1023/{len(CLIP)}"
+        assert route.response.headers["Content-Length"] == "24"
+
+    @allure.title("An unsatisfiable Range gets 416 with the clip size")
+    def test_unsatisfiable_response(self, clip_cache):
+        route = FakeRoute(CLIP_URL, {"range": "bytes=5000-"})
+        clip_cache.handle(route)
+
+        assert route.response.status == 416
+        assert route.response.body == b""
+        assert route.response.headers["Content-Range"] == f"bytes */{len(CLIP)}"
+
+    @allure.title("A clip that is not available locally is loaded from the network")
+    def test_missing_clip_continues(self, tmp_path, monkeypatch):
+        cache = MediaCache(tmp_path)
+        monkeypatch.setattr(cache, "_download", offline_download)
+        route = FakeRoute("https://example.com/media/other.mp4", {})
+        cache.handle(route)
+
+        assert route.continued and route.response is None
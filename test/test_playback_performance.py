@@ -0,0 +1,37 @@
+import pytest
+import allure
+import logging
+from pages.video_page import VideoPage
+from utils.playback_metrics import PlaybackBudgets
+
+logger = logging.getLogger(__name__)
+
+
+@allure.epic("Player Performance")
+@allure.feature("Playback budgets")
+@pytest.mark.video
+@pytest.mark.perf
+@pytest.mark.usefixtures("perf_profile")
+class TestPlaybackPerformance:
+    """
+    Measures the player inside the browser and fails like a functional test when it gets slower than its
+    budgets: time to first frame, seek latency, stalls and dropped frames. Budgets are read from
+    PLAYBACK_* env vars, e.g. PLAYBACK_MAX_SEEK_MS=500 pytest -m perf --profile perf
+    """
+
+    @allure.title("Playback starts, seeks and plays within the performance budgets")
+    def test_playback_within_budgets(self, page):
+        video = VideoPage(page, budgets=PlaybackBudgets.from_env())
+        video.navigate()
+
+        video.play()
+        with allure.step("Let the video play for a second"):
+            video.wait_for_state("s => s.currentTime >= 1")
+
+        for seconds in (5, 2, 7):
+            video.seek(seconds)
+        video.wait_until_playing()
+        video.pause()
+
+        metrics = video.assert_playback_budgets()
+        logger.info(f"🎞️ Playback metrics: {metrics.summary()}")
@@ -0,0 +1,126 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import allure
+import logging
+from utils.replay_events import batched, read_capture, replay, schedule
+
+logger = logging.getLogger(__name__)
+
+# Received 0 s, 0.5 s, 0.52 s and 2 s after the first event
+CAPTURE = [
+    {"seq": 1, "receivedAt": "2024-05-01T10:00:00.000Z", "type": "play", "timestamp": "2024-05-01T09:59:59.900Z"},
+    {"seq": 2, "receivedAt": "2024-05-01T10:00:00.500Z", "type": "pause", "timestamp": "2024-05-01T10:00:00.400Z"},
+    {"seq": 3, "receivedAt": "2024-05-01T10:00:00.520Z", "type": "seek", "timestamp": "2024-05-01T10:00:00.410Z"},
+    {"seq": 4, "receivedAt": "2024-05-01T10:00:02.000Z", "type": "ended", "timestamp": "2024-05-01T10:00:01.900Z"},
+]
+
+
+@pytest.fixture
+def capture_path(tmp_path):
+    """The CAPTURE as a JSONL file with a blank line and a torn last line, as left by a killed server."""
+    path = tmp_path / "events.jsonl"
+    lines = [json.dumps(record) for record in CAPTURE]
+    lines.insert(2, "")
+    path.write_text("\n".join(lines) + '\n{"seq": 5, "receivedAt": "2024-05-01T10:0', encoding="utf-8")
+    return path
+
+
+class _EventHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.received.append((self.path, body))
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def event_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _EventHandler)
+    server.received = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def offsets(scheduled) -> list[float]:
+    return [round(at, 3) for at, _ in scheduled]
+
+
+@allure.epic("Test Infrastructure")
+@allure.feature("Event capture replay")
+class TestReplayEvents:
+
+    @allure.title("Captures are read in order, skipping blank and torn lines")
+    def test_read_capture(self, capture_path):
+        records = list(read_capture(capture_path))
+
+        assert [record["seq"] for record in records] == [1, 2, 3, 4]
+
+    @allure.title("Real-time replay keeps the captured gaps and drops the capture fields")
+    def test_schedule_real_time(self, capture_path):
+        scheduled = list(schedule(read_capture(capture_path), speed=1.0))
+
+        assert offsets(scheduled) == [0.0, 0.5, 0.52, 2.0]
+        assert [event["type"] for _, event in scheduled] == ["play", "pause", "seek", "ended"]
+        assert all("seq" not in event and "receivedAt" not in event for _, event in scheduled), \
+            "❌ Capture fields were replayed"
+
+    @allure.title("Replay at 4x shrinks the gaps fourfold")
+    def test_schedule_speed_up(self, capture_path):
+        assert offsets(schedule(read_capture(capture_path), speed=4.0)) == [0.0, 0.125, 0.13, 0.5]
+
+    @allure.title("Max speed sends every event immediately, in capture order")
+    def test_schedule_max_speed(self, capture_path):
+        scheduled = list(schedule(read_capture(capture_path), speed=None))
+
+        assert offsets(scheduled) == [0.0] * 4
+        assert [event["type"] for _, event in scheduled] == ["play", "pause", "seek", "ended"]
+
+    @allure.title("Events without receivedAt are scheduled by their own timestamp")
+    def test_schedule_falls_back_to_timestamp(self):
+        records = [{key: value for key, value in record.items() if key != "receivedAt"} for record in CAPTURE]
+
+        assert offsets(schedule(records, speed=1.0)) == [0.0, 0.5, 0.51, 2.0]
+
+    @allure.title("Batches group events due within the window")
+    def test_batches_follow_the_window(self, capture_path):
+        groups = list(batched(schedule(read_capture(capture_path), speed=1.0), batch_size=10, window=0.05))
+
+        assert [len(events) for _, events in groups] == [1, 2, 1]
+        assert [round(at, 3) for at, _ in groups] == [0.0, 0.5, 2.0]
+
+    @allure.title("Batches hold at most batch_size events")
+    def test_batches_are_capped(self, capture_path):
+        groups = list(batched(schedule(read_capture(capture_path), speed=None), batch_size=3, window=float("inf")))
+
+        assert [len(events) for _, events in groups] == [3, 1]
+        assert [event["type"] for _, events in groups for event in events] == ["play", "pause", "seek", "ended"]
+
+    @allure.title("Batched replay posts the batches to the bulk endpoint")
+    def test_replay_batched(self, capture_path, event_server):
+        url = f"http://127.0.0.1:{event_server.server_address[1]}"
+        stats = replay(capture_path, url, speed=None, batch_size=2, concurrency=1)
+        logger.info(stats.summary())
+
+        assert stats.errors == 0 and stats.sent_events == 4 and stats.requests == 2
+        assert [path for path, _ in event_server.received] == ["/api/events", "/api/events"]
+        assert [len(body["events"]) for _, body in event_server.received] == [2, 2]
+
+    @allure.title("Paced replay takes the captured time divided by the speed")
+    def test_replay_paced(self, capture_path, event_server):
+        url = f"http://127.0.0.1:{event_server.server_address[1]}"
+        stats = replay(capture_path, url, speed=4.0, concurrency=1)
+        logger.info(stats.summary())
+
+        assert stats.errors == 0 and stats.requests == 4
+        assert [body["type"] for _, body in event_server.received] == ["play", "pause", "seek", "ended"]
+        # The last event is due 2 s / 4 after the first one
+        assert 0.5 <= stats.elapsed < 1.5, f"❌ Replay at 4x took {stats.elapsed:.2f}s"
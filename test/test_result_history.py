@@ -0,0 +1,113 @@
+import math
+import pytest
+import allure
+import logging
+from utils.analyze_report_using_ai import RESULT_COLUMNS
+from utils.result_history import REGRESSION_COLUMNS, duration_regressions, flakiness_table
+from utils.result_store import ResultStore
+
+logger = logging.getLogger(__name__)
+# Runs start this far apart, attempts within a run one second apart
+RUN_SPACING_MS = 3_600_000
+
+
+@pytest.fixture
+def seed_store(tmp_path):
+    """
+    Returns a function that stores synthetic runs in a fresh ResultStore and loads its whole history back.
+    Each run is a list of (test_name, status, duration_seconds) attempts in the order they ran.
+    """
+    def seed(runs):
+        store = ResultStore(tmp_path / "history.sqlite", columns=RESULT_COLUMNS)
+        for run_index, attempts in enumerate(runs):
+            parsed = []
+            for attempt, (test_name, status, duration) in enumerate(attempts):
+                path = tmp_path / f"run{run_index}-{attempt}-result.json"
+                path.write_text("{}", encoding="utf-8")
+                row = dict.fromkeys(RESULT_COLUMNS, "N/A")
+                row.update(test_name=test_name, status=status, duration_seconds=duration,
+                           start_ms=run_index * RUN_SPACING_MS + attempt * 1000, history_id=f"history-{test_name}",
+                           uuid=f"uuid-{run_index}-{attempt}", video_path=None)
+                parsed.append((str(path), tuple(row[column] for column in RESULT_COLUMNS)))
+            store.upsert(parsed, run_id=f"run-{run_index}")
+        return store.load()
+    return seed
+
+
+def durations_runs(durations_per_test: dict) -> list:
+    """Turns {test_name: [duration per run]} into runs of one passed attempt per test."""
+    run_count = len(next(iter(durations_per_test.values())))
+    return [[(name, "passed", durations[run]) for name, durations in durations_per_test.items()]
+            for run in range(run_count)]
+
+
+@allure.epic("Report Analyzer")
+@allure.feature("Result history analytics")
+class TestResultHistory:
+
+    @allure.title("Reruns that end in a pass count as flaky, reruns that end failed as hard failures")
+    def test_flakiness_table(self, seed_store):
+        history = seed_store([
+            [("flaky", "failed", 1.0), ("flaky", "passed", 1.0), ("broken", "failed", 1.0),
+             ("broken", "broken", 1.0), ("stable", "passed", 2.0)],
+            [("flaky", "passed", 1.0), ("broken", "passed", 1.0), ("stable", "passed", 4.0)],
+            [("flaky", "failed", 1.0), ("flaky", "failed", 1.0), ("flaky", "passed", 3.0),
+             ("broken", "passed", 1.0), ("stable", "passed", 6.0)],
+            [("flaky", "passed", 1.0), ("broken", "passed", 1.0), ("stable", "passed", 8.0)],
+        ])
+        table = flakiness_table(history, window=2).set_index("test_name")
+        logger.info(f"\n{table}")
+
+        assert list(table.index) == ["flaky", "broken", "stable"], "❌ Not sorted flakiest first"
+        flaky, broken, stable = (table.loc[name] for name in ("flaky", "broken", "stable"))
+        assert (flaky.runs, flaky.flaky_runs, flaky.hard_failures, flaky.reruns) == (4, 2, 0, 3)
+        assert flaky.flake_rate == 0.5
+        assert (broken.runs, broken.flaky_runs, broken.hard_failures, broken.reruns) == (4, 0, 1, 1)
+        assert (stable.flake_rate, stable.reruns) == (0, 0)
+        # Rolling percentiles of the last 2 passed attempts: 6 s and 8 s
+        assert stable.rolling_p50 == 7.0
+        assert stable.rolling_p95 == pytest.approx(7.9)
+
+    @allure.title("A test that got slower in the recent runs is reported, a steady one isn't")
+    def test_duration_regression(self, seed_store):
+        history = seed_store(durations_runs({
+            "slower": [10.0, 10.2, 9.8, 10.1, 9.9, 15.0, 15.2, 14.9],
+            "steady": [10.0, 10.2, 9.8, 10.1, 9.9, 10.0, 10.3, 9.9],
+        }))
+        report = duration_regressions(history, recent_runs=3)
+        logger.info(f"\n{report}")
+
+        assert list(report.columns) == list(REGRESSION_COLUMNS)
+        assert list(report["test_name"]) == ["slower"]
+        slower = report.iloc[0]
+        assert (slower.baseline_median, slower.recent_median) == (10.0, 15.0)
+        assert (slower.baseline_samples, slower.recent_samples) == (5, 3)
+        assert slower.increase == pytest.approx(0.5)
+        # Baseline MAD is 0.1 s
+        assert slower.z_score == pytest.approx(5.0 / (1.4826 * 0.1))
+
+    @allure.title("With identical baseline durations (MAD 0) only a slowdown above min_increase is reported")
+    def test_duration_regression_zero_mad(self, seed_store):
+        history = seed_store(durations_runs({
+            "constant_then_slow": [5.0] * 5 + [6.5] * 3,
+            "constant_then_jitter": [5.0] * 5 + [5.05] * 3,
+            "constant": [5.0] * 8,
+        }))
+        report = duration_regressions(history, recent_runs=3, min_increase=0.2)
+        logger.info(f"\n{report}")
+
+        assert list(report["test_name"]) == ["constant_then_slow"]
+        assert math.isinf(report.iloc[0].z_score)
+        assert report.iloc[0].increase == pytest.approx(0.3)
+
+    @allure.title("Tests with fewer than min_baseline earlier attempts aren't judged")
+    def test_duration_regression_needs_baseline(self, seed_store):
+        history = seed_store(durations_runs({"new": [1.0, 1.0, 9.0, 9.0, 9.0]}))
+
+        assert duration_regressions(history, recent_runs=3, min_baseline=5).empty
+
+    @allure.title("A single run has nothing to compare against")
+    def test_duration_regression_single_run(self, seed_store):
+        report = duration_regressions(seed_store(durations_runs({"only": [1.0]})), recent_runs=3)
+
+        assert report.empty and list(report.columns) == list(REGRESSION_COLUMNS)
@@ -2,12 +2,14 @@ import pytest
 import allure
 import logging
 from pages.video_page import VideoPage
+from utils.event_collector import EventCollector
 
 logger = logging.getLogger(__name__)
 
 
 @allure.epic("Sanity Test Suite")
 @pytest.mark.sanity
+@pytest.mark.reuse_page
 class TestVideoSanity:
     """
     This class it's a sanity test suite which can run as part of the CI/CD pipeline,
@@ -18,7 +20,6 @@ class TestVideoSanity:
     @pytest.mark.flaky(reruns=3, reruns_delay=2)
     def test_play_video(self, page):
         video = VideoPage(page)
-        video.navigate()
         video.play()
         video.assert_is_playing()
 
@@ -26,7 +27,6 @@ class TestVideoSanity:
     @pytest.mark.flaky(reruns=3, reruns_delay=2)
     def test_pause_video(self, page):
         video = VideoPage(page)
-        video.navigate()
         video.play()
         video.pause()
         video.assert_is_paused()
@@ -35,7 +35,6 @@ class TestVideoSanity:
     @pytest.mark.flaky(reruns=3, reruns_delay=2)
     def test_seek_video(self, page):
         video = VideoPage(page)
-        video.navigate()
         video.seek(10)  # Seek to 10 seconds
         video.assert_seek_position(min_expected=9)
 
@@ -43,20 +42,9 @@ class TestVideoSanity:
     @pytest.mark.flaky(reruns=3, reruns_delay=2)
     def test_scroll_event(self, page):
         video = VideoPage(page)
-        video.navigate()
-
-        events = []
-
-        def handle_request(request):
-            if "/api/event" in request.url:
-                json_data = request.post_data_json
-                if json_data.get("type") == "scroll":
-                    events.append(json_data)
-
-        page.on("request", handle_request)
-        video.scroll()
-        page.wait_for_timeout(2000)
-        page.remove_listener("request", handle_request)
+        with EventCollector(page) as collector:
+            video.scroll()
+            events = collector.wait_for("scroll", count=1)
 
         assert events, "❌ No scroll event was captured"
         logger.info(f"✅ Scroll event captured: {events[0]}")
@@ -0,0 +1,133 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import allure
+import logging
+from utils.server_readiness import SharedServer, wait_for_server
+
+logger = logging.getLogger(__name__)
+
+
+class _HealthHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def health_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _HealthHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def dead_pid() -> int:
+    """PID of a process that has already exited."""
+    if os.name != "posix":
+        pytest.skip("dead workers are only detected on POSIX")
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def failing_start():
+    raise RuntimeError("boom")
+
+
+def write_state(shared: SharedServer, state: dict):
+    shared.state_dir.mkdir(parents=True, exist_ok=True)
+    shared.state_path.write_text(json.dumps(state), encoding="utf-8")
+
+
+@allure.epic("Test Infrastructure")
+@allure.feature("Server readiness")
+class TestWaitForServer:
+
+    @allure.title("A server that answers 200 is reported up")
+    def test_server_up(self, health_url):
+        assert wait_for_server(health_url, timeout=5)
+
+    @allure.title("A server that doesn't answer is reported down once the timeout passes")
+    def test_server_down(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]  # free again once closed, nothing listens there
+        start = time.monotonic()
+
+        assert not wait_for_server(f"http://127.0.0.1:{port}/", timeout=0.5, request_timeout=0.2)
+        assert time.monotonic() - start < 3, "❌ wait_for_server overran its timeout"
+
+
+@allure.epic("Test Infrastructure")
+@allure.feature("Server readiness")
+class TestSharedServer:
+
+    @allure.title("The first worker starts the server, the others get its info")
+    def test_owner_starts_others_wait(self, tmp_path):
+        owner = SharedServer(tmp_path, "gw0", None, start_timeout=5)
+        other = SharedServer(tmp_path, "gw1", None, start_timeout=5)
+        started, stopped = [], []
+
+        assert owner.acquire(lambda: started.append(1) or {"url": "x"}) == {"url": "x"}
+        assert other.acquire(lambda: pytest.fail("❌ Started twice")) == {"url": "x"}
+        assert owner.is_owner and not other.is_owner
+
+        other.release(lambda: pytest.fail("❌ Stopped by a worker that doesn't own it"))
+        owner.release(lambda: stopped.append(1))
+        assert started == [1] and stopped == [1]
+        assert not owner.state_path.exists(), "❌ State file left behind"
+
+    @allure.title("Workers fail fast when the owner could not start the server")
+    def test_failed_start(self, tmp_path):
+        owner = SharedServer(tmp_path, "gw0", None, start_timeout=5)
+        other = SharedServer(tmp_path, "gw1", None, start_timeout=5)
+
+        with pytest.raises(RuntimeError, match="boom"):
+            owner.acquire(failing_start)
+        with pytest.raises(RuntimeError, match="failed to start"):
+            other.acquire(lambda: None)
+
+    @allure.title("A failed state left by an earlier session is started over")
+    def test_stale_failed_state_is_discarded(self, tmp_path, dead_pid):
+        shared = SharedServer(tmp_path, "gw0", None, start_timeout=5)
+        write_state(shared, {"status": "failed", "owner": "gw3", "workers": {"gw3": dead_pid}})
+
+        assert shared.acquire(lambda: "fresh") == "fresh"
+        assert shared.is_owner
+
+    @allure.title("A waiting worker doesn't wait for an owner that is gone")
+    def test_dead_owner_while_starting(self, tmp_path, dead_pid):
+        shared = SharedServer(tmp_path, "gw1", None, start_timeout=30)
+        write_state(shared, {"status": "starting", "owner": "gw0", "workers": {"gw0": dead_pid, "gw2": os.getpid()}})
+        start = time.monotonic()
+
+        with pytest.raises(RuntimeError, match="exited before"):
+            shared.acquire(lambda: None)
+        assert time.monotonic() - start < 5, "❌ Waited for a dead owner"
+
+    @allure.title("The owner stops the server without waiting for crashed workers")
+    def test_release_skips_dead_workers(self, tmp_path, dead_pid):
+        owner = SharedServer(tmp_path, "gw0", None, stop_timeout=60)
+        owner.acquire(lambda: None)
+        state = json.loads(owner.state_path.read_text(encoding="utf-8"))
+        state["workers"]["gw1"] = dead_pid
+        write_state(owner, state)
+        stopped = []
+        start = time.monotonic()
+
+        owner.release(lambda: stopped.append(1))
+        assert stopped == [1]
+        assert time.monotonic() - start < 5, "❌ Waited for a crashed worker"
@@ -0,0 +1,51 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+import allure
+import logging
+from utils.duration_history import allure_test_case_id
+
+logger = logging.getLogger(__name__)
+TEST_DIR = Path(__file__).resolve().parent
+
+
+def collect(*args) -> list[str]:
+    """Node ids a separate pytest session collects with the repo's configuration (including its addopts)."""
+    env = {key: value for key, value in os.environ.items() if not key.startswith("PYTEST_XDIST")}
+    completed = subprocess.run(
+        [sys.executable, "-m", "pytest", "--collect-only", "-q", "-p", "no:phase_timing", "-p", "no:cacheprovider",
+         *args],
+        cwd=TEST_DIR, env=env, capture_output=True, text=True, timeout=120
+    )
+    # Exit code 5: nothing collected, e.g. an empty shard
+    assert completed.returncode in (0, 5), f"❌ Collection failed:\n{completed.stdout}{completed.stderr}"
+    return [line for line in completed.stdout.splitlines() if re.match(r"^\S+\.py::", line)]
+
+
+@allure.epic("Test Infrastructure")
+@allure.feature("Sharding")
+class TestSharding:
+
+    @allure.title("Shards split only the tests left after the default -m deselection")
+    def test_shards_split_selected_tests(self, tmp_path):
+        selected = collect()
+        heavy = collect("-m", "load or perf or infra")
+        # Every selected test weighs the same, so the shards must differ by at most one test. The deselected load,
+        # perf and infra tests weigh a lot: balancing them too would leave one shard with (almost) all selected tests.
+        history = tmp_path / "allure-results"
+        history.mkdir()
+        for i, nodeid in enumerate(selected + heavy):
+            duration_ms = 1000_000 if nodeid in heavy else 1000
+            # Parametrized variants share the testCaseId, their own historyId keeps them separate attempts
+            result = {"status": "passed", "start": 1, "stop": 1 + duration_ms,
+                      "testCaseId": allure_test_case_id(nodeid), "historyId": f"history-{i}"}
+            (history / f"{i}-result.json").write_text(json.dumps(result), encoding="utf-8")
+        shards = [collect(f"--duration-history={history}", f"--shard={i}/2") for i in (1, 2)]
+        logger.info(f"🧩 {len(selected)} selected tests -> shards of {[len(shard) for shard in shards]}")
+
+        assert sorted(shards[0] + shards[1]) == sorted(selected), "❌ Shards don't cover exactly the selected tests"
+        assert abs(len(shards[0]) - len(shards[1])) <= 1, f"❌ Unbalanced shards: {[len(s) for s in shards]}"
+        assert heavy and not set(heavy) & set(selected), "❌ Load, perf or infra tests were selected by default"
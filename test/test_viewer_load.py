@@ -0,0 +1,31 @@
+import pytest
+import allure
+import logging
+from utils.viewer_simulation import ViewerSimulationConfig, run_viewer_simulation
+
+logger = logging.getLogger(__name__)
+
+
+@allure.epic("Backend API Performance")
+@allure.feature("Concurrent viewers end to end")
+@pytest.mark.load
+@pytest.mark.usefixtures("perf_profile")
+class TestViewerLoad:
+    """
+    Runs several real player pages against the server at once, each viewer playing, pausing, seeking and
+    scrolling on its own schedule, and checks that the server ingests their events completely and fast enough.
+    Viewer count, duration and budgets are read from E2E_LOAD_* env vars, e.g.
+    E2E_LOAD_VIEWERS=20 pytest -m load --profile perf. Runs once per browser in --browsers.
+    """
+
+    @allure.title("The server keeps up with concurrent viewers' events")
+    def test_concurrent_viewers(self, browser_pool, browser_name, media_cache, server_url):
+        config = ViewerSimulationConfig.from_env()
+        browser = browser_pool.browser(browser_name)
+        result = run_viewer_simulation(browser.new_context, server_url, config, media_cache)
+
+        logger.info(f"👥 Viewer load result: {result.summary()}")
+        allure.attach(result.summary(), name="Viewer load summary", attachment_type=allure.attachment_type.TEXT)
+
+        violations = result.budget_violations()
+        assert not violations, f"❌ Viewer load budgets exceeded: {'; '.join(violations)} ({result.summary()})"
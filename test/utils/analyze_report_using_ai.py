@@ -1,222 +1,394 @@
+import argparse
 import os
+import re
 import json
-import pandas as pd
-import google.generativeai as genai
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 import sys
+import time
 import logging
 
+try:
+    # Optional, several times faster than the stdlib parser on large result files
+    import orjson as _json_backend
+except ImportError:
+    _json_backend = json
+
+if __package__ in (None, ""):
+    # Allow running as a script: make the test/ directory importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# pandas, the result store/history analytics and the LLM SDK are imported where they are used,
+# so that e.g. the plain summary starts without loading any of them
+from utils.failure_clustering import IncrementalClusterer, cluster_failures, error_signature  # noqa: E402
+from utils.llm_backends import LLMBackend, create_backend  # noqa: E402
+from utils.llm_cache import LLMResponseCache  # noqa: E402
+from utils.result_watcher import ResultWatcher, RunningAggregates  # noqa: E402
+
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 LOGGER = logging.getLogger(__name__)
 
-# --- Global Path Variables (No direct 'import config' here) ---
-script_dir = Path(__file__).resolve().parent  # Path to test/utils/ (assuming script is here)
-# CORRECTED: project_root needs to go up 2 levels from 'test/utils/' to the project root
-project_root = script_dir.parent.parent  # Path to my_automation_project/ (root)
+VIDEO_EXTENSIONS = ('.webm', '.mp4', '.avi', '.mov')
+UUID_PATTERN = re.compile(r'[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}')
+FAILURE_PROMPT_INSTRUCTION = (
+    "Given the following error messages from failed automation tests, "
+    "identify common patterns, suggest potential root causes, and recommend actionable steps to investigate or fix:"
+)
+RESULT_COLUMNS = ('test_name', 'status', 'duration_seconds', 'start_ms', 'description', 'error_message', 'epic', 'feature',
+                  'suite', 'sub_suite', 'test_case_id', 'history_id', 'uuid', 'video_path')
+
+
+def parse_result_file(filepath):
+    """
+    Parses one Allure *-result.json file into a row of RESULT_COLUMNS (video_path is filled in by the caller).
+    Module level so it can run in a process pool.
+    :param filepath: Full path to the result file.
+    :return: Tuple of column values, or None if the file could not be parsed.
+    """
+    try:
+        with open(filepath, 'rb') as f:
+            data = _json_backend.loads(f.read())
+
+        status = data.get('status', 'unknown')
+        start_time_ms = data.get('start')
+        stop_time_ms = data.get('stop')
+
+        duration_seconds = 0
+        if start_time_ms is not None and stop_time_ms is not None:
+            duration_seconds = (stop_time_ms - start_time_ms) / 1000.0
+
+        error_message = None
+        if status == 'failed':
+            if 'statusDetails' in data:
+                if 'message' in data['statusDetails']:
+                    error_message = data['statusDetails']['message']
+                elif 'trace' in data['statusDetails']:
+                    error_message = data['statusDetails']['trace'].split('\n')[0]
+
+        labels = {label['name']: label['value'] for label in data.get('labels', [])}
+        return (
+            data.get('name', 'N/A'),
+            status,
+            duration_seconds,
+            start_time_ms,
+            data.get('description', ''),
+            error_message,
+            labels.get('epic', 'N/A'),
+            labels.get('feature', 'N/A'),
+            labels.get('suite', 'N/A'),
+            labels.get('subSuite', 'N/A'),
+            data.get('testCaseId', 'N/A'),
+            data.get('historyId'),
+            data.get('uuid', 'N/A'),
+            None,
+        )
+    except ValueError as e:  # json.JSONDecodeError and orjson.JSONDecodeError both subclass ValueError
+        LOGGER.info(f"Error decoding JSON from {filepath}: {e}")
+    except Exception as e:
+        LOGGER.info(f"An unexpected error occurred while processing {filepath}: {e}")
+    return None
+
+
+def read_result_status(filepath):
+    """Status of one result file, None when it can't be read. Used by the pandas-free quick summary."""
+    try:
+        with open(filepath, 'rb') as f:
+            return _json_backend.loads(f.read()).get('status', 'unknown')
+    except Exception as e:
+        LOGGER.info(f"An unexpected error occurred while processing {filepath}: {e}")
+        return None
+
+
+def format_summary(status_counts):
+    """
+    :param status_counts: Mapping of status -> number of results.
+    """
+    total_tests = sum(status_counts.values())
+    passed_tests = status_counts.get('passed', 0)
+    failed_tests = status_counts.get('failed', 0)
+    skipped_tests = status_counts.get('skipped', 0)
+
+    pass_rate = (passed_tests / total_tests) * 100 if total_tests > 0 else 0
+
+    summary = f"""
+        --- Automation Report Summary ---
+        Total Tests: {total_tests}
+        Passed: {passed_tests}
+        Failed: {failed_tests}
+        Skipped: {skipped_tests}
+        Pass Rate: {pass_rate:.2f}%
+        ---------------------------------
+        """
+    return summary
 
 
 class AllureReportAnalyzer:
     # CORRECTED: Default reports_path and videos_path should reflect 'test/'
     def __init__(self, reports_path="../reports/allure-results",
-                 videos_path="../videos"):
+                 videos_path="../videos", store_path=None, llm_cache_path="../reports/llm-cache",
+                 llm_cache_ttl=7 * 24 * 3600, llm_backend=None):
         """
         Initializes the report analyzer with LLM capabilities.
+        Nothing is read and no LLM is contacted here; results are loaded by load_allure_results() and
+        the LLM backend is created the first time an LLM feature is used.
         :param reports_path: Relative path from test/utils/ to the Allure results directory.
                              Example: "../reports/allure-results"
         :param videos_path: Relative path from test/utils/ to the videos directory.
                              Example: "../videos"
+        :param store_path: Optional relative path from test/utils/ to a SQLite result store. When set, only new or
+                           changed result files are parsed and every loaded result is kept as history.
+                             Example: "../reports/results-history.sqlite"
+        :param llm_cache_path: Relative path from test/utils/ to the LLM response cache, None disables caching.
+        :param llm_cache_ttl: Seconds a cached LLM response stays valid.
+        :param llm_backend: An LLMBackend instance, or the name of one ("gemini", "stub", "none").
+                            Defaults to the LLM_BACKEND env var, then "gemini".
         """
         self.reports_path = reports_path
         self.videos_path_relative_to_script = videos_path
         self.full_videos_path = self._resolve_videos_path()
-
-        self.test_results = []
-        self.df_results = pd.DataFrame()
-
-        self.llm_model = None
-
-        # --- Logic to load API Key ---
-        api_key = os.getenv("GOOGLE_API_KEY")
-
-        if not api_key:
-            try:
-                if 'config' not in sys.modules:
-                    if str(project_root) not in sys.path:
-                        sys.path.insert(0, str(project_root))
-                    import config as local_config
-                else:
-                    local_config = sys.modules['config']
-
-                api_key = getattr(local_config, 'GOOGLE_API_KEY', None)
-                if api_key == "YOUR_GEMINI_API_KEY_HERE":
-                    api_key = None
-            except ImportError:
-                LOGGER.info("Warning: 'config.py' not found for local API key loading. This is expected in CI/CD.")
-                api_key = None
-            except Exception as e:
-                LOGGER.info(f"Warning: Error reading GOOGLE_API_KEY from config.py: {e}")
-                api_key = None
-            finally:
-                if 'config' not in sys.modules and str(project_root) in sys.path:
-                    sys.path.remove(str(project_root))
-        # --- End API Key Logic ---
-
-        # Final check for API key and LLM initialization
-        if not api_key:
-            LOGGER.info(
-                "ERROR: GOOGLE_API_KEY not found in environment variables or config.py. LLM features will NOT be available.")
-        else:
-            try:
-                genai.configure(api_key=api_key)
-
-                available_models = [
-                    m.name for m in genai.list_models()
-                    if 'generateContent' in m.supported_generation_methods
-                ]
-
-                if "models/gemini-pro" in available_models:
-                    self.llm_model = genai.GenerativeModel('gemini-pro')
-                    LOGGER.info("LLM model 'gemini-pro' initialized successfully.")
-                elif available_models:
-                    recommended_model = available_models[0]
-                    self.llm_model = genai.GenerativeModel(recommended_model)
-                    LOGGER.info(
-                        f"LLM model 'gemini-pro' not directly available. Initialized with '{recommended_model}'.")
-                else:
-                    LOGGER.info(
-                        "ERROR: No LLM models supporting 'generateContent' found with this API key/region. LLM features will NOT be available.")
-                    self.llm_model = None
-
-            except Exception as e:
-                LOGGER.info(
-                    f"ERROR: Failed to initialize LLM model due to an API error: {e}. LLM features will NOT be available.")
-                self.llm_model = None
+        self.store_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), store_path) if store_path else None
+        self._store = None
+        self.llm_cache = None
+        if llm_cache_path:
+            self.llm_cache = LLMResponseCache(os.path.join(os.path.dirname(os.path.abspath(__file__)), llm_cache_path),
+                                              ttl_seconds=llm_cache_ttl)
+
+        # pandas DataFrame once load_allure_results() ran
+        self.df_results = None
+        self._video_index = None
+
+        self._llm_backend = llm_backend
+        self._llm_model = None
+        self._llm_resolved = isinstance(llm_backend, LLMBackend)
+        if self._llm_resolved:
+            self._llm_model = llm_backend
+
+    @property
+    def llm_model(self):
+        """The LLM backend, created on first access; None when LLM features are not available."""
+        if not self._llm_resolved:
+            self._llm_model = create_backend(self._llm_backend)
+            self._llm_resolved = True
+        return self._llm_model
+
+    @property
+    def store(self):
+        """The ResultStore, opened on first access; None when no store_path was given."""
+        if self._store is None and self.store_path:
+            from utils.result_store import ResultStore
+            self._store = ResultStore(self.store_path, columns=RESULT_COLUMNS)
+        return self._store
+
+    def _has_results(self):
+        return self.df_results is not None and not self.df_results.empty
 
     def _resolve_videos_path(self):
         """Resolves the absolute path to the videos directory."""
         return os.path.abspath(os.path.join(os.path.dirname(__file__), self.videos_path_relative_to_script))
 
+    def _index_videos(self):
+        """
+        Scans the videos directory once and maps every UUID found in a video file name to that file.
+        :return: Dict of UUID -> full path of the video file.
+        """
+        index = {}
+        if not os.path.exists(self.full_videos_path):
+            return index
+
+        with os.scandir(self.full_videos_path) as entries:
+            for entry in entries:
+                if entry.name.endswith(VIDEO_EXTENSIONS):
+                    for test_uuid in UUID_PATTERN.findall(entry.name):
+                        index.setdefault(test_uuid, entry.path)
+        return index
+
     def _find_video_for_test_by_uuid(self, test_uuid):
         """
-        Attempts to find a video file associated with a test UUID in the videos directory.
+        Looks up the video file associated with a test UUID in the videos directory.
         Assumes video files are named using the test's UUID (or contain it).
         :param test_uuid: The UUID of the test.
         :return: Full path to the video file if found, otherwise None.
         """
-        if not os.path.exists(self.full_videos_path):
-            return None
-
-        for filename in os.listdir(self.full_videos_path):
-            if filename.endswith(('.webm', '.mp4', '.avi', '.mov')):
-                if test_uuid in filename:
-                    return os.path.join(self.full_videos_path, filename)
+        if self._video_index is None:
+            self._video_index = self._index_videos()
+        return self._video_index.get(test_uuid)
 
-        return None
-
-    def load_allure_results(self):
+    def load_allure_results(self, max_workers=None, use_processes=False, run_id=None):
         """
         Loads all *-result.json files from the specified reports directory,
         extracts relevant data, and attempts to link associated video files.
+        :param max_workers: Size of the parser pool, defaults to the executor's own default.
+        :param use_processes: Parse in a process pool instead of threads, worth it for thousands of large files.
+        :param run_id: Identifies this run in the history, defaults to GITHUB_RUN_ID or the current time.
+        """
+        run_id = run_id or os.getenv("GITHUB_RUN_ID") or f"local-{int(time.time())}"
+
+        result_files = self._list_result_files()
+        if result_files is None:
+            return
+
+        # Index the videos once instead of listing the directory again for every result
+        self._video_index = self._index_videos()
+
+        if self.store is None:
+            rows = [row for _, row in self._parse_files(result_files, max_workers, use_processes)]
+            self.df_results = self._frame_from_rows(rows, run_id)
+        else:
+            stale_files = self.store.stale_files(result_files)
+            LOGGER.info(f"{len(stale_files)} of {len(result_files)} result files are new or changed since the last run.")
+            self.store.upsert(self._parse_files(stale_files, max_workers, use_processes), run_id=run_id)
+            self.df_results = self.store.load(result_files)
+
+        self._attach_video_paths()
+        LOGGER.info(f"Loaded {len(self.df_results)} test results.")
+
+    def _attach_video_paths(self):
+        """Fills df_results' video_path from the video index, None (not NaN) for tests without a video."""
+        video_paths = self.df_results['uuid'].map(self._video_index)
+        self.df_results['video_path'] = video_paths.astype(object).where(video_paths.notna(), None)
+
+    @staticmethod
+    def _frame_from_rows(rows, run_id):
+        """Builds the results frame column by column instead of from a list of per-row dicts."""
+        import pandas as pd
+
+        columns = dict(zip(RESULT_COLUMNS, map(list, zip(*rows)))) if rows else {name: [] for name in RESULT_COLUMNS}
+        return pd.DataFrame(columns, columns=list(RESULT_COLUMNS)).assign(run_id=run_id)
+
+    def _full_reports_path(self):
+        return os.path.abspath(os.path.join(os.path.dirname(__file__), self.reports_path))
+
+    def _list_result_files(self):
+        """
+        :return: Full paths of all *-result.json files, or None if the reports directory doesn't exist.
         """
-        full_reports_path = os.path.abspath(os.path.join(os.path.dirname(__file__), self.reports_path))
+        full_reports_path = self._full_reports_path()
         LOGGER.info(f"Searching for Allure result files in: {full_reports_path}")
 
         if not os.path.exists(full_reports_path):
             LOGGER.info(f"Error: The reports path '{full_reports_path}' does not exist. Please ensure it's correct.")
-            return
+            return None
+
+        with os.scandir(full_reports_path) as entries:
+            result_files = [entry.path for entry in entries if entry.name.endswith("-result.json")]
 
-        found_files = False
-        for filename in os.listdir(full_reports_path):
-            if filename.endswith("-result.json"):
-                found_files = True
-                filepath = os.path.join(full_reports_path, filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-
-                    test_name = data.get('name', 'N/A')
-                    status = data.get('status', 'unknown')
-                    start_time_ms = data.get('start')
-                    stop_time_ms = data.get('stop')
-                    description = data.get('description', '')
-                    error_message = None
-                    test_uuid = data.get('uuid', 'N/A')
-
-                    duration_seconds = 0
-                    if start_time_ms is not None and stop_time_ms is not None:
-                        duration_seconds = (stop_time_ms - start_time_ms) / 1000.0
-
-                    if status == 'failed':
-                        if 'statusDetails' in data:
-                            if 'message' in data['statusDetails']:
-                                error_message = data['statusDetails']['message']
-                            elif 'trace' in data['statusDetails']:
-                                error_message = data['statusDetails']['trace'].split('\n')[0]
-
-                    labels = {label['name']: label['value'] for label in data.get('labels', [])}
-                    epic = labels.get('epic', 'N/A')
-                    feature = labels.get('feature', 'N/A')
-                    suite = labels.get('suite', 'N/A')
-                    sub_suite = labels.get('subSuite', 'N/A')
-                    test_case_id = data.get('testCaseId', 'N/A')
-
-                    video_path = self._find_video_for_test_by_uuid(test_uuid)
-
-                    self.test_results.append({
-                        'test_name': test_name,
-                        'status': status,
-                        'duration_seconds': duration_seconds,
-                        'description': description,
-                        'error_message': error_message,
-                        'epic': epic,
-                        'feature': feature,
-                        'suite': suite,
-                        'sub_suite': sub_suite,
-                        'test_case_id': test_case_id,
-                        'uuid': test_uuid,
-                        'video_path': video_path
-                    })
-                except json.JSONDecodeError as e:
-                    LOGGER.info(f"Error decoding JSON from {filepath}: {e}")
-                except Exception as e:
-                    LOGGER.info(f"An unexpected error occurred while processing {filepath}: {e}")
-
-        if not found_files:
+        if not result_files:
             LOGGER.info(
                 f"No '-result.json' files found in '{full_reports_path}'. Please ensure your Allure reports are generated there.")
+        return result_files
 
-        self.df_results = pd.DataFrame(self.test_results)
-        LOGGER.info(f"Loaded {len(self.df_results)} test results.")
+    def _parse_files(self, result_files, max_workers=None, use_processes=False):
+        """
+        Parses result files in a thread or process pool.
+        :return: List of (path, row) pairs for the files that could be parsed.
+        """
+        executor = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        # Large chunks keep the inter-process overhead low, threads don't need them
+        chunksize = max(len(result_files) // (4 * (max_workers or os.cpu_count() or 1)), 1) if use_processes else 1
+        with executor(max_workers=max_workers) as pool:
+            rows = pool.map(parse_result_file, result_files, chunksize=chunksize)
+            return [(path, row) for path, row in zip(result_files, rows) if row is not None]
+
+    def load_history(self):
+        """
+        Returns every result kept in the store across runs, or an empty DataFrame when no store is configured.
+        """
+        import pandas as pd
+        from utils.result_store import ResultStore
+
+        if self.store is None:
+            return pd.DataFrame(columns=list(RESULT_COLUMNS) + [ResultStore.RUN_COLUMN])
+        return self.store.load()
+
+    def _history_or_current(self):
+        """The whole stored history when a store is configured, otherwise just the loaded run."""
+        if self.store is not None:
+            return self.load_history()
+        return self.df_results if self.df_results is not None else self.load_history()
+
+    def analyze_flakiness(self, window=20):
+        """
+        Per-test flake rate, reruns spent and rolling duration percentiles over the run history.
+        :param window: Number of recent passed attempts the rolling p50/p95 durations look at.
+        :return: DataFrame sorted flakiest first (see result_history.flakiness_table).
+        """
+        import pandas as pd
+        from utils.result_history import flakiness_table
+
+        results = self._history_or_current()
+        if results.empty:
+            return pd.DataFrame()
+        return flakiness_table(results, window)
+
+    def find_duration_regressions(self, recent_runs=3, **thresholds):
+        """
+        Tests whose durations in the last `recent_runs` runs are significantly above their history.
+        :param thresholds: min_baseline, z_threshold and min_increase of result_history.duration_regressions.
+        """
+        import pandas as pd
+        from utils.result_history import duration_regressions
+
+        results = self._history_or_current()
+        if results.empty:
+            return pd.DataFrame()
+        return duration_regressions(results, recent_runs=recent_runs, **thresholds)
+
+    def get_flakiness_report(self, top=10):
+        """
+        Returns a readable summary of the flakiest tests and of duration regressions.
+        """
+        import pandas as pd
+
+        flakiness = self.analyze_flakiness()
+        if flakiness.empty:
+            return "No test results to analyze for flakiness."
+
+        details = "--- Flakiness (flakiest first) ---\n"
+        flaky = flakiness[(flakiness['flaky_runs'] > 0) | (flakiness['reruns'] > 0)].head(top)
+        if flaky.empty:
+            details += "No flaky tests or reruns found.\n"
+        for _, row in flaky.iterrows():
+            details += (f"{row['test_name']}: flaky in {row['flaky_runs']}/{row['runs']} runs "
+                        f"({row['flake_rate']:.0%}), {row['reruns']} reruns")
+            if pd.notna(row['rolling_p50']):
+                details += f", p50 {row['rolling_p50']:.2f}s p95 {row['rolling_p95']:.2f}s"
+            details += "\n"
+
+        details += "--- Duration Regressions ---\n"
+        regressions = self.find_duration_regressions()
+        if regressions.empty:
+            details += "No significant duration regressions found.\n"
+        for _, row in regressions.head(top).iterrows():
+            details += (f"{row['test_name']}: {row['baseline_median']:.2f}s -> {row['recent_median']:.2f}s "
+                        f"(+{row['increase']:.0%}, z={row['z_score']:.1f})\n")
+        return details
 
     def analyze_summary(self):
         """
         Performs a basic statistical analysis of the test results and returns a summary string.
         """
-        if self.df_results.empty:
+        if not self._has_results():
             return "No test results to analyze."
+        return format_summary(self.df_results['status'].value_counts().to_dict())
 
-        total_tests = len(self.df_results)
-        passed_tests = self.df_results[self.df_results['status'] == 'passed'].shape[0]
-        failed_tests = self.df_results[self.df_results['status'] == 'failed'].shape[0]
-        skipped_tests = self.df_results[self.df_results['status'] == 'skipped'].shape[0]
-
-        pass_rate = (passed_tests / total_tests) * 100 if total_tests > 0 else 0
-
-        summary = f"""
-        --- Automation Report Summary ---
-        Total Tests: {total_tests}
-        Passed: {passed_tests}
-        Failed: {failed_tests}
-        Skipped: {skipped_tests}
-        Pass Rate: {pass_rate:.2f}%
-        ---------------------------------
+    def quick_summary(self, max_workers=None):
         """
-        return summary
+        Same summary as analyze_summary(), computed straight from the result files without pandas or a store.
+        Only each file's status is read, which makes this the fast path for a plain pass/fail overview.
+        """
+        result_files = self._list_result_files()
+        if not result_files:
+            return "No test results to analyze."
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            statuses = [status for status in pool.map(read_result_status, result_files) if status is not None]
+        return format_summary(Counter(statuses))
 
     def get_failed_tests_details(self):
         """
         Returns a detailed string of information for all failed tests, including video links.
         """
+        if not self._has_results():
+            return "No failed tests found in this report."
         failed_df = self.df_results[self.df_results['status'] == 'failed']
         if failed_df.empty:
             return "No failed tests found in this report."
@@ -244,35 +416,126 @@ class AllureReportAnalyzer:
         if self.llm_model is None:
             return "LLM model is not initialized. Please ensure GOOGLE_API_KEY is correctly set in config.py."
 
+        full_prompt = f"{prompt_instruction}\n\nText: {text_to_analyze}"
         try:
-            full_prompt = f"{prompt_instruction}\n\nText: {text_to_analyze}"
-            response = self.llm_model.generate_content(full_prompt)
-            return response.text
+            # Resolving the name may already need the API (e.g. Gemini's model discovery)
+            model_name = self.llm_model.name
+            if self.llm_cache:
+                cached = self.llm_cache.get(model_name, full_prompt)
+                if cached is not None:
+                    return cached
+            response = self.llm_model.generate(full_prompt)
         except Exception as e:
             return f"Error accessing the LLM model: {e}"
+        # Only successful answers are cached, errors are retried next time
+        if self.llm_cache:
+            self.llm_cache.put(model_name, full_prompt, response)
+        return response
 
     def analyze_failures_with_llm(self):
         """
         Analyzes error messages of failed tests using the LLM and provides aggregated insights.
+        Failures are clustered first (see failure_clustering), so each distinct problem costs one LLM call.
         """
         if self.llm_model is None:
             return "LLM model is not initialized. Cannot analyze failures with LLM."
 
+        if not self._has_results():
+            return "No failed tests to analyze with LLM."
         failed_df = self.df_results[self.df_results['status'] == 'failed']
         if failed_df.empty:
             return "No failed tests to analyze with LLM."
 
-        all_failure_messages = failed_df['error_message'].dropna().unique().tolist()
-        if not all_failure_messages:
+        clusters = cluster_failures(zip(failed_df['test_name'], failed_df['error_message']))
+        if not clusters:
             return "No specific error messages found in failed tests for LLM analysis."
 
-        combined_text = "\n".join(all_failure_messages)
-        LOGGER.info("\n--- LLM Analysis of Failures ---")
-        prompt_instruction = (
-            "Given the following error messages from failed automation tests, "
-            "identify common patterns, suggest potential root causes, and recommend actionable steps to investigate or fix:"
-        )
-        return self.get_llm_insights(combined_text, prompt_instruction)
+        LOGGER.info(f"\n--- LLM Analysis of Failures ({len(clusters)} clusters) ---")
+        insights = ""
+        for number, cluster in enumerate(clusters, start=1):
+            affected_tests = sorted(set(cluster.test_names))
+            insights += (f"--- Cluster {number}: {len(cluster.test_names)} failures in {len(affected_tests)} tests ---\n"
+                         f"Tests: {', '.join(affected_tests)}\n"
+                         f"{self._get_cluster_insights(cluster)}\n")
+        return insights
+
+    def _get_cluster_insights(self, cluster):
+        # Only masked text goes into the prompt: test names, timings and ids differ between runs of the same
+        # failure and would make every run miss the cache
+        examples = sorted({error_signature(message) for message in cluster.messages} - {cluster.signature})
+        text = f"Error signature: {cluster.signature}"
+        if examples:
+            text += "\nSimilar signatures:\n" + "\n".join(examples)
+        return self.get_llm_insights(text, FAILURE_PROMPT_INSTRUCTION)
+
+    def watch(self, poll_interval=1.0, idle_timeout=None, stop_event=None, analyze_failures=True, run_id=None):
+        """
+        Follows the reports directory while the tests are still running: every new result file updates the
+        running pass/fail/duration totals and a live summary is logged. The first failure of each new failure
+        cluster is sent to the LLM right away, in the background, so insights show up before the run ends.
+        When watching stops, df_results holds everything that was seen (and the store, if any, is updated),
+        like after load_allure_results().
+        :param poll_interval: Seconds between directory scans (new files wake the scan earlier if watchdog is installed).
+        :param idle_timeout: Stop after this many seconds without new results, None to watch until stopped.
+        :param stop_event: Optional threading.Event that stops watching when set.
+        :param analyze_failures: Send new failure clusters to the LLM (needs an LLM backend).
+        :param run_id: As in load_allure_results().
+        :return: The RunningAggregates of the watched results.
+        """
+        run_id = run_id or os.getenv("GITHUB_RUN_ID") or f"local-{int(time.time())}"
+        full_reports_path = self._full_reports_path()
+        LOGGER.info(f"Watching for Allure result files in: {full_reports_path}")
+
+        aggregates = RunningAggregates()
+        clusterer = IncrementalClusterer()
+        parsed, parsed_paths = [], set()
+        llm_pool = ThreadPoolExecutor(max_workers=1) if analyze_failures and self.llm_model else None
+        last_result_at = time.monotonic()
+
+        def report_cluster(cluster):
+            LOGGER.info(f"\n--- LLM Insight for new failure: {cluster.signature} ---\n"
+                        f"{self._get_cluster_insights(cluster)}")
+
+        try:
+            with ResultWatcher(full_reports_path, poll_interval) as watcher:
+                while stop_event is None or not stop_event.is_set():
+                    added = 0
+                    for path in watcher.wait_for_new_files():
+                        if path in parsed_paths:
+                            continue
+                        row = parse_result_file(path)
+                        if row is None:
+                            # Most likely caught half-written, the watcher hands it out again once it changes
+                            continue
+                        parsed_paths.add(path)
+                        parsed.append((path, row))
+                        result = dict(zip(RESULT_COLUMNS, row))
+                        aggregates.add(result)
+                        added += 1
+                        if result['status'] == 'failed':
+                            cluster, is_new = clusterer.add(result['test_name'], result['error_message'])
+                            if is_new and llm_pool:
+                                llm_pool.submit(report_cluster, cluster)
+
+                    if added:
+                        last_result_at = time.monotonic()
+                        LOGGER.info(f"[live] {aggregates.summary_line()}")
+                    elif idle_timeout is not None and time.monotonic() - last_result_at >= idle_timeout:
+                        LOGGER.info(f"No new results for {idle_timeout}s, stopping the watch.")
+                        break
+        except KeyboardInterrupt:
+            LOGGER.info("Watch interrupted.")
+        finally:
+            if llm_pool:
+                llm_pool.shutdown(wait=True)
+
+        if self.store is not None:
+            self.store.upsert(parsed, run_id=run_id)
+        self._video_index = self._index_videos()
+        self.df_results = self._frame_from_rows([row for _, row in parsed], run_id)
+        self._attach_video_paths()
+        LOGGER.info(f"Watched {len(self.df_results)} test results.")
+        return aggregates
 
     def get_llm_insight_for_specific_test(self, test_name):
         """
@@ -281,6 +544,8 @@ class AllureReportAnalyzer:
         if self.llm_model is None:
             return "LLM model is not initialized. Cannot get specific test insights."
 
+        if not self._has_results():
+            return f"Test '{test_name}' not found in the report."
         test_data = self.df_results[self.df_results['test_name'] == test_name]
         if test_data.empty:
             return f"Test '{test_name}' not found in the report."
@@ -304,12 +569,34 @@ class AllureReportAnalyzer:
 
 # --- How to Use (Main execution block) ---
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize Allure results and analyze failures with an LLM.")
+    parser.add_argument("--reports-path", default="../reports/allure-results",
+                        help="Allure results directory, absolute or relative to test/utils/ (e.g. a merged shard output)")
+    parser.add_argument("--summary-only", action="store_true",
+                        help="Print only the pass/fail summary (fast, no pandas, no LLM)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Follow the results directory while the tests are running and print a live summary")
+    parser.add_argument("--idle-timeout", type=float,
+                        help="With --watch, stop after this many seconds without new results")
+    parser.add_argument("--llm-backend", choices=("gemini", "stub", "none"),
+                        help="LLM backend, defaults to the LLM_BACKEND env var, then gemini")
+    args = parser.parse_args()
+
     analyzer = AllureReportAnalyzer(
-        reports_path="../reports/allure-results",
-        videos_path="../videos"
+        reports_path=args.reports_path,
+        videos_path="../videos",
+        store_path=os.getenv("RESULT_STORE_PATH", "../reports/results-history.sqlite"),
+        llm_backend=args.llm_backend
     )
 
-    analyzer.load_allure_results()
+    if args.summary_only:
+        LOGGER.info(analyzer.quick_summary())
+        sys.exit(0)
+
+    if args.watch:
+        analyzer.watch(idle_timeout=args.idle_timeout)
+    else:
+        analyzer.load_allure_results()
 
     summary = analyzer.analyze_summary()
     LOGGER.info(summary)
@@ -317,6 +604,8 @@ if __name__ == "__main__":
     failed_details = analyzer.get_failed_tests_details()
     LOGGER.info(failed_details)
 
+    LOGGER.info(analyzer.get_flakiness_report())
+
     if analyzer.llm_model:
         llm_failure_analysis_output = analyzer.analyze_failures_with_llm()
         LOGGER.info(llm_failure_analysis_output)
@@ -0,0 +1,122 @@
+from playwright.sync_api import Browser, BrowserContext, BrowserType, Error as PlaywrightError
+from utils.logger import logger
+
+BROWSER_NAMES = ("chromium", "firefox", "webkit")
+
+
+def parse_browser_names(value: str) -> list[str]:
+    """
+    :param value: Comma separated browser names, e.g. "firefox,chromium".
+    :return: The names in the given order, without duplicates.
+    """
+    names = list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in names if name not in BROWSER_NAMES]
+    if unknown or not names:
+        raise ValueError(f"Invalid browsers '{value}', expected a comma separated list of: {', '.join(BROWSER_NAMES)}")
+    return names
+
+
+class BrowserPool:
+    """
+    Keeps a single browser process alive for the whole session (one per xdist worker)
+    and hands out fresh, isolated contexts to each test.
+    If the browser crashes or gets disconnected, it is relaunched on the next request.
+    """
+
+    def __init__(self, browser_type: BrowserType, **launch_options):
+        """
+        :param browser_type: Playwright browser type to launch, e.g. playwright.firefox.
+        :param launch_options: Keyword arguments forwarded to browser_type.launch().
+        """
+        self.browser_type = browser_type
+        self.launch_options = launch_options
+        self._browser: Browser | None = None
+        self.launches = 0
+
+    def _launch(self) -> Browser:
+        self.launches += 1
+        logger.info(f"🚀 Launching {self.browser_type.name} (launch #{self.launches})")
+        browser = self.browser_type.launch(**self.launch_options)
+        browser.on("disconnected", self._on_disconnected)
+        return browser
+
+    def _on_disconnected(self, browser: Browser):
+        if browser is self._browser:
+            logger.info(f"💥 {self.browser_type.name} disconnected, it will be relaunched on next use")
+            self._browser = None
+
+    @property
+    def browser(self) -> Browser:
+        """Returns a connected browser, launching (or relaunching) it if needed."""
+        if self._browser is None or not self._browser.is_connected():
+            self._browser = self._launch()
+        return self._browser
+
+    def new_context(self, **context_options) -> BrowserContext:
+        """
+        Opens a new isolated context on the pooled browser.
+        A browser that died between the health check and the call is replaced once.
+        """
+        try:
+            return self.browser.new_context(**context_options)
+        except PlaywrightError as e:
+            if self._browser is not None and self._browser.is_connected():
+                raise
+            logger.info(f"♻️ Browser crashed while opening a context ({e}), relaunching")
+            self._browser = None
+            return self.browser.new_context(**context_options)
+
+    def close(self):
+        if self._browser is not None and self._browser.is_connected():
+            self._browser.close()
+        self._browser = None
+
+
+class ConnectedBrowserPool(BrowserPool):
+    """
+    Same as BrowserPool, but connects to a running browser server (see utils.browser_server) instead of
+    launching a browser. A dropped connection is re-established on the next request; closing the pool only
+    disconnects, the server belongs to whoever started it.
+    """
+
+    def __init__(self, browser_type: BrowserType, ws_endpoint: str, **connect_options):
+        """
+        :param ws_endpoint: Websocket endpoint of the browser server.
+        :param connect_options: Keyword arguments forwarded to browser_type.connect(), e.g. slow_mo.
+        """
+        super().__init__(browser_type, **connect_options)
+        self.ws_endpoint = ws_endpoint
+
+    def _launch(self) -> Browser:
+        self.launches += 1
+        logger.info(f"🔌 Connecting to {self.browser_type.name} at {self.ws_endpoint} (connection #{self.launches})")
+        browser = self.browser_type.connect(self.ws_endpoint, **self.launch_options)
+        browser.on("disconnected", self._on_disconnected)
+        return browser
+
+
+class LocalBrowserPools:
+    """One BrowserPool per browser name, each browser is launched by this process on first use."""
+    remote = False
+
+    def __init__(self, playwright, **launch_options):
+        self.playwright = playwright
+        self.launch_options = launch_options
+        self._pools: dict[str, BrowserPool] = {}
+
+    def _pool(self, browser_name: str) -> BrowserPool:
+        if browser_name not in self._pools:
+            self._pools[browser_name] = BrowserPool(getattr(self.playwright, browser_name), **self.launch_options)
+        return self._pools[browser_name]
+
+    def new_context(self, browser_name: str, **context_options) -> BrowserContext:
+        return self._pool(browser_name).new_context(**context_options)
+
+    def browser(self, browser_name: str) -> Browser:
+        """The pooled browser itself, for tests that open their own contexts (e.g. the viewer simulation)."""
+        return self._pool(browser_name).browser
+
+    def close(self):
+        for pool in self._pools.values():
+            pool.close()
+        self._pools.clear()
@@ -0,0 +1,260 @@
+"""
+Browser servers shared by all xdist workers on a host (--browser-servers N).
+
+Instead of every worker launching its own browser, the worker that owns the servers (see SharedServer)
+starts N Playwright browser servers per browser name and every worker connects to them over their websocket
+endpoint. Tests still get their own isolated context, but at most `contexts_per_server` contexts are open on a
+server at a time, so running more workers than the machine has cores for full browsers only makes them queue.
+
+Python Playwright has no BrowserType.launch_server(), the servers are started with the driver's
+`launch-server` command, which calls launchServer() in the driver and prints the websocket endpoint.
+"""
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from playwright.sync_api import Browser, BrowserContext
+from utils.browser_pool import ConnectedBrowserPool
+from utils.logger import logger
+from utils.server_readiness import file_lock, pid_alive
+
+
+def _camel_case(name: str) -> str:
+    return re.sub(r"_([a-z])", lambda m: m.group(1).upper(), name)
+
+
+class BrowserServer:
+    """One `playwright launch-server` process."""
+
+    def __init__(self, browser_name: str, log_path: Path, start_timeout: float = 60.0, **launch_options):
+        """
+        :param log_path: File the server's stderr goes to, its launch options are written next to it.
+        :param launch_options: launch_server() options in Python naming, e.g. headless=True.
+        """
+        self.browser_name = browser_name
+        self.log_path = Path(log_path)
+        self.start_timeout = start_timeout
+        self.launch_options = launch_options
+        self.ws_endpoint = None
+        self._proc = None
+        self._log = None
+
+    def start(self) -> str:
+        """Starts the server and returns its websocket endpoint once it is listening."""
+        try:
+            # Private API, imported only when servers are actually started (--browser-servers)
+            from playwright._impl._driver import compute_driver_executable, get_driver_env
+        except ImportError as e:
+            raise RuntimeError(f"❌ This Playwright version has no driver API to start browser servers with ({e}), "
+                               f"run without --browser-servers") from e
+        config_path = self.log_path.with_suffix(".json")
+        config_path.write_text(json.dumps({_camel_case(k): v for k, v in self.launch_options.items()}),
+                               encoding="utf-8")
+        # Run the driver directly, `python -m playwright` would leave it orphaned when terminated
+        driver_executable, driver_cli = compute_driver_executable()
+        self._log = open(self.log_path, "w", encoding="utf-8")
+        self._proc = subprocess.Popen(
+            [driver_executable, driver_cli, "launch-server", "--browser", self.browser_name,
+             "--config", str(config_path)],
+            env=get_driver_env(), stdout=subprocess.PIPE, stderr=self._log, text=True
+        )
+        # The endpoint is the only line the server prints; read it on a thread so the wait has a timeout
+        lines = []
+        reader = threading.Thread(target=lambda: lines.append(self._proc.stdout.readline()), daemon=True)
+        reader.start()
+        reader.join(self.start_timeout)
+        endpoint = lines[0].strip() if lines else ""
+        if not endpoint.startswith("ws"):
+            try:
+                # stdout closed early means the server is exiting
+                exit_code = self._proc.wait(timeout=5) if lines else None
+            except subprocess.TimeoutExpired:
+                exit_code = None
+            self.stop()
+            reason = f"exited with code {exit_code}" if exit_code is not None \
+                else f"did not start in {self.start_timeout:.0f}s"
+            raise RuntimeError(f"❌ {self.browser_name} server {reason}, see {self.log_path}")
+        self.ws_endpoint = endpoint
+        logger.info(f"🌐 {self.browser_name} server listening at {endpoint}")
+        return endpoint
+
+    def stop(self):
+        if self._proc is not None and self._proc.poll() is None:
+            self._proc.terminate()
+            try:
+                self._proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+                self._proc.wait()
+        if self._proc is not None:
+            self._proc.stdout.close()
+        if self._log is not None:
+            self._log.close()
+        self._proc = self._log = None
+
+
+class BrowserServerGroup:
+    """The browser servers of one host, started and stopped by the worker that owns them."""
+
+    def __init__(self, browser_names: list[str], servers_per_browser: int, log_dir: Path, **launch_options):
+        self.log_dir = Path(log_dir)
+        self.servers = [
+            BrowserServer(name, self.log_dir / f"{name}-{i}.log", **launch_options)
+            for name in browser_names for i in range(servers_per_browser)
+        ]
+
+    def start(self) -> dict[str, list[str]]:
+        """Starts every server in parallel and returns the endpoints by browser name."""
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=len(self.servers)) as executor:
+            futures = [executor.submit(server.start) for server in self.servers]
+        try:
+            for future in futures:
+                future.result()
+        except Exception:
+            self.stop()
+            raise
+        endpoints = {}
+        for server in self.servers:
+            endpoints.setdefault(server.browser_name, []).append(server.ws_endpoint)
+        return endpoints
+
+    def stop(self):
+        for server in self.servers:
+            server.stop()
+
+
+class ContextSlots:
+    """
+    Cross-process counting semaphore for the contexts open on one server.
+    Slot k is taken while the file slot-k.lock exists; it holds the owner's PID, so the slots of a worker
+    that crashed without releasing them can be reclaimed (only checked on POSIX). Reclaiming happens under
+    reclaim.lock, so two workers that both see the dead holder don't unlink each other's fresh slot.
+    """
+
+    def __init__(self, directory: Path, capacity: int):
+        self.directory = Path(directory)
+        self.capacity = capacity
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, slot: int) -> Path:
+        return self.directory / f"slot-{slot}.lock"
+
+    @staticmethod
+    def _holder_alive(path: Path) -> bool:
+        try:
+            pid = int(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            # Released in the meantime, or the holder is still writing its PID
+            return True
+        return pid_alive(pid)
+
+    def in_use(self) -> int:
+        return sum(self._path(slot).exists() for slot in range(self.capacity))
+
+    @staticmethod
+    def _create(path: Path) -> bool:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        return True
+
+    def _reclaim(self, path: Path) -> bool:
+        """Takes over a slot whose holder is gone; the holder is checked again under the lock."""
+        with file_lock(self.directory / "reclaim.lock"):
+            if not path.exists() or self._holder_alive(path):
+                return False
+            logger.info(f"♻️ Reclaiming {path} from a worker that is gone")
+            path.unlink()
+            return self._create(path)
+
+    def try_acquire(self) -> Path | None:
+        """:return: The slot's file, or None when every slot is taken."""
+        for slot in range(self.capacity):
+            path = self._path(slot)
+            if self._create(path):
+                return path
+            if not self._holder_alive(path) and self._reclaim(path):
+                return path
+        return None
+
+    @staticmethod
+    def release(path: Path):
+        path.unlink(missing_ok=True)
+
+
+class BrowserServerPool:
+    """
+    Worker side of the shared browser servers: one connection per server, and new contexts go to the
+    least busy server of the requested browser that has a free slot.
+    """
+    remote = True
+
+    def __init__(self, playwright, endpoints: dict[str, list[str]], slots_dir: Path, contexts_per_server: int,
+                 slot_timeout: float = 300.0, **connect_options):
+        """
+        :param endpoints: Websocket endpoints by browser name, as returned by BrowserServerGroup.start().
+        :param slots_dir: Directory shared by all workers that holds the context slots.
+        :param slot_timeout: How long new_context() waits for a free slot, in seconds.
+        :param connect_options: Keyword arguments forwarded to browser_type.connect(), e.g. slow_mo.
+        """
+        self.slot_timeout = slot_timeout
+        self._servers = {
+            name: [
+                (ConnectedBrowserPool(getattr(playwright, name), endpoint, **connect_options),
+                 ContextSlots(Path(slots_dir) / f"{name}-{i}", contexts_per_server))
+                for i, endpoint in enumerate(urls)
+            ]
+            for name, urls in endpoints.items()
+        }
+
+    def new_context(self, browser_name: str, **context_options) -> BrowserContext:
+        """Opens a context on a server with a free slot, waiting for one if all are busy."""
+        servers = self._servers.get(browser_name)
+        if not servers:
+            raise ValueError(f"No {browser_name} server was started, see --browsers")
+        deadline = time.monotonic() + self.slot_timeout
+        waited = False
+        while True:
+            for pool, slots in sorted(servers, key=lambda server: server[1].in_use()):
+                slot = slots.try_acquire()
+                if slot is None:
+                    continue
+                try:
+                    context = pool.new_context(**context_options)
+                except Exception:
+                    slots.release(slot)
+                    raise
+                # Also fires when the connection drops, so the slot is never kept by a dead context
+                context.on("close", lambda _: slots.release(slot))
+                return context
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"No free {browser_name} context slot after {self.slot_timeout:.0f}s")
+            if not waited:
+                logger.info(f"⏳ All {browser_name} servers are at their context limit, waiting for a slot")
+                waited = True
+            time.sleep(0.05)
+
+    def browser(self, browser_name: str) -> Browser:
+        """
+        The connection to the least busy server of `browser_name`, for tests that open their own contexts
+        (e.g. the viewer simulation, the shared pages of reuse_page tests). Those contexts don't count against
+        the per-server context limit.
+        """
+        servers = self._servers.get(browser_name)
+        if not servers:
+            raise ValueError(f"No {browser_name} server was started, see --browsers")
+        pool, _ = min(servers, key=lambda server: server[1].in_use())
+        return pool.browser
+
+    def close(self):
+        for servers in self._servers.values():
+            for pool, _ in servers:
+                pool.close()
@@ -0,0 +1,144 @@
+import hashlib
+import os
+import subprocess
+from pathlib import Path
+import requests
+from utils.logger import logger
+from utils.server_readiness import wait_for_server
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+# Everything that ends up in the image, see Dockerfile
+HASH_INPUTS = ("Dockerfile", "docker-compose.yml", "server", "client")
+HASH_EXCLUDED_DIRS = {"node_modules", "__pycache__"}
+INPUTS_HASH_LABEL = "minute_media.inputs-hash"
+SERVICE = "web"
+
+
+def inputs_hash(root: Path = PROJECT_ROOT) -> str:
+    """Content hash of the image inputs, so an image built from the same sources can be recognized."""
+    digest = hashlib.sha256()
+    for name in HASH_INPUTS:
+        path = root / name
+        files = [path] if path.is_file() else sorted(
+            p for p in path.rglob("*") if p.is_file() and not HASH_EXCLUDED_DIRS & set(p.relative_to(root).parts)
+        )
+        for file in files:
+            digest.update(file.relative_to(root).as_posix().encode())
+            digest.update(b"\0")
+            digest.update(file.read_bytes())
+            digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def is_healthy(url: str, timeout: float = 1.0) -> bool:
+    try:
+        return requests.get(url, timeout=timeout).status_code == 200
+    except requests.RequestException:
+        return False
+
+
+class DockerComposeServer:
+    """
+    Runs server/ through docker compose.
+    By default the image is rebuilt and the container is stopped at the end of the session.
+    In reuse mode a healthy server on the target port is attached to as is, the image is
+    rebuilt only when server/ or client/ changed, and the container is left running.
+    """
+
+    def __init__(self, url: str, log_path: Path, start_timeout: float = 120.0, reuse: bool = False):
+        self.url = url
+        self.log_path = log_path
+        self.start_timeout = start_timeout
+        self.reuse = reuse
+        self._proc = None
+        self._log = None
+
+    def _compose(self, *args, env=None) -> str:
+        result = subprocess.run(
+            ["docker", "compose", *args], cwd=PROJECT_ROOT, env=env,
+            capture_output=True, text=True, check=True
+        )
+        return result.stdout.strip()
+
+    def _label_of(self, *inspect_args) -> str | None:
+        try:
+            result = subprocess.run(
+                ["docker", *inspect_args, "--format", f'{{{{ index .Config.Labels "{INPUTS_HASH_LABEL}" }}}}'],
+                capture_output=True, text=True, check=True
+            )
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return None
+        return result.stdout.strip() or None
+
+    def running_container_id(self) -> str | None:
+        """ID of our running compose container, None if it isn't running (or docker isn't available)."""
+        try:
+            return self._compose("ps", "-q", "--status", "running", SERVICE) or None
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return None
+
+    def running_inputs_hash(self) -> str | None:
+        """Inputs hash of the image behind the running compose container, None if nothing is running."""
+        container_id = self.running_container_id()
+        return self._label_of("inspect", container_id) if container_id else None
+
+    def image_inputs_hash(self) -> str | None:
+        """Inputs hash of the image compose would run, None if it was never built."""
+        try:
+            image = self._compose("config", "--images").splitlines()[0]
+        except (subprocess.CalledProcessError, FileNotFoundError, IndexError):
+            return None
+        return self._label_of("image", "inspect", image)
+
+    def start(self):
+        if self.reuse:
+            self._start_reusing()
+            return
+
+        logger.info("🔧 Starting docker-compose...")
+        self._log = open(self.log_path, "wb")
+        self._proc = subprocess.Popen(
+            ["docker", "compose", "up", "--build"],
+            cwd=PROJECT_ROOT,
+            stdout=self._log,
+            stderr=subprocess.STDOUT
+        )
+        if not wait_for_server(self.url, timeout=self.start_timeout):
+            self.stop()
+            raise RuntimeError(f"❌ Server failed to start, see {self.log_path}")
+
+    def _start_reusing(self):
+        container_id = self.running_container_id()
+        # A healthy server that isn't our compose container (e.g. `npm start`) is attached to as is,
+        # our own container only while it still runs the current server/ and client/ sources
+        if container_id is None and is_healthy(self.url):
+            logger.info(f"♻️ Reusing the server already running at {self.url}")
+            return
+
+        current_hash = inputs_hash()
+        if container_id is not None and self._label_of("inspect", container_id) == current_hash:
+            logger.info("♻️ Compose service is already running from the current sources, waiting for it")
+        else:
+            needs_build = self.image_inputs_hash() != current_hash
+            logger.info(f"🔧 Starting docker-compose in the background ({'rebuilding' if needs_build else 'cached'} image)...")
+            args = ["up", "-d", "--build"] if needs_build else ["up", "-d"]
+            env = {**os.environ, "INPUTS_HASH": current_hash}
+            try:
+                with open(self.log_path, "wb") as log:
+                    subprocess.run(["docker", "compose", *args], cwd=PROJECT_ROOT, env=env,
+                                   stdout=log, stderr=subprocess.STDOUT, check=True)
+            except subprocess.CalledProcessError:
+                raise RuntimeError(f"❌ docker compose failed, see {self.log_path}") from None
+
+        if not wait_for_server(self.url, timeout=self.start_timeout):
+            raise RuntimeError(f"❌ Server failed to start, see {self.log_path}")
+
+    def stop(self):
+        if self.reuse:
+            logger.info("♻️ Leaving the server running for the next session")
+            return
+        logger.info("🧹 Shutting down docker-compose...")
+        self._proc.terminate()
+        self._proc.wait()
+        self._log.close()
+        logger.info("🛑 Server stopped.")
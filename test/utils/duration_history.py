@@ -0,0 +1,107 @@
+"""
+Expected test durations from earlier runs, used to schedule and shard tests by cost.
+
+Estimates come from the analyzer's result store (see ResultStore), or straight from an allure-results directory.
+A test's cost per run is the sum of all its attempts, so tests that usually need reruns count as expensive.
+Allure identifies a test function by testCaseId = md5(fullName); the same id is derived here from the pytest
+node id, so parametrized variants share their function's estimate.
+"""
+import json
+import os
+import sqlite3
+from collections import defaultdict
+from contextlib import closing
+from pathlib import Path
+from statistics import median
+from allure_commons.utils import md5
+
+DEFAULT_HISTORY_PATH = Path(__file__).resolve().parent.parent / "reports" / "results-history.sqlite"
+# Used for unknown tests when there is no history at all
+FALLBACK_DURATION = 1.0
+
+
+def allure_test_case_id(nodeid: str) -> str:
+    """
+    testCaseId Allure gives the test with this pytest node id, e.g.
+    'test/test_api_event.py::TestApiEvent::test_post_valid_event[x]' -> md5('test.test_api_event.TestApiEvent#test_post_valid_event')
+    """
+    filepath, *class_names, function = nodeid.split("::")
+    package = filepath.rsplit(".", 1)[0].replace("/", ".")
+    class_part = "".join(f".{name}" for name in class_names)
+    return md5(f"{package}{class_part}#{function.split('[', 1)[0]}")
+
+
+class DurationEstimates:
+    """
+    Median seconds per run of each known test.
+
+    Usage:
+        estimates = DurationEstimates.load("test/reports/results-history.sqlite")
+        estimates.estimate("test/test_edge_cases.py::TestEdgeCases::test_seek_to_end")
+    """
+
+    def __init__(self, by_test_case: dict[str, float], default: float | None = None):
+        self.by_test_case = by_test_case
+        # Unknown tests are assumed to be typical ones
+        self.default = default if default is not None else (
+            median(by_test_case.values()) if by_test_case else FALLBACK_DURATION)
+
+    def __len__(self):
+        return len(self.by_test_case)
+
+    def estimate(self, nodeid: str) -> float:
+        return self.by_test_case.get(allure_test_case_id(nodeid), self.default)
+
+    def is_known(self, nodeid: str) -> bool:
+        return allure_test_case_id(nodeid) in self.by_test_case
+
+    @classmethod
+    def _from_attempts(cls, attempts) -> "DurationEstimates":
+        """:param attempts: Iterable of (run_id, history_id, test_case_id, duration_seconds)."""
+        per_run = defaultdict(float)
+        for run_id, history_id, test_case_id, duration in attempts:
+            if test_case_id and test_case_id != 'N/A' and duration is not None:
+                per_run[(run_id, history_id or test_case_id, test_case_id)] += duration
+        by_test_case = defaultdict(list)
+        for (_, _, test_case_id), duration in per_run.items():
+            by_test_case[test_case_id].append(duration)
+        return cls({test_case_id: median(durations) for test_case_id, durations in by_test_case.items()})
+
+    @classmethod
+    def from_store(cls, db_path) -> "DurationEstimates":
+        with closing(sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)) as conn:
+            return cls._from_attempts(conn.execute(
+                "SELECT run_id, history_id, test_case_id, duration_seconds FROM results "
+                "WHERE status IN ('passed', 'failed', 'broken')"))
+
+    @classmethod
+    def from_results_dir(cls, results_dir) -> "DurationEstimates":
+        def attempts():
+            with os.scandir(results_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith("-result.json"):
+                        continue
+                    try:
+                        with open(entry.path, "r", encoding="utf-8") as f:
+                            data = json.load(f)
+                    except (OSError, ValueError):
+                        continue
+                    if data.get('status') in ('passed', 'failed', 'broken') and data.get('stop') and data.get('start'):
+                        yield None, data.get('historyId'), data.get('testCaseId'), (data['stop'] - data['start']) / 1000
+        return cls._from_attempts(attempts())
+
+    @classmethod
+    def load(cls, path=DEFAULT_HISTORY_PATH) -> "DurationEstimates":
+        """
+        :param path: A result store (.sqlite) or an allure-results directory. A missing or unreadable
+                     source gives empty estimates, so every test gets the same default.
+        """
+        path = Path(path)
+        try:
+            if path.is_dir():
+                return cls.from_results_dir(path)
+            if path.is_file():
+                return cls.from_store(path)
+        except (OSError, sqlite3.Error):
+            pass
+        return cls({})
@@ -0,0 +1,36 @@
+from xdist.scheduler import LoadScheduling
+from utils.duration_history import DurationEstimates
+
+
+class DurationScheduling(LoadScheduling):
+    """
+    xdist load scheduling that hands out the longest tests first (LPT).
+    Workers get one test at a time (plus the one test of lookahead xdist always needs), so whichever worker
+    becomes free takes the most expensive test that is left and the short ones fill the gaps at the end.
+    Enabled with --schedule-by-duration, see pytest_xdist_make_scheduler in conftest.py.
+    """
+
+    def __init__(self, config, log=None, estimates: DurationEstimates | None = None):
+        super().__init__(config, log)
+        self.estimates = estimates or DurationEstimates({})
+        self.maxschedchunk = 1
+        self._ordered = False
+
+    def _order_pending(self):
+        ordered = sorted(self.pending, key=lambda index: self.estimates.estimate(self.collection[index]),
+                         reverse=True)
+        # The initial distribution gives every worker two consecutive tests. Pairing the longest with the
+        # shortest of the first 2 * workers tests (1st + 4th, 2nd + 3rd for two workers) balances that start.
+        head_size = 2 * len(self.nodes)
+        if len(ordered) >= head_size:
+            head = ordered[:head_size]
+            ordered[:head_size] = [index for i in range(len(self.nodes)) for index in (head[i], head[-1 - i])]
+        self.pending[:] = ordered
+
+    def _send_tests(self, node, num):
+        if not self._ordered:
+            self._order_pending()
+            self._ordered = True
+            known = sum(self.estimates.is_known(nodeid) for nodeid in self.collection)
+            self.log(f"duration scheduling: {known} of {len(self.collection)} tests have a duration history")
+        super()._send_tests(node, num)
@@ -0,0 +1,80 @@
+import time
+from playwright.sync_api import Page, Request, TimeoutError as PlaywrightTimeoutError
+
+
+class EventCollector:
+    """
+    Collects the events the client posts to /api/event or, batched, to /api/events while attached to a page.
+    Instead of sleeping for a fixed time, tests call wait_for() and continue as soon as
+    the expected events were sent (or the deadline passes).
+
+    Usage:
+        with EventCollector(page) as collector:
+            video.scroll()
+            events = collector.wait_for("scroll", count=1)
+    """
+
+    def __init__(self, page: Page, url_part: str = "/api/event"):
+        self.page = page
+        self.url_part = url_part
+        self.events: list[dict] = []
+        self.requests = 0
+
+    def __enter__(self):
+        self.page.on("request", self._on_request)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.page.remove_listener("request", self._on_request)
+
+    def _is_event_request(self, request: Request) -> bool:
+        return request.method == "POST" and self.url_part in request.url
+
+    def _on_request(self, request: Request):
+        if self._is_event_request(request):
+            self.requests += 1
+            data = request.post_data_json
+            if isinstance(data, dict) and isinstance(data.get("events"), list):
+                # Batch sent by the client transport to /api/events
+                self.events.extend(data["events"])
+            elif data:
+                self.events.append(data)
+
+    def of_type(self, event_type: str) -> list[dict]:
+        return [event for event in self.events if event.get("type") == event_type]
+
+    def wait_for(self, event_type: str, count: int = 1, timeout: float = 5000) -> list[dict]:
+        """
+        Blocks until at least `count` events of `event_type` were sent or `timeout` ms passed.
+        :return: All collected events of that type, which may be fewer than `count` on timeout.
+        """
+        deadline = time.monotonic() + timeout / 1000
+        while len(self.of_type(event_type)) < count:
+            remaining_ms = (deadline - time.monotonic()) * 1000
+            if remaining_ms <= 0:
+                break
+            # Playwright dispatches events only while we are inside one of its calls,
+            # so no request can slip by between the count check above and this wait.
+            try:
+                self.page.wait_for_event("request", predicate=self._is_event_request, timeout=remaining_ms)
+            except PlaywrightTimeoutError:
+                break
+        return self.of_type(event_type)
+
+    def wait_until_quiet(self, quiet_ms: float, timeout: float = 10000) -> int:
+        """
+        Blocks until no event request was sent for `quiet_ms`, e.g. after a burst, when the number of events
+        the client will send is not known in advance.
+        :return: Number of requests collected so far.
+        """
+        deadline = time.monotonic() + timeout / 1000
+        while True:
+            remaining_ms = (deadline - time.monotonic()) * 1000
+            if remaining_ms <= 0:
+                break
+            try:
+                self.page.wait_for_event("request", predicate=self._is_event_request,
+                                         timeout=min(quiet_ms, remaining_ms))
+            except PlaywrightTimeoutError:
+                break
+        return self.requests
@@ -0,0 +1,64 @@
+import time
+import requests
+
+
+class EventSinkClient:
+    """
+    Reads back the events the server actually ingested, through GET /api/events.
+    Tests remember a cursor before acting and then fetch everything newer in one request,
+    instead of listening to every outgoing browser request.
+
+    Usage:
+        sink = EventSinkClient(server_url)
+        cursor = sink.cursor()
+        video.scroll()
+        events = sink.wait_for("scroll", since=cursor, user_id="user-123")
+    """
+
+    def __init__(self, base_url: str, session: requests.Session | None = None, request_timeout: float = 5.0):
+        self.url = base_url.rstrip("/") + "/api/events"
+        self.session = session or requests.Session()
+        self.request_timeout = request_timeout
+
+    def query(self, event_type: str | None = None, user_id: str | None = None, since: int = 0,
+              limit: int | None = None, wait_ms: float = 0) -> dict:
+        """
+        Raw query, returns {"events": [...], "cursor": int, "truncated": bool}.
+        :param wait_ms: Long-poll up to this many milliseconds while no event matches.
+        """
+        params = {"since": since, "wait": int(wait_ms)}
+        if event_type is not None:
+            params["type"] = event_type
+        if user_id is not None:
+            params["userId"] = user_id
+        if limit is not None:
+            params["limit"] = limit
+        response = self.session.get(self.url, params=params, timeout=self.request_timeout + wait_ms / 1000)
+        response.raise_for_status()
+        return response.json()
+
+    def cursor(self) -> int:
+        """Sequence number of the newest ingested event, pass it as `since` to only see later events."""
+        return self.query(limit=0)["cursor"]
+
+    def events(self, event_type: str | None = None, user_id: str | None = None, since: int = 0) -> list[dict]:
+        """All buffered events matching the filters, in one request."""
+        return self.query(event_type, user_id, since)["events"]
+
+    def wait_for(self, event_type: str | None = None, count: int = 1, user_id: str | None = None,
+                 since: int = 0, timeout: float = 5000) -> list[dict]:
+        """
+        Long-polls until `count` matching events newer than `since` were ingested or `timeout` ms passed.
+        :return: The matching events, which may be fewer than `count` on timeout.
+        """
+        deadline = time.monotonic() + timeout / 1000
+        events = []
+        cursor = since
+        while len(events) < count:
+            remaining_ms = (deadline - time.monotonic()) * 1000
+            if remaining_ms <= 0:
+                break
+            result = self.query(event_type, user_id, cursor, wait_ms=remaining_ms)
+            events.extend(result["events"])
+            cursor = result["cursor"]
+        return events
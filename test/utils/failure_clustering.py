@@ -0,0 +1,120 @@
+"""
+Groups failure messages so that each distinct problem is sent to the LLM once.
+
+First every message is reduced to a signature with the run-specific details (numbers, ids, paths, quoted values)
+masked, which merges exact repeats. Signatures that still read alike are then merged greedily by the Jaccard
+similarity of their word shingles.
+"""
+import re
+from dataclasses import dataclass, field
+
+# Order matters: UUIDs and hex ids before plain numbers, paths and URLs before words
+_MASKS = (
+    (re.compile(r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'), '<uuid>'),
+    (re.compile(r'0x[0-9a-fA-F]+'), '<hex>'),
+    (re.compile(r'https?://\S+'), '<url>'),
+    (re.compile(r'(?:[A-Za-z]:)?(?:[\\/][\w.\-]+){2,}'), '<path>'),
+    (re.compile(r'"[^"]*"|\'[^\']*\''), '<str>'),
+    (re.compile(r'\d+(?:\.\d+)?'), '<num>'),
+)
+_WORD = re.compile(r'<\w+>|\w+')
+# Distinct messages kept per cluster as examples for the prompt
+MAX_EXAMPLES = 3
+
+
+def error_signature(message: str) -> str:
+    """Masks the details that differ between otherwise identical failures, e.g. timings and element ids."""
+    signature = message.strip().splitlines()[0] if message and message.strip() else ''
+    for pattern, replacement in _MASKS:
+        signature = pattern.sub(replacement, signature)
+    return ' '.join(signature.split())
+
+
+def _shingles(signature: str, size: int = 3) -> frozenset:
+    words = _WORD.findall(signature.lower())
+    if len(words) < size:
+        return frozenset([tuple(words)])
+    return frozenset(tuple(words[i:i + size]) for i in range(len(words) - size + 1))
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+@dataclass
+class FailureCluster:
+    signature: str
+    # Up to MAX_EXAMPLES distinct original messages
+    messages: list[str] = field(default_factory=list)
+    test_names: list[str] = field(default_factory=list)
+    shingles: frozenset = field(default=frozenset(), repr=False)
+
+    @property
+    def representative(self) -> str:
+        """The first message of the cluster, used as its example in prompts."""
+        return self.messages[0]
+
+
+def cluster_failures(failures, similarity: float = 0.6) -> list[FailureCluster]:
+    """
+    :param failures: Iterable of (test_name, error_message) pairs.
+    :param similarity: Minimal Jaccard similarity of two signatures to put them into one cluster.
+    :return: Clusters, largest first.
+    """
+    by_signature: dict[str, FailureCluster] = {}
+    for test_name, message in failures:
+        if not message:
+            continue
+        signature = error_signature(message)
+        cluster = by_signature.setdefault(signature, FailureCluster(signature, shingles=_shingles(signature)))
+        if len(cluster.messages) < MAX_EXAMPLES and message not in cluster.messages:
+            cluster.messages.append(message)
+        cluster.test_names.append(test_name)
+
+    clusters: list[FailureCluster] = []
+    # Most frequent signatures first so they become the representatives
+    for candidate in sorted(by_signature.values(), key=lambda c: len(c.test_names), reverse=True):
+        for cluster in clusters:
+            if _jaccard(cluster.shingles, candidate.shingles) >= similarity:
+                extra = [m for m in candidate.messages if m not in cluster.messages]
+                cluster.messages.extend(extra[:MAX_EXAMPLES - len(cluster.messages)])
+                cluster.test_names.extend(candidate.test_names)
+                break
+        else:
+            clusters.append(candidate)
+    return sorted(clusters, key=lambda c: len(c.test_names), reverse=True)
+
+
+class IncrementalClusterer:
+    """
+    Assigns failures to clusters one at a time as they arrive, e.g. while a run is still going.
+    Unlike cluster_failures() the first failure of a kind becomes the representative, not the most frequent one.
+    """
+
+    def __init__(self, similarity: float = 0.6):
+        self.similarity = similarity
+        self.clusters: list[FailureCluster] = []
+        self._by_signature: dict[str, FailureCluster] = {}
+
+    def add(self, test_name: str, message: str):
+        """
+        :return: (cluster, is_new) where is_new tells that this failure started a new cluster,
+                 or (None, False) for an empty message.
+        """
+        if not message:
+            return None, False
+        signature = error_signature(message)
+        cluster = self._by_signature.get(signature)
+        is_new = False
+        if cluster is None:
+            shingles = _shingles(signature)
+            cluster = next((c for c in self.clusters if _jaccard(c.shingles, shingles) >= self.similarity), None)
+            if cluster is None:
+                cluster = FailureCluster(signature, shingles=shingles)
+                self.clusters.append(cluster)
+                is_new = True
+            self._by_signature[signature] = cluster
+        if len(cluster.messages) < MAX_EXAMPLES and message not in cluster.messages:
+            cluster.messages.append(message)
+        cluster.test_names.append(test_name)
+        return cluster, is_new
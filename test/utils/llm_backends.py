@@ -0,0 +1,137 @@
+"""
+LLM backends of AllureReportAnalyzer behind one small interface: `name` identifies the backend in the
+response cache, `generate(prompt)` returns the response text and raises on errors.
+
+    gemini – Google Gemini; the SDK is imported and the model discovered on the first call, not at startup
+    stub   – local and deterministic, for offline runs and tests
+"""
+import abc
+import hashlib
+import logging
+import os
+import sys
+from pathlib import Path
+
+LOGGER = logging.getLogger(__name__)
+BACKEND_ENV_VAR = "LLM_BACKEND"
+project_root = Path(__file__).resolve().parent.parent.parent
+
+
+class LLMBackend(abc.ABC):
+    name = "base"
+
+    @abc.abstractmethod
+    def generate(self, prompt: str) -> str:
+        ...
+
+
+class StubBackend(LLMBackend):
+    """Answers every prompt with a digest of it, so equal prompts always get equal answers without a network."""
+    name = "stub"
+
+    def generate(self, prompt: str) -> str:
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+        text = prompt.split("Text:", 1)[-1].strip()
+        first_line = text.splitlines()[0] if text else ""
+        return f"[stub insight {digest}] {first_line}"
+
+
+class GeminiBackend(LLMBackend):
+    def __init__(self, api_key: str, preferred_model: str = "gemini-pro"):
+        self.api_key = api_key
+        self.preferred_model = preferred_model
+        self.model_name = None
+        self._model = None
+        self._error = None
+
+    @property
+    def name(self) -> str:
+        """
+        Names the model that was actually selected, so a fallback model's answers are not cached as the preferred
+        model's. Discovers the model on first access and raises like `model` when it is not available.
+        """
+        _ = self.model
+        return f"gemini:{self.model_name}"
+
+    def _discover_model(self):
+        import google.generativeai as genai
+
+        genai.configure(api_key=self.api_key)
+        available_models = [
+            m.name for m in genai.list_models()
+            if 'generateContent' in m.supported_generation_methods
+        ]
+        if f"models/{self.preferred_model}" in available_models:
+            LOGGER.info(f"LLM model '{self.preferred_model}' initialized successfully.")
+            self.model_name = self.preferred_model
+            return genai.GenerativeModel(self.preferred_model)
+        if available_models:
+            LOGGER.info(
+                f"LLM model '{self.preferred_model}' not directly available. Initialized with '{available_models[0]}'.")
+            self.model_name = available_models[0].removeprefix("models/")
+            return genai.GenerativeModel(available_models[0])
+        raise RuntimeError("No LLM models supporting 'generateContent' found with this API key/region.")
+
+    @property
+    def model(self):
+        """Discovered on first use; a failed discovery is remembered instead of retried for every prompt."""
+        if self._model is None and self._error is None:
+            try:
+                self._model = self._discover_model()
+            except Exception as e:
+                self._error = e
+                LOGGER.info(f"ERROR: Failed to initialize LLM model due to an API error: {e}.")
+        if self._error is not None:
+            raise RuntimeError(f"LLM model is not available: {self._error}")
+        return self._model
+
+    def generate(self, prompt: str) -> str:
+        return self.model.generate_content(prompt).text
+
+
+def resolve_google_api_key():
+    """GOOGLE_API_KEY from the environment, or from a local config.py in the project root."""
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if api_key:
+        return api_key
+    try:
+        if 'config' not in sys.modules:
+            if str(project_root) not in sys.path:
+                sys.path.insert(0, str(project_root))
+            import config as local_config
+        else:
+            local_config = sys.modules['config']
+
+        api_key = getattr(local_config, 'GOOGLE_API_KEY', None)
+        if api_key == "YOUR_GEMINI_API_KEY_HERE":
+            api_key = None
+    except ImportError:
+        LOGGER.info("Warning: 'config.py' not found for local API key loading. This is expected in CI/CD.")
+        api_key = None
+    except Exception as e:
+        LOGGER.info(f"Warning: Error reading GOOGLE_API_KEY from config.py: {e}")
+        api_key = None
+    finally:
+        if 'config' not in sys.modules and str(project_root) in sys.path:
+            sys.path.remove(str(project_root))
+    return api_key
+
+
+def create_backend(name=None):
+    """
+    :param name: "gemini", "stub" or "none"; defaults to the LLM_BACKEND env var, then "gemini".
+    :return: The backend, or None when LLM features are disabled or Gemini has no API key.
+    """
+    name = (name or os.getenv(BACKEND_ENV_VAR) or "gemini").lower()
+    if name == "none":
+        return None
+    if name == "stub":
+        return StubBackend()
+    if name == "gemini":
+        api_key = resolve_google_api_key()
+        if not api_key:
+            LOGGER.info(
+                "ERROR: GOOGLE_API_KEY not found in environment variables or config.py. LLM features will NOT be available.")
+            return None
+        return GeminiBackend(api_key)
+    raise ValueError(f"Unknown LLM backend '{name}', expected one of: gemini, stub, none")
@@ -0,0 +1,56 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+
+class LLMResponseCache:
+    """
+    Content-addressed on-disk cache of LLM responses: one JSON file per prompt, named by the SHA-256 of the
+    model name and prompt, so re-analyzing the same failures costs no API calls.
+    Entries older than `ttl_seconds` are ignored and removed; beyond `max_entries` the oldest files are evicted.
+    """
+
+    def __init__(self, cache_dir, ttl_seconds: float = 7 * 24 * 3600, max_entries: int = 1000):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(model_name: str, prompt: str) -> str:
+        return hashlib.sha256(f"{model_name}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, model_name: str, prompt: str):
+        """:return: The cached response text, or None when missing or expired."""
+        path = self._path(self.key(model_name, prompt))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+            path.unlink(missing_ok=True)
+            return None
+        return entry.get("response")
+
+    def put(self, model_name: str, prompt: str, response: str):
+        path = self._path(self.key(model_name, prompt))
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"created_at": time.time(), "model": model_name, "response": response}, f)
+        # Atomic, so a concurrent reader never sees half an entry
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self):
+        entries = list(self.cache_dir.glob("*.json"))
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda p: p.stat().st_mtime)
+        for path in entries[:len(entries) - self.max_entries]:
+            path.unlink(missing_ok=True)
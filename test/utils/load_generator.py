@@ -0,0 +1,143 @@
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import requests
+from requests.adapters import HTTPAdapter
+
+EVENT_TYPES = ("play", "pause", "seeked", "scroll")
+
+
+def make_event(rng: random.Random, user_count: int = 100) -> dict:
+    """Builds an event with the same shape the client sends to POST /api/event."""
+    return {
+        "userId": f"user-{rng.randrange(user_count)}",
+        "type": rng.choice(EVENT_TYPES),
+        "videoTime": round(rng.uniform(0, 10), 3),
+        "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+    }
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list, p in [0, 100]."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+@dataclass
+class LoadConfig:
+    """
+    :param rate: Target requests per second, spread evenly over the run (open loop).
+    :param concurrency: Worker threads, each with its own pooled keep-alive session.
+    :param duration: Length of the run in seconds.
+    :param max_p95_ms / max_p99_ms / max_error_rate / min_throughput_ratio: Budgets checked by LoadResult.
+    """
+    rate: float = 50.0
+    concurrency: int = 8
+    duration: float = 2.0
+    request_timeout: float = 5.0
+    max_p95_ms: float = 200.0
+    max_p99_ms: float = 500.0
+    max_error_rate: float = 0.01
+    min_throughput_ratio: float = 0.9
+
+    @classmethod
+    def from_env(cls) -> "LoadConfig":
+        """Overrides the defaults with LOAD_RATE, LOAD_CONCURRENCY, LOAD_DURATION, LOAD_MAX_P95_MS, ..."""
+        overrides = {}
+        for name, default in vars(cls()).items():
+            value = os.environ.get(f"LOAD_{name.upper()}")
+            if value is not None:
+                overrides[name] = type(default)(value)
+        return cls(**overrides)
+
+
+@dataclass
+class LoadResult:
+    config: LoadConfig
+    elapsed: float
+    latencies_ms: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    @property
+    def total(self) -> int:
+        return len(self.latencies_ms) + self.errors
+
+    @property
+    def throughput(self) -> float:
+        return len(self.latencies_ms) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.total if self.total else 0.0
+
+    def latency(self, p: float) -> float:
+        return percentile(sorted(self.latencies_ms), p)
+
+    def summary(self) -> str:
+        return (
+            f"requests={self.total} errors={self.errors} ({self.error_rate:.2%}) "
+            f"throughput={self.throughput:.1f}/s (target {self.config.rate:.1f}/s) "
+            f"p50={self.latency(50):.1f}ms p95={self.latency(95):.1f}ms p99={self.latency(99):.1f}ms"
+        )
+
+    def budget_violations(self) -> list[str]:
+        c = self.config
+        violations = []
+        if self.error_rate > c.max_error_rate:
+            violations.append(f"error rate {self.error_rate:.2%} > {c.max_error_rate:.2%}")
+        if self.latency(95) > c.max_p95_ms:
+            violations.append(f"p95 {self.latency(95):.1f}ms > {c.max_p95_ms:.1f}ms")
+        if self.latency(99) > c.max_p99_ms:
+            violations.append(f"p99 {self.latency(99):.1f}ms > {c.max_p99_ms:.1f}ms")
+        if self.throughput < c.rate * c.min_throughput_ratio:
+            violations.append(f"throughput {self.throughput:.1f}/s < {c.rate * c.min_throughput_ratio:.1f}/s")
+        return violations
+
+
+def run_load(url: str, config: LoadConfig, seed: int = 0) -> LoadResult:
+    """
+    Sends `rate * duration` events to `url`, each at its scheduled time.
+    Latency is measured from the scheduled send time, so a server that falls behind
+    shows up in the percentiles instead of silently lowering the request rate.
+    """
+    total = int(config.rate * config.duration)
+    rng = random.Random(seed)
+    payloads = [make_event(rng) for _ in range(total)]
+    local = threading.local()
+    lock = threading.Lock()
+    result = LoadResult(config=config, elapsed=0.0)
+
+    def session() -> requests.Session:
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+            local.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        return local.session
+
+    def send(index: int, start: float):
+        scheduled = start + index / config.rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        try:
+            ok = session().post(url, json=payloads[index], timeout=config.request_timeout).status_code == 200
+        except requests.RequestException:
+            ok = False
+        latency_ms = (time.perf_counter() - scheduled) * 1000
+        with lock:
+            if ok:
+                result.latencies_ms.append(latency_ms)
+            else:
+                result.errors += 1
+
+    with ThreadPoolExecutor(max_workers=config.concurrency, thread_name_prefix="load") as pool:
+        start = time.perf_counter()
+        list(pool.map(lambda i: send(i, start), range(total)))
+        result.elapsed = time.perf_counter() - start
+    return result
@@ -0,0 +1,108 @@
+import os
+import re
+import requests
+from pathlib import Path
+from playwright.sync_api import BrowserContext, Page, Route
+from utils.logger import logger
+
+# The clip referenced by client/index.html
+MEDIA_URL = "https://www.w3schools.com/html/mov_bbb.mp4"
+MEDIA_DIR = Path(__file__).resolve().parent.parent / "fixtures" / "media"
+
+CONTENT_TYPES = {".mp4": "video/mp4", ".webm": "video/webm", ".ogg": "video/ogg"}
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """
+    Parses the first range of an HTTP Range header into inclusive (start, end) byte offsets.
+    :return: None when the header is missing or malformed (serve the whole file).
+    :raises ValueError: When the range cannot be satisfied for a file of `size` bytes.
+    """
+    if not header:
+        return None
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+
+    start, end = match.group(1), match.group(2)
+    if start == "":
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0:
+            raise ValueError(f"Unsatisfiable range '{header}'")
+        return max(size - length, 0), size - 1
+
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError(f"Unsatisfiable range '{header}' for {size} bytes")
+    return start, end
+
+
+class MediaCache:
+    """
+    Serves media files from MEDIA_DIR through page.route, reading each file from disk
+    only once per worker and answering Range requests like a real media server.
+    A missing clip is downloaded once into MEDIA_DIR, so later runs work offline.
+    """
+
+    def __init__(self, media_dir: Path = MEDIA_DIR):
+        self.media_dir = media_dir
+        self._files: dict[str, bytes | None] = {}
+
+    def _download(self, url: str, path: Path):
+        logger.info(f"⬇️ Downloading {url} into {path}")
+        response = requests.get(url, timeout=30)
+        response.raise_for_status()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file first so parallel workers never read a half-written clip
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.part")
+        tmp_path.write_bytes(response.content)
+        os.replace(tmp_path, path)
+
+    def get(self, url: str) -> bytes | None:
+        """Returns the cached bytes for `url`, or None if the file is not available locally."""
+        filename = url.rsplit("/", 1)[-1]
+        if filename not in self._files:
+            path = self.media_dir / filename
+            try:
+                if not path.exists():
+                    self._download(url, path)
+                self._files[filename] = path.read_bytes()
+            except Exception as e:
+                logger.info(f"⚠️ Local media for {url} is not available ({e}), using the network instead")
+                self._files[filename] = None
+        return self._files[filename]
+
+    def handle(self, route: Route):
+        url = route.request.url
+        body = self.get(url)
+        if body is None:
+            route.continue_()
+            return
+
+        size = len(body)
+        headers = {
+            "Content-Type": CONTENT_TYPES.get(Path(url).suffix, "application/octet-stream"),
+            "Accept-Ranges": "bytes",
+        }
+        try:
+            byte_range = parse_range(route.request.headers.get("range"), size)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{size}"
+            route.fulfill(status=416, headers=headers, body=b"")
+            return
+
+        if byte_range is None:
+            headers["Content-Length"] = str(size)
+            route.fulfill(status=200, headers=headers, body=body)
+            return
+
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        route.fulfill(status=206, headers=headers, body=body[start:end + 1])
+
+    def install(self, target: Page | BrowserContext, url: str = MEDIA_URL):
+        target.route(url, self.handle)
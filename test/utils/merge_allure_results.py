@@ -0,0 +1,133 @@
+"""
+Merges the allure-results directories of several shards (--shard i/n) into one, for one report and one analysis.
+
+    python test/utils/merge_allure_results.py reports/allure-results shards/allure-results-*
+    python test/utils/merge_allure_results.py reports/allure-results shards/allure-results-* --analyze
+
+Files with the same name and content in several shards (environment.properties, categories.json, ...) are
+written once. A result, container or attachment whose name is taken by a different file gets a new UUID,
+and every reference to it in the same shard (container children, attachment sources) is rewritten.
+"""
+import argparse
+import filecmp
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import uuid
+from pathlib import Path
+
+LOGGER = logging.getLogger(__name__)
+UUID_PREFIX = re.compile(r'^([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})(-.+)$')
+JSON_SUFFIXES = ("-result.json", "-container.json")
+
+
+def _rewrite_references(node, renamed_uuids: dict, renamed_files: dict):
+    """Recursively replaces renamed UUIDs and attachment file names in a result or container."""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "uuid" and value in renamed_uuids:
+                node[key] = renamed_uuids[value]
+            elif key == "children" and isinstance(value, list):
+                node[key] = [renamed_uuids.get(child, child) for child in value]
+            elif key == "source" and value in renamed_files:
+                node[key] = renamed_files[value]
+            else:
+                _rewrite_references(value, renamed_uuids, renamed_files)
+    elif isinstance(node, list):
+        for value in node:
+            _rewrite_references(value, renamed_uuids, renamed_files)
+
+
+def _rename(name: str, renamed_uuids: dict, renamed_files: dict):
+    """Gives a '<uuid>-...' file a new UUID; other names can't be renamed and keep the first shard's file."""
+    match = UUID_PREFIX.match(name)
+    if not match:
+        return
+    new_uuid = str(uuid.uuid4())
+    renamed_uuids[match.group(1)] = new_uuid
+    renamed_files[name] = new_uuid + match.group(2)
+
+
+def merge_results(output_dir, shard_dirs) -> dict:
+    """
+    :param output_dir: Directory to merge into, created if needed. Existing files count as taken names.
+    :param shard_dirs: The shards' allure-results directories.
+    :return: Counts of copied, duplicate (identical, skipped) and renamed files.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stats = {"copied": 0, "duplicates": 0, "renamed": 0}
+
+    for shard_dir in map(Path, shard_dirs):
+        if not shard_dir.is_dir():
+            LOGGER.info(f"Skipping '{shard_dir}', it is not a directory.")
+            continue
+        files = sorted(path for path in shard_dir.iterdir() if path.is_file())
+        # First pass: find the names taken by different files, they get new UUIDs
+        renamed_uuids, renamed_files = {}, {}
+        for path in files:
+            target = output_dir / path.name
+            if target.exists() and not filecmp.cmp(path, target, shallow=False):
+                _rename(path.name, renamed_uuids, renamed_files)
+
+        # Second pass: copy, rewriting references to renamed files in results and containers
+        for path in files:
+            target = output_dir / renamed_files.get(path.name, path.name)
+            if not (renamed_uuids and path.name.endswith(JSON_SUFFIXES)):
+                if target.exists():
+                    if not filecmp.cmp(path, target, shallow=False):
+                        LOGGER.info(f"'{path.name}' differs between shards, keeping the first one.")
+                    stats["duplicates"] += 1
+                    continue
+                shutil.copyfile(path, target)
+                stats["copied"] += 1
+                continue
+
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            _rewrite_references(data, renamed_uuids, renamed_files)
+            if target.exists():
+                with open(target, "r", encoding="utf-8") as f:
+                    if json.load(f) == data:
+                        stats["duplicates"] += 1
+                        continue
+                # Only differs after the rewrite, e.g. a container listing a renamed result
+                _rename(path.name, renamed_uuids, renamed_files)
+                own_uuid = UUID_PREFIX.match(path.name).group(1)
+                _rewrite_references(data, {own_uuid: renamed_uuids[own_uuid]}, {})
+                target = output_dir / renamed_files[path.name]
+            with open(target, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            stats["copied"] += 1
+        stats["renamed"] += len(renamed_files)
+    return stats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Merge the allure-results directories of several shards.")
+    parser.add_argument("output", help="Merged allure-results directory")
+    parser.add_argument("shards", nargs="+", help="allure-results directories of the shards")
+    parser.add_argument("--analyze", action="store_true",
+                        help="Print the AllureReportAnalyzer summary of the merged results")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+    stats = merge_results(args.output, args.shards)
+    LOGGER.info(f"Merged {len(args.shards)} shards into {args.output}: {stats['copied']} files copied, "
+                f"{stats['duplicates']} duplicates skipped, {stats['renamed']} UUID collisions renamed")
+
+    if args.analyze:
+        if __package__ in (None, ""):
+            sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+        from utils.analyze_report_using_ai import AllureReportAnalyzer
+
+        analyzer = AllureReportAnalyzer(reports_path=os.path.abspath(args.output), llm_backend="none")
+        LOGGER.info(analyzer.quick_summary())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Times where the tests spend their time: fixture setup and teardown, server start, browser launch, navigation
+and player actions, all with a monotonic clock.
+
+Every test's breakdown is attached to its Allure result and appended to <output_dir>/<worker>.jsonl:
+    {"nodeid": ..., "attempt": 1, "outcome": "passed", "setup": 1.2, "call": 3.4, "teardown": 0.5,
+     "phases": [{"name": "fixture page setup", "seconds": 1.1, "depth": 0}, ...]}
+A test rerun by pytest-rerunfailures gets one record per attempt, numbered by `attempt`.
+The session ends with a table of the phases that took the most time over all tests (and all xdist workers).
+Phases nest: a player action that waits for a state also shows up as the wait, `depth` tells them apart.
+
+The plugin is registered by conftest.py and can be disabled with `-p no:phase_timing`.
+"""
+import functools
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+import allure
+import pytest
+
+# Phases of the test that is running, None when no test is running or the plugin is not registered
+_phases: list[dict] | None = None
+_depth = 0
+
+
+@contextmanager
+def phase(name: str):
+    """Times the enclosed block as phase `name` of the running test."""
+    global _depth
+    start = time.monotonic()
+    _depth += 1
+    try:
+        yield
+    finally:
+        _depth -= 1
+        if _phases is not None:
+            _phases.append({"name": name, "seconds": round(time.monotonic() - start, 6), "depth": _depth})
+
+
+def instrument(cls, method_name: str, phase_name: str | None = None):
+    """Replaces cls.method_name with a wrapper that times every call as a phase; wrapping twice is a no-op."""
+    method = getattr(cls, method_name)
+    if getattr(method, "_phase_timed", False):
+        return
+    phase_name = phase_name or f"{cls.__name__}.{method_name}"
+
+    @functools.wraps(method)
+    def timed(*args, **kwargs):
+        with phase(phase_name):
+            return method(*args, **kwargs)
+
+    timed._phase_timed = True
+    setattr(cls, method_name, timed)
+
+
+def instrument_steps(cls):
+    """Times every @allure.step method of a page object (allure.step keeps the function in __wrapped__)."""
+    for name, attr in list(vars(cls).items()):
+        if callable(attr) and hasattr(attr, "__wrapped__"):
+            instrument(cls, name)
+
+
+def summarize(records: list[dict]) -> list[dict]:
+    """
+    Aggregates the phases of many tests by name.
+    :return: One row per phase name with count, total, mean and max seconds, by total time descending.
+    """
+    by_name = {}
+    for record in records:
+        for entry in record["phases"]:
+            row = by_name.setdefault(entry["name"], {"name": entry["name"], "count": 0, "total": 0.0, "max": 0.0})
+            row["count"] += 1
+            row["total"] += entry["seconds"]
+            row["max"] = max(row["max"], entry["seconds"])
+    rows = sorted(by_name.values(), key=lambda row: row["total"], reverse=True)
+    for row in rows:
+        row["mean"] = row["total"] / row["count"]
+    return rows
+
+
+class PhaseTimingPlugin:
+
+    def __init__(self, output_dir, worker_id: str = "master", top: int = 15, fixtures=()):
+        """
+        :param output_dir: Directory for the per-worker JSONL files, cleared by the controller at the start.
+        :param top: Number of phases in the end of session table.
+        :param fixtures: Names of the fixtures whose setup and teardown are timed.
+        """
+        self.output_dir = Path(output_dir)
+        self.worker_id = worker_id
+        self.top = top
+        self.fixtures = set(fixtures)
+        self.output_path = self.output_dir / f"{worker_id}.jsonl"
+        self._record = None
+        self._teardown_started = {}
+
+    def pytest_configure(self, config):
+        # The controller (or a run without xdist) starts from an empty directory, workers only append
+        if not hasattr(config, "workerinput"):
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            for old in self.output_dir.glob("*.jsonl"):
+                old.unlink()
+
+    def _start_record(self, item):
+        global _phases
+        _phases = []
+        self._record = {"nodeid": item.nodeid, "worker": self.worker_id,
+                        "attempt": getattr(item, "execution_count", 1), "outcome": "passed",
+                        "setup": 0.0, "call": 0.0, "teardown": 0.0, "phases": _phases}
+
+    def _write_record(self):
+        global _phases
+        if self._record is not None:
+            with open(self.output_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(self._record) + "\n")
+        _phases = None
+        self._record = None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        try:
+            yield
+        finally:
+            self._write_record()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_setup(self, item):
+        # Runs once per attempt (pytest-rerunfailures repeats setup, call and teardown inside one protocol),
+        # so every attempt starts from a fresh record instead of adding to the failed one before it
+        self._write_record()
+        self._start_record(item)
+        yield
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        if fixturedef.argname not in self.fixtures:
+            yield
+            return
+        with phase(f"fixture {fixturedef.argname} setup"):
+            yield
+        # Finalizers run last in, first out: this one runs right before the fixture's own teardown, and
+        # pytest_fixture_post_finalizer (registered before the setup) right after it
+        fixturedef.addfinalizer(lambda: self._teardown_started.__setitem__(id(fixturedef), time.monotonic()))
+
+    def pytest_fixture_post_finalizer(self, fixturedef, request):
+        start = self._teardown_started.pop(id(fixturedef), None)
+        if start is not None and _phases is not None:
+            _phases.append({"name": f"fixture {fixturedef.argname} teardown",
+                            "seconds": round(time.monotonic() - start, 6), "depth": _depth})
+
+    def pytest_runtest_makereport(self, item, call):
+        if self._record is None:
+            return
+        self._record[call.when] = round(call.duration, 6)
+        if call.excinfo is not None and self._record["outcome"] == "passed":
+            if call.excinfo.errisinstance(pytest.skip.Exception):
+                self._record["outcome"] = "skipped"
+            else:
+                self._record["outcome"] = "failed" if call.when == "call" else "error"
+        if call.when == "teardown":
+            allure.attach(json.dumps(self._record, indent=2), name="phase timings",
+                          attachment_type=allure.attachment_type.JSON)
+
+    def pytest_terminal_summary(self, terminalreporter, exitstatus, config):
+        if hasattr(config, "workerinput"):
+            return
+        records = []
+        for path in sorted(self.output_dir.glob("*.jsonl")):
+            with open(path, "r", encoding="utf-8") as f:
+                records.extend(json.loads(line) for line in f if line.strip())
+        rows = summarize(records)[:self.top]
+        if not rows:
+            return
+        test_time = sum(record["setup"] + record["call"] + record["teardown"] for record in records)
+        name_width = max(len(row["name"]) for row in rows)
+        terminalreporter.write_sep("-", f"top {len(rows)} phases over {len(records)} test runs ({test_time:.1f}s)")
+        terminalreporter.write_line(f"{'phase':<{name_width}}  {'count':>6}  {'total s':>8}  {'mean s':>7}  "
+                                    f"{'max s':>7}  {'share':>6}")
+        for row in rows:
+            share = row["total"] / test_time if test_time else 0.0
+            terminalreporter.write_line(f"{row['name']:<{name_width}}  {row['count']:>6}  {row['total']:>8.2f}  "
+                                        f"{row['mean']:>7.3f}  {row['max']:>7.2f}  {share:>6.1%}")
+        terminalreporter.write_line(f"Per-test breakdowns: {self.output_dir}")
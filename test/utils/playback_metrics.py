@@ -0,0 +1,87 @@
+import os
+from dataclasses import asdict, dataclass, field
+
+
+@dataclass
+class PlaybackBudgets:
+    """
+    Limits for the player performance measured by VideoPage in perf mode (VideoPage(page, budgets=...)).
+    :param max_first_frame_ms: Time from play() to the first new frame.
+    :param max_seek_ms: Time from setting currentTime to the 'seeked' event.
+    :param max_stalls: 'waiting' events during playback (seeks excluded).
+    :param max_dropped_frame_ratio: Dropped / total frames from getVideoPlaybackQuality().
+    :param measure_timeout_ms: How long a single measurement waits before it is counted as missed.
+    """
+    max_first_frame_ms: float = 2000.0
+    max_seek_ms: float = 1000.0
+    max_stalls: int = 1
+    max_dropped_frame_ratio: float = 0.05
+    measure_timeout_ms: float = 5000.0
+
+    @classmethod
+    def from_env(cls) -> "PlaybackBudgets":
+        """Overrides the defaults with PLAYBACK_MAX_FIRST_FRAME_MS, PLAYBACK_MAX_SEEK_MS, PLAYBACK_MAX_STALLS, ..."""
+        overrides = {}
+        for name, default in vars(cls()).items():
+            value = os.environ.get(f"PLAYBACK_{name.upper()}")
+            if value is not None:
+                overrides[name] = type(default)(value)
+        return cls(**overrides)
+
+
+@dataclass
+class PlaybackMetrics:
+    """Measurements of one VideoPage, None entries are measurements that timed out."""
+    budgets: PlaybackBudgets
+    first_frame_ms: list[float | None] = field(default_factory=list)
+    seek_ms: list[float | None] = field(default_factory=list)
+    stalls: int = 0
+    stalled_fetches: int = 0
+    dropped_frames: int = 0
+    total_frames: int = 0
+
+    @property
+    def dropped_frame_ratio(self) -> float:
+        return self.dropped_frames / self.total_frames if self.total_frames else 0.0
+
+    def update_counters(self, counters: dict):
+        """Takes the stall and frame counters read from the page."""
+        self.stalls = counters["waiting"]
+        self.stalled_fetches = counters["stalled"]
+        self.dropped_frames = counters["droppedFrames"]
+        self.total_frames = counters["totalFrames"]
+
+    @staticmethod
+    def _describe(values: list[float | None]) -> str:
+        measured = [value for value in values if value is not None]
+        if not values:
+            return "-"
+        text = f"max {max(measured):.0f}ms" if measured else "none"
+        missed = len(values) - len(measured)
+        return f"{text} ({len(values)} measured{f', {missed} timed out' if missed else ''})"
+
+    def summary(self) -> str:
+        return (
+            f"first frame {self._describe(self.first_frame_ms)}, seek {self._describe(self.seek_ms)}, "
+            f"stalls={self.stalls} stalled fetches={self.stalled_fetches}, "
+            f"dropped frames={self.dropped_frames}/{self.total_frames} ({self.dropped_frame_ratio:.1%})"
+        )
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "dropped_frame_ratio": self.dropped_frame_ratio}
+
+    def budget_violations(self) -> list[str]:
+        b = self.budgets
+        violations = []
+        for name, values, limit in (("first frame", self.first_frame_ms, b.max_first_frame_ms),
+                                    ("seek", self.seek_ms, b.max_seek_ms)):
+            for value in values:
+                if value is None:
+                    violations.append(f"{name} not reached within {b.measure_timeout_ms:.0f}ms")
+                elif value > limit:
+                    violations.append(f"{name} {value:.0f}ms > {limit:.0f}ms")
+        if self.stalls > b.max_stalls:
+            violations.append(f"stalls {self.stalls} > {b.max_stalls}")
+        if self.dropped_frame_ratio > b.max_dropped_frame_ratio:
+            violations.append(f"dropped frames {self.dropped_frame_ratio:.1%} > {b.max_dropped_frame_ratio:.1%}")
+        return violations
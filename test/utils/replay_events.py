@@ -0,0 +1,179 @@
+"""
+Replays an event capture (JSONL written by the server with EVENT_CAPTURE_PATH) against a server.
+
+    python test/utils/replay_events.py captures/events.jsonl --url http://localhost:3000 --speed 1
+    python test/utils/replay_events.py captures/events.jsonl --speed 10 --batch-size 20
+    python test/utils/replay_events.py captures/events.jsonl --max-speed --concurrency 16
+
+The capture is streamed line by line, so multi-GB files never have to fit in memory.
+"""
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator
+import requests
+from requests.adapters import HTTPAdapter
+
+if __package__ in (None, ""):
+    # Allow running as a script: make the test/ directory importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from utils.load_generator import percentile  # noqa: E402
+
+LOGGER = logging.getLogger(__name__)
+# Added by the server when the event was ingested, not part of the event itself
+CAPTURE_FIELDS = ("seq", "receivedAt")
+
+
+def _parse_time(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def read_capture(path: Path) -> Iterator[dict]:
+    """Yields captured records one at a time, skipping blank or corrupt lines (e.g. a torn last line)."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                LOGGER.warning(f"Skipping line {line_number} of {path}: {e}")
+
+
+def schedule(records: Iterable[dict], speed: float | None) -> Iterator[tuple[float, dict]]:
+    """
+    Turns records into (offset_seconds, event) pairs relative to the first record.
+    :param speed: 1.0 for real time, 2.0 for twice as fast, None to send everything immediately.
+    """
+    first = None
+    for record in records:
+        event = {key: value for key, value in record.items() if key not in CAPTURE_FIELDS}
+        if speed is None:
+            yield 0.0, event
+            continue
+        at = _parse_time(record.get("receivedAt") or record["timestamp"])
+        if first is None:
+            first = at
+        yield max(at - first, 0.0) / speed, event
+
+
+def batched(scheduled: Iterable[tuple[float, dict]], batch_size: int, window: float) -> Iterator[tuple[float, list[dict]]]:
+    """Groups consecutive events due within `window` seconds of the first one, up to `batch_size` per group."""
+    batch, batch_at = [], 0.0
+    for at, event in scheduled:
+        if batch and (len(batch) >= batch_size or at - batch_at > window):
+            yield batch_at, batch
+            batch = []
+        if not batch:
+            batch_at = at
+        batch.append(event)
+    if batch:
+        yield batch_at, batch
+
+
+@dataclass
+class ReplayStats:
+    sent_events: int = 0
+    requests: int = 0
+    errors: int = 0
+    max_lag_ms: float = 0.0
+    latencies_ms: list[float] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def summary(self) -> str:
+        latencies = sorted(self.latencies_ms)
+        return (
+            f"events={self.sent_events} requests={self.requests} errors={self.errors} "
+            f"elapsed={self.elapsed:.2f}s throughput={self.sent_events / self.elapsed if self.elapsed else 0:.1f} events/s "
+            f"p50={percentile(latencies, 50):.1f}ms p95={percentile(latencies, 95):.1f}ms "
+            f"p99={percentile(latencies, 99):.1f}ms max_lag={self.max_lag_ms:.1f}ms"
+        )
+
+
+def replay(path: Path, base_url: str, speed: float | None = 1.0, batch_size: int = 1,
+           concurrency: int = 8, request_timeout: float = 5.0) -> ReplayStats:
+    """
+    Sends the captured events to `base_url`, one per POST /api/event or grouped per POST /api/events.
+    At most `concurrency * 2` requests are in flight or queued, which keeps memory flat for any capture size.
+    """
+    base_url = base_url.rstrip("/")
+    stats = ReplayStats()
+    lock = threading.Lock()
+    in_flight = threading.BoundedSemaphore(concurrency * 2)
+    local = threading.local()
+
+    def session() -> requests.Session:
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+            local.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        return local.session
+
+    def send(events: list[dict]):
+        started = time.perf_counter()
+        try:
+            if batch_size > 1:
+                ok = session().post(f"{base_url}/api/events", json={"events": events}, timeout=request_timeout).ok
+            else:
+                ok = session().post(f"{base_url}/api/event", json=events[0], timeout=request_timeout).ok
+        except requests.RequestException:
+            ok = False
+        finally:
+            in_flight.release()
+        latency_ms = (time.perf_counter() - started) * 1000
+        with lock:
+            stats.requests += 1
+            if ok:
+                stats.sent_events += len(events)
+                stats.latencies_ms.append(latency_ms)
+            else:
+                stats.errors += 1
+
+    # Batches only group events that are due at (almost) the same time, so pacing is preserved
+    window = 0.05 if speed is not None else float("inf")
+    groups = batched(schedule(read_capture(path), speed), batch_size, window)
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="replay") as pool:
+        start = time.perf_counter()
+        for at, events in groups:
+            delay = start + at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                stats.max_lag_ms = max(stats.max_lag_ms, -delay * 1000)
+            in_flight.acquire()
+            pool.submit(send, events)
+    # Measured after the pool drained, so the last in-flight requests are included
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Replay captured /api/event traffic against a server.")
+    parser.add_argument("capture", type=Path, help="JSONL capture written by the server (EVENT_CAPTURE_PATH)")
+    parser.add_argument("--url", default="http://localhost:3000", help="Base URL of the target server")
+    pace = parser.add_mutually_exclusive_group()
+    pace.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier, 1 is real time")
+    pace.add_argument("--max-speed", action="store_true", help="Ignore capture timing and send as fast as possible")
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="Events per request, above 1 the bulk POST /api/events endpoint is used")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel connections")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+    stats = replay(args.capture, args.url, speed=None if args.max_speed else args.speed,
+                   batch_size=args.batch_size, concurrency=args.concurrency)
+    LOGGER.info(f"Replay finished: {stats.summary()}")
+    return 1 if stats.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
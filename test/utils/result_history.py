@@ -0,0 +1,125 @@
+"""
+Flakiness and duration-trend analytics over the Allure results of many runs (see ResultStore).
+
+Every rerun attempt of @pytest.mark.flaky is a separate Allure result sharing the test's historyId,
+so attempts are grouped per (run_id, test) to count reruns and to tell flaky runs from hard failures.
+"""
+import pandas as pd
+
+FAILED_STATUSES = ('failed', 'broken')
+# Scales the median absolute deviation to the standard deviation of normally distributed data
+MAD_TO_SIGMA = 1.4826
+REGRESSION_COLUMNS = ('test_key', 'test_name', 'baseline_median', 'recent_median', 'baseline_samples',
+                      'recent_samples', 'increase', 'z_score')
+
+
+def _with_test_key(df):
+    """Adds `test_key`: historyId (unique per parametrization), falling back to testCaseId and then the name."""
+    key = df['history_id'] if 'history_id' in df else pd.Series(None, index=df.index, dtype=object)
+    for fallback in ('test_case_id', 'test_name'):
+        key = key.where(key.notna() & (key != 'N/A'), df[fallback])
+    return df.assign(test_key=key)
+
+
+def _with_run_order(df):
+    """Adds `run_index`: 0 for the oldest run, ordered by each run's first start time."""
+    run_start = df.groupby('run_id', dropna=False)['start_ms'].transform('min')
+    return df.assign(run_index=run_start.rank(method='dense').fillna(0).astype(int) - 1)
+
+
+def runs_per_test(results):
+    """
+    Collapses rerun attempts into one row per (run_id, test_key).
+    :param results: Result rows with at least test_name, status, duration_seconds, start_ms and run_id.
+    :return: DataFrame with attempts, failed_attempts, final_status, flaky and run_index per test run.
+    """
+    df = _with_run_order(_with_test_key(results))
+    df = df.assign(failed=df['status'].isin(FAILED_STATUSES)).sort_values('start_ms', kind='stable')
+    per_run = df.groupby(['run_id', 'test_key'], dropna=False, sort=False).agg(
+        test_name=('test_name', 'last'),
+        run_index=('run_index', 'first'),
+        attempts=('status', 'size'),
+        failed_attempts=('failed', 'sum'),
+        final_status=('status', 'last'),
+    ).reset_index()
+    # Failed at least once but the last rerun passed
+    per_run['flaky'] = (per_run['failed_attempts'] > 0) & (per_run['final_status'] == 'passed')
+    return per_run
+
+
+def rolling_durations(results, window=20):
+    """
+    Rolling p50/p95 of each test's passed durations, oldest attempt first.
+    :param window: Number of previous passed attempts each percentile looks at.
+    :return: The passed rows with added rolling_p50 and rolling_p95 columns.
+    """
+    passed = _with_test_key(results)
+    passed = passed[passed['status'] == 'passed'].sort_values('start_ms', kind='stable')
+    rolling = passed.groupby('test_key', sort=False)['duration_seconds'].rolling(window, min_periods=1)
+    return passed.assign(
+        rolling_p50=rolling.quantile(0.5).reset_index(level=0, drop=True),
+        rolling_p95=rolling.quantile(0.95).reset_index(level=0, drop=True),
+    )
+
+
+def flakiness_table(results, window=20):
+    """
+    Per-test flake rate, rerun budget spent and latest rolling duration percentiles, flakiest first.
+    :param results: Result rows of one or more runs.
+    :param window: Window of rolling_durations().
+    """
+    per_run = runs_per_test(results)
+    per_run['reruns'] = per_run['attempts'] - 1
+    per_run['hard_failure'] = per_run['final_status'].isin(FAILED_STATUSES)
+    table = per_run.groupby('test_key', sort=False).agg(
+        test_name=('test_name', 'last'),
+        runs=('run_id', 'size'),
+        flaky_runs=('flaky', 'sum'),
+        hard_failures=('hard_failure', 'sum'),
+        reruns=('reruns', 'sum'),
+    )
+    table['flake_rate'] = table['flaky_runs'] / table['runs']
+    latest = rolling_durations(results, window).groupby('test_key', sort=False)[['rolling_p50', 'rolling_p95']].last()
+    table = table.join(latest)
+    return table.sort_values(['flake_rate', 'reruns'], ascending=False).reset_index()
+
+
+def duration_regressions(results, recent_runs=3, min_baseline=5, z_threshold=3.0, min_increase=0.2):
+    """
+    Flags tests whose passed durations in the last `recent_runs` runs are significantly above their own history.
+    Uses a robust z-score, (recent median - baseline median) / (1.4826 * baseline MAD), so a few outliers in the
+    baseline neither hide nor fake a regression.
+    :param min_baseline: Passed attempts needed before `recent_runs` to judge a test at all.
+    :param z_threshold: Minimal robust z-score to count as significant.
+    :param min_increase: Minimal relative slowdown (0.2 = 20%), so tests with a near-zero spread aren't flagged for noise.
+    :return: One row per regressed test, biggest z-score first.
+    """
+    df = _with_run_order(_with_test_key(results))
+    passed = df[df['status'] == 'passed']
+    is_recent = passed['run_index'] > passed['run_index'].max() - recent_runs
+    durations = passed.groupby(['test_key', is_recent.rename('recent')])['duration_seconds']
+
+    stats = durations.agg(['median', 'size']).unstack('recent')
+    if stats.columns.get_level_values('recent').nunique() < 2:
+        # Only one side (e.g. a single run so far), nothing to compare against
+        return pd.DataFrame(columns=list(REGRESSION_COLUMNS))
+    baseline = passed[~is_recent]
+    deviation = (baseline['duration_seconds']
+                 - baseline.groupby('test_key')['duration_seconds'].transform('median')).abs()
+    mad = deviation.groupby(baseline['test_key']).median()
+
+    report = pd.DataFrame({
+        'baseline_median': stats[('median', False)],
+        'recent_median': stats[('median', True)],
+        'baseline_samples': stats[('size', False)],
+        'recent_samples': stats[('size', True)],
+    }).dropna()
+    report['increase'] = report['recent_median'] / report['baseline_median'] - 1
+    # A zero MAD (identical baseline durations) makes any slowdown infinitely significant, min_increase still applies
+    report['z_score'] = (report['recent_median'] - report['baseline_median']) / (MAD_TO_SIGMA * mad)
+    report = report[(report['baseline_samples'] >= min_baseline)
+                    & (report['z_score'] >= z_threshold)
+                    & (report['increase'] >= min_increase)]
+    names = df.groupby('test_key')['test_name'].last()
+    report = report.join(names).rename_axis('test_key').reset_index()
+    return report[list(REGRESSION_COLUMNS)].sort_values('z_score', ascending=False, ignore_index=True)
@@ -0,0 +1,94 @@
+import os
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+
+class ResultStore:
+    """
+    SQLite store of parsed Allure results that survives between analyzer runs.
+    Each row is keyed by its result file name and remembers the file's mtime and size, so a later run
+    only parses files that are new or changed. Rows of files that are gone (older CI runs) are kept as history.
+
+    Usage:
+        store = ResultStore("reports/results-history.sqlite", columns=RESULT_COLUMNS)
+        stale = store.stale_files(paths)
+        store.upsert([(path, row) for path, row in parsed], run_id="1234")
+        df = store.load(paths)
+    """
+    # Stored next to the result columns and returned by load(), tells the CI runs in the history apart
+    RUN_COLUMN = "run_id"
+
+    def __init__(self, db_path, columns):
+        self.db_path = Path(db_path)
+        self.columns = tuple(columns)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._create_schema()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path)
+
+    def _create_schema(self):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "filename TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, ingested_at REAL NOT NULL)"
+            )
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(results)")}
+            # New result columns are added in place so the history collected so far is kept
+            for column in self.columns + (self.RUN_COLUMN,):
+                if column not in existing:
+                    conn.execute(f'ALTER TABLE results ADD COLUMN "{column}"')
+
+    @staticmethod
+    def _file_key(path):
+        stat = os.stat(path)
+        return os.path.basename(path), stat.st_mtime_ns, stat.st_size
+
+    def stale_files(self, paths):
+        """
+        :param paths: Full paths of the result files currently on disk.
+        :return: The paths that are not in the store yet or changed since they were stored.
+        """
+        with closing(self._connect()) as conn:
+            known = {name: (mtime_ns, size) for name, mtime_ns, size in conn.execute(
+                "SELECT filename, mtime_ns, size FROM results")}
+        stale = []
+        for path in paths:
+            name, mtime_ns, size = self._file_key(path)
+            if known.get(name) != (mtime_ns, size):
+                stale.append(path)
+        return stale
+
+    def upsert(self, parsed, run_id=None):
+        """
+        :param parsed: Iterable of (path, row) pairs, row being a tuple of values in `columns` order.
+        :param run_id: Identifier of the test run the files belong to, e.g. the CI run id.
+        """
+        now = time.time()
+        column_list = ", ".join(f'"{column}"' for column in self.columns + (self.RUN_COLUMN,))
+        placeholders = ", ".join("?" * (len(self.columns) + 5))
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO results (filename, mtime_ns, size, ingested_at, {column_list}) "
+                f"VALUES ({placeholders})",
+                (self._file_key(path) + (now,) + tuple(row) + (run_id,) for path, row in parsed),
+            )
+
+    def load(self, paths=None):
+        """
+        Reads stored results as a DataFrame with the store's columns plus run_id.
+        :param paths: Only return the results of these files, or the whole history when None.
+        """
+        import pandas as pd
+
+        column_list = ", ".join(f'"{column}"' for column in self.columns + (self.RUN_COLUMN,))
+        with closing(self._connect()) as conn:
+            if paths is None:
+                return pd.read_sql_query(f"SELECT {column_list} FROM results", conn)
+            # A temporary table keeps the query fast and clear of SQLite's bound-parameter limit
+            conn.execute("CREATE TEMP TABLE wanted (filename TEXT PRIMARY KEY)")
+            conn.executemany("INSERT OR IGNORE INTO wanted VALUES (?)", ((os.path.basename(p),) for p in paths))
+            return pd.read_sql_query(
+                f"SELECT {column_list} FROM results JOIN wanted USING (filename)", conn)
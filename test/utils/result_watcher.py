@@ -0,0 +1,109 @@
+"""
+Picks up Allure result files while the test run is still writing them (see AllureReportAnalyzer.watch).
+
+The directory is rescanned every `poll_interval` seconds. When the optional `watchdog` package is installed,
+its inotify/FSEvents notifications wake the scan up as soon as a file appears, so the interval only
+matters as a fallback.
+"""
+import os
+import threading
+from dataclasses import dataclass, field
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+
+
+class ResultWatcher:
+    """
+    Usage:
+        with ResultWatcher(results_dir) as watcher:
+            while running:
+                for path in watcher.wait_for_new_files(timeout=1.0):
+                    ...
+    Every file is handed out once, and again whenever its size or mtime changes afterwards, so a file that
+    was caught half-written comes back as soon as the writer finished it.
+    """
+
+    def __init__(self, directory, poll_interval: float = 1.0, suffix: str = "-result.json"):
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self.suffix = suffix
+        # path -> (mtime_ns, size) at the time it was handed out
+        self._seen: dict[str, tuple[int, int]] = {}
+        self._changed = threading.Event()
+        self._observer = None
+
+    def __enter__(self):
+        if Observer is not None and os.path.isdir(self.directory):
+            handler = FileSystemEventHandler()
+            handler.on_any_event = lambda event: self._changed.set()
+            self._observer = Observer()
+            self._observer.schedule(handler, self.directory, recursive=False)
+            self._observer.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+
+    def scan(self) -> list[str]:
+        """:return: Result files that are new or changed since the last scan, oldest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        new = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(self.suffix):
+                    continue
+                stat = entry.stat()
+                key = (stat.st_mtime_ns, stat.st_size)
+                if self._seen.get(entry.path) != key:
+                    self._seen[entry.path] = key
+                    new.append((stat.st_mtime_ns, entry.path))
+        return [path for _, path in sorted(new)]
+
+    def wait_for_new_files(self, timeout: float | None = None) -> list[str]:
+        """Blocks until a scan finds files or `timeout` (default poll_interval) seconds passed."""
+        new = self.scan()
+        if not new:
+            self._changed.wait(self.poll_interval if timeout is None else timeout)
+            self._changed.clear()
+            new = self.scan()
+        return new
+
+
+@dataclass
+class RunningAggregates:
+    """Pass/fail/duration totals updated one result at a time; a rerun replaces the test's previous attempt."""
+    attempts: int = 0
+    total_duration: float = 0.0
+    max_duration: float = 0.0
+    slowest_test: str = ""
+    # test key -> status of its latest attempt
+    final_status: dict = field(default_factory=dict)
+
+    def add(self, result: dict):
+        self.attempts += 1
+        duration = result.get('duration_seconds') or 0.0
+        self.total_duration += duration
+        if duration > self.max_duration:
+            self.max_duration, self.slowest_test = duration, result.get('test_name', 'N/A')
+        key = result.get('history_id') or result.get('test_case_id') or result.get('test_name')
+        self.final_status[key] = result.get('status', 'unknown')
+
+    def status_counts(self) -> dict:
+        counts = {}
+        for status in self.final_status.values():
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+    def summary_line(self) -> str:
+        counts = self.status_counts()
+        reruns = self.attempts - len(self.final_status)
+        return (f"{len(self.final_status)} tests: {counts.get('passed', 0)} passed, {counts.get('failed', 0)} failed, "
+                f"{counts.get('broken', 0)} broken, {counts.get('skipped', 0)} skipped, {reruns} reruns | "
+                f"{self.total_duration:.1f}s test time, slowest {self.slowest_test} ({self.max_duration:.1f}s)")
@@ -0,0 +1,82 @@
+import os
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class RunProfile:
+    """
+    A named bundle of browser settings that are switched together.
+    :param headless: Launch the browser without a window.
+    :param slow_mo: Milliseconds Playwright waits before every action.
+    :param record_video_dir: Where context videos are written, None disables recording.
+    :param tracing: Record a Playwright trace per test (kept only on failure).
+    :param default_timeout: Default timeout for actions and waits, in milliseconds.
+    :param navigation_timeout: Default timeout for page navigations, in milliseconds.
+    """
+    name: str
+    headless: bool
+    slow_mo: int
+    record_video_dir: str | None
+    tracing: bool
+    default_timeout: int
+    navigation_timeout: int
+
+    def launch_options(self) -> dict:
+        return {"headless": self.headless, "slow_mo": self.slow_mo}
+
+    def context_options(self) -> dict:
+        options = {}
+        if self.record_video_dir:
+            options["record_video_dir"] = self.record_video_dir
+        return options
+
+
+PROFILES = {
+    # Local debugging: visible browser, slowed down actions, video and trace for failed tests
+    "debug": RunProfile(
+        name="debug",
+        headless=False,
+        slow_mo=500,
+        record_video_dir="videos/",
+        tracing=True,
+        default_timeout=30000,
+        navigation_timeout=30000,
+    ),
+    # CI pipeline: headless at full speed, artifacts are still kept for failed tests
+    "ci": RunProfile(
+        name="ci",
+        headless=True,
+        slow_mo=0,
+        record_video_dir="videos/",
+        tracing=True,
+        default_timeout=15000,
+        navigation_timeout=30000,
+    ),
+    # Performance runs: no artificial delay and no recording overhead, for real wall-clock numbers
+    "perf": RunProfile(
+        name="perf",
+        headless=True,
+        slow_mo=0,
+        record_video_dir=None,
+        tracing=False,
+        default_timeout=10000,
+        navigation_timeout=15000,
+    ),
+}
+
+PROFILE_ENV_VAR = "RUN_PROFILE"
+
+
+def default_profile_name() -> str:
+    """RUN_PROFILE env var if set, otherwise 'ci' on CI machines and 'debug' everywhere else."""
+    name = os.environ.get(PROFILE_ENV_VAR)
+    if name:
+        return name
+    return "ci" if os.environ.get("CI", "false").lower() == "true" else "debug"
+
+
+def get_profile(name: str) -> RunProfile:
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown run profile '{name}', expected one of: {', '.join(PROFILES)}") from None
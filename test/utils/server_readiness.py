@@ -0,0 +1,223 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable
+import requests
+from utils.logger import logger
+
+
+def wait_for_server(url: str, timeout: float = 30.0, request_timeout: float = 2.0,
+                    initial_delay: float = 0.1, max_delay: float = 2.0) -> bool:
+    """
+    Probes `url` until it answers 200 or `timeout` seconds have passed.
+    Every probe has its own request timeout and failed probes back off exponentially.
+    :return: True when the server answered in time, False otherwise.
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    delay = initial_delay
+    attempt = 0
+    while True:
+        attempt += 1
+        remaining = deadline - time.monotonic()
+        try:
+            r = requests.get(url, timeout=max(min(request_timeout, remaining), 0.1))
+            if r.status_code == 200:
+                elapsed = time.monotonic() - start
+                logger.info(f"✅ Server is up after {elapsed:.2f} seconds (attempt {attempt})")
+                return True
+        except requests.RequestException:
+            pass
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            logger.error(f"❌ Server at {url} failed to start in {timeout:.0f} seconds ({attempt} attempts).")
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)
+
+
+def pid_alive(pid: int) -> bool:
+    """Whether process `pid` still exists; always True where that can't be checked (only POSIX is)."""
+    if os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+@contextmanager
+def file_lock(path: Path, timeout: float = 60.0, poll_interval: float = 0.05):
+    """
+    Cross-process lock based on exclusive file creation, works the same on Linux, macOS and Windows.
+    The lock is only held for short state updates, so a plain polling wait is enough.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Timed out waiting for lock {path}")
+            time.sleep(poll_interval)
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        yield
+    finally:
+        os.remove(path)
+
+
+class SharedServer:
+    """
+    Makes sure all xdist workers on a host share one server.
+    The first worker to register starts it, every other worker blocks until the owner
+    marks it healthy, and the owner only stops it after the last worker has released it.
+
+    State is kept in a small JSON file in a directory shared by all workers of the session:
+        {"status": "starting" | "ready" | "failed", "owner": "gw0", "workers": {"gw0": <pid>, "gw1": <pid>}, "info": ...}
+    `name` keeps the state of different shared servers (the backend, the browser servers) apart.
+    Workers whose process is gone (crashed, or left over from an earlier session) are dropped from the state, so
+    the owner doesn't wait for them and a state without any live worker, e.g. a failed start, is started over.
+    """
+
+    def __init__(self, state_dir: Path, worker_id: str, url: str | None,
+                 start_timeout: float = 120.0, stop_timeout: float = 3600.0, name: str = "server"):
+        """
+        :param url: Health URL the other workers probe once the owner reports ready, None to skip the probe.
+        """
+        self.state_dir = Path(state_dir)
+        self.worker_id = worker_id
+        self.url = url
+        self.start_timeout = start_timeout
+        self.stop_timeout = stop_timeout
+        self.state_path = self.state_dir / f"{name}-state.json"
+        self.lock_path = self.state_dir / f"{name}-state.lock"
+        self.is_owner = False
+
+    def _read_state(self) -> dict | None:
+        if not self.state_path.exists():
+            return None
+        return json.loads(self.state_path.read_text(encoding="utf-8"))
+
+    def _write_state(self, state: dict):
+        tmp_path = self.state_path.with_suffix(f".{self.worker_id}.tmp")
+        tmp_path.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp_path, self.state_path)
+
+    def _locked_state(self) -> dict:
+        # Readers take the lock too, os.replace() on Windows fails while the file is open elsewhere
+        with file_lock(self.lock_path):
+            return self._read_state()
+
+    def _drop_dead_workers(self, state: dict) -> list[str]:
+        """Removes the workers whose process is gone from `state` (call under the lock) and returns them."""
+        dead = [worker for worker, pid in state["workers"].items() if not pid_alive(pid)]
+        for worker in dead:
+            del state["workers"][worker]
+        return dead
+
+    def _update_status(self, status: str, info=None):
+        with file_lock(self.lock_path):
+            state = self._read_state()
+            state["status"] = status
+            if info is not None:
+                state["info"] = info
+            self._write_state(state)
+
+    def acquire(self, start: Callable[[], object]):
+        """
+        Registers this worker and returns once the shared server is healthy.
+        :param start: Starts the server and blocks until it is ready (raises on failure).
+                      Only called in the worker that ends up owning the server.
+        :return: Whatever `start` returned in the owner (must be JSON serializable), e.g. the server's endpoint.
+        """
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.lock_path):
+            state = self._read_state()
+            if state is not None:
+                self._drop_dead_workers(state)
+                if not state["workers"]:
+                    logger.info(f"♻️ [{self.worker_id}] Discarding the {state['status']} state of a previous session")
+                    state = None
+            if state is None:
+                state = {"status": "starting", "owner": self.worker_id, "workers": {}}
+                self.is_owner = True
+            state["workers"][self.worker_id] = os.getpid()
+            self._write_state(state)
+
+        if self.is_owner:
+            try:
+                info = start()
+            except Exception:
+                self._update_status("failed")
+                raise
+            self._update_status("ready", info)
+            return info
+
+        logger.info(f"⏳ [{self.worker_id}] Waiting for the server started by {state['owner']}...")
+        try:
+            return self._wait_until_ready(state["owner"])
+        except Exception:
+            # Don't keep the owner waiting for a worker that will never release the server
+            self._unregister()
+            raise
+
+    def _wait_until_ready(self, owner: str):
+        deadline = time.monotonic() + self.start_timeout
+        while True:
+            state = self._locked_state()
+            status = state["status"]
+            if status == "ready":
+                break
+            if status == "failed":
+                raise RuntimeError(f"❌ Server owned by {owner} failed to start")
+            owner_pid = state["workers"].get(owner)
+            if owner_pid is None or not pid_alive(owner_pid):
+                raise RuntimeError(f"❌ Worker {owner} exited before its server was ready")
+            if time.monotonic() >= deadline:
+                raise RuntimeError(f"❌ Timed out waiting for the server owned by {owner}")
+            time.sleep(0.1)
+        if self.url and not wait_for_server(self.url, timeout=10):
+            raise RuntimeError(f"❌ Server at {self.url} was reported ready but is not responding")
+        return state.get("info")
+
+    def _unregister(self):
+        with file_lock(self.lock_path):
+            state = self._read_state()
+            state["workers"].pop(self.worker_id, None)
+            self._write_state(state)
+
+    def release(self, stop: Callable[[], None]):
+        """
+        Unregisters this worker. The owner waits for every other worker to finish before calling `stop`.
+        """
+        self._unregister()
+        if not self.is_owner:
+            return
+
+        deadline = time.monotonic() + self.stop_timeout
+        while self._remaining_workers():
+            if time.monotonic() >= deadline:
+                logger.error(f"❌ Workers still running after {self.stop_timeout:.0f}s, stopping the server anyway")
+                break
+            time.sleep(0.2)
+        stop()
+        with file_lock(self.lock_path):
+            self.state_path.unlink(missing_ok=True)
+
+    def _remaining_workers(self) -> dict:
+        with file_lock(self.lock_path):
+            state = self._read_state()
+            dead = self._drop_dead_workers(state)
+            if dead:
+                logger.info(f"💀 [{self.worker_id}] Workers {', '.join(dead)} are gone, not waiting for them")
+                self._write_state(state)
+        return state["workers"]
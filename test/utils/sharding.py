@@ -0,0 +1,38 @@
+"""
+Splits the collected tests across CI machines (--shard i/n).
+
+Every machine collects the same tests and reads the same duration history, and the split only depends on
+those, so the shards are disjoint and together cover every test without any coordination between machines.
+"""
+import heapq
+from utils.duration_history import DurationEstimates
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """
+    :param value: "i/n" with 1 <= i <= n, e.g. "2/4".
+    :return: (i, n)
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}', expected i/n, e.g. 1/4")
+    if not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{value}', i must be between 1 and n")
+    return index, count
+
+
+def assign_shards(nodeids: list[str], count: int, estimates: DurationEstimates) -> dict[str, int]:
+    """
+    Longest-first greedy partition: each test, most expensive first, goes to the shard with the least
+    expected time so far. Ties are broken by node id and shard number, so the result is deterministic.
+    :return: Map of node id to its shard number (1-based).
+    """
+    loads = [(0.0, shard) for shard in range(1, count + 1)]
+    heapq.heapify(loads)
+    assignment = {}
+    for nodeid in sorted(nodeids, key=lambda n: (-estimates.estimate(n), n)):
+        load, shard = heapq.heappop(loads)
+        assignment[nodeid] = shard
+        heapq.heappush(loads, (load + estimates.estimate(nodeid), shard))
+    return assignment
@@ -0,0 +1,220 @@
+import json
+import math
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from functools import partial
+from itertools import islice
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+from utils.logger import logger
+
+CLIENT_DIR = Path(__file__).resolve().parent.parent.parent / "client"
+REQUIRED_FIELDS = ("userId", "type", "videoTime", "timestamp")
+EVENT_BUFFER_SIZE = 10000
+MAX_WAIT_MS = 30000
+MAX_BATCH_SIZE = 100
+
+
+def validate_event(event) -> str | None:
+    """
+    Applies the same rules as validateEvent() in server/server.js.
+    :return: An error message, or None when the event is valid.
+    """
+    if not isinstance(event, dict):
+        return "Event must be a JSON object"
+    missing = [field for field in REQUIRED_FIELDS if field not in event]
+    if missing:
+        return f"Missing required fields: {', '.join(missing)}"
+    for field in ("userId", "type", "timestamp"):
+        if not isinstance(event[field], str) or not event[field]:
+            return f"'{field}' must be a non-empty string"
+    video_time = event["videoTime"]
+    if isinstance(video_time, bool) or not isinstance(video_time, (int, float)) \
+            or not math.isfinite(video_time) or video_time < 0:
+        return "'videoTime' must be a non-negative number"
+    try:
+        datetime.fromisoformat(event["timestamp"].replace("Z", "+00:00"))
+    except ValueError:
+        return "'timestamp' must be an ISO-8601 date"
+    return None
+
+
+def _now_iso() -> str:
+    """Same format as Date.prototype.toISOString() in the node server."""
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+class EventSink:
+    """Same ring buffer and cursor semantics as server/eventSink.js."""
+
+    def __init__(self, capacity: int = EVENT_BUFFER_SIZE, capture_path: Path | None = None):
+        self.capacity = capacity
+        self._records = deque(maxlen=capacity)
+        self._next_seq = 1
+        self._changed = threading.Condition()
+        # Like EVENT_CAPTURE_PATH in the node server: buffered JSONL log of every ingested event
+        self._capture = None
+        if capture_path:
+            Path(capture_path).parent.mkdir(parents=True, exist_ok=True)
+            self._capture = open(capture_path, "a", encoding="utf-8", buffering=1 << 20)
+
+    def push(self, event: dict) -> dict:
+        with self._changed:
+            record = {**event, "seq": self._next_seq, "receivedAt": _now_iso()}
+            self._next_seq += 1
+            self._records.append(record)
+            if self._capture:
+                self._capture.write(json.dumps(record) + "\n")
+            self._changed.notify_all()
+        return record
+
+    def close(self):
+        if self._capture:
+            self._capture.close()
+
+    def query(self, user_id=None, event_type=None, since=0, limit=None) -> dict:
+        with self._changed:
+            oldest_seq = max(1, self._next_seq - self.capacity)
+            start = max(since + 1 - oldest_seq, 0)
+            events = []
+            for record in islice(self._records, start, None):
+                if limit is not None and len(events) >= limit:
+                    break
+                if (user_id is None or record["userId"] == user_id) and \
+                        (event_type is None or record["type"] == event_type):
+                    events.append(record)
+            limited = limit is not None and events and len(events) >= limit
+            return {
+                "events": events,
+                "cursor": events[-1]["seq"] if limited else self._next_seq - 1,
+                "truncated": since + 1 < oldest_seq,
+            }
+
+    def wait_for(self, wait_ms: float, **filters) -> dict:
+        deadline = time.monotonic() + wait_ms / 1000
+        with self._changed:
+            while True:
+                result = self.query(**filters)
+                remaining = deadline - time.monotonic()
+                if result["events"] or remaining <= 0:
+                    return result
+                self._changed.wait(remaining)
+
+
+class _EventRequestHandler(SimpleHTTPRequestHandler):
+    server: "_StubHTTPServer"
+    protocol_version = "HTTP/1.1"  # keep-alive, like express
+
+    def log_message(self, format, *args):
+        logger.debug(f"stub server: {format % args}")
+
+    def _send_json(self, status: int, body: dict):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path != "/api/events":
+            super().do_GET()
+            return
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        try:
+            since = int(params.get("since", 0))
+            limit = int(params["limit"]) if "limit" in params else None
+            wait = min(float(params.get("wait", 0)), MAX_WAIT_MS)
+            if since < 0 or wait < 0 or (limit is not None and limit < 0):
+                raise ValueError
+        except ValueError:
+            self._send_json(400, {"error": "'since', 'limit' and 'wait' must be non-negative numbers"})
+            return
+        self._send_json(200, self.server.sink.wait_for(
+            wait, user_id=params.get("userId"), event_type=params.get("type"), since=since, limit=limit
+        ))
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        if path not in ("/api/event", "/api/events"):
+            self._send_json(404, {"error": "Not found"})
+            return
+        try:
+            body = self._read_json()
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            self._send_json(400, {"error": f"Malformed JSON: {e}"})
+            return
+
+        if path == "/api/events":
+            self._ingest_batch(body)
+            return
+
+        error = validate_event(body)
+        if error:
+            self._send_json(400, {"error": error})
+            return
+
+        logger.debug(f"📩 Event received: {body}")
+        record = self.server.sink.push(body)
+        self._send_json(200, {"ok": True, "seq": record["seq"]})
+
+    def _ingest_batch(self, body):
+        events = body.get("events") if isinstance(body, dict) else None
+        if not isinstance(events, list) or not events:
+            self._send_json(400, {"error": "'events' must be a non-empty array"})
+            return
+        if len(events) > MAX_BATCH_SIZE:
+            self._send_json(413, {"error": f"At most {MAX_BATCH_SIZE} events per batch"})
+            return
+        errors = [{"index": index, "error": error}
+                  for index, error in ((index, validate_event(event)) for index, event in enumerate(events)) if error]
+        if errors:
+            self._send_json(400, {"error": "Invalid events in batch", "errors": errors})
+            return
+
+        logger.debug(f"📦 Batch of {len(events)} events received")
+        seqs = [self.server.sink.push(event)["seq"] for event in events]
+        self._send_json(200, {"ok": True, "accepted": len(events), "seqs": seqs})
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    sink: EventSink
+
+
+class StubEventServer:
+    """
+    In-process stand-in for server/server.js, serving the client page, POST /api/event,
+    the POST /api/events bulk endpoint and the GET /api/events query endpoint on an ephemeral port. It starts in milliseconds, so API-only runs don't need Docker.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, client_dir: Path = CLIENT_DIR,
+                 capture_path: Path | None = None):
+        handler = partial(_EventRequestHandler, directory=str(client_dir))
+        self._httpd = _StubHTTPServer((host, port), handler)
+        self._httpd.sink = self.sink = EventSink(capture_path=capture_path)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="stub-event-server", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self._thread.start()
+        logger.info(f"🧪 Stub event server listening at {self.url}")
+        return self.url
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+        self.sink.close()
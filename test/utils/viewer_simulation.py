@@ -0,0 +1,313 @@
+"""
+End-to-end load from real browser pages. Every simulated viewer gets its own context and page in one browser,
+runs the client from client/index.html as is, and plays, pauses, seeks and scrolls through VideoPage on its own
+random schedule. The server's records tell how many of the sent events arrived and how long each took
+(receivedAt minus the client's timestamp), so the client's batching and throttling are part of the numbers.
+
+Each viewer reports as its own userId (viewer-1, viewer-2, ...), which keeps its events apart from other
+tests' events on the same server. To find how many viewers one server sustains, step the viewer count up:
+
+    python test/utils/viewer_simulation.py --url http://localhost:3000 --viewers 5,10,20,40 --duration 30
+"""
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable
+from playwright.sync_api import BrowserContext, Error as PlaywrightError
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pages.video_page import VideoPage
+from utils.event_collector import EventCollector
+from utils.event_sink_client import EventSinkClient
+from utils.load_generator import percentile
+from utils.logger import logger
+
+# The literal in client/index.html every page reports as; each viewer's copy of the page gets its own id
+CLIENT_USER_ID = "'user-123'"
+VIEWER_ACTIONS = ("play", "pause", "seek", "scroll")
+ACTION_WEIGHTS = (3, 2, 2, 3)
+QUERY_PAGE_SIZE = 1000
+
+
+@dataclass
+class ViewerSimulationConfig:
+    """
+    :param viewers: Concurrent viewers, each a context with one page.
+    :param duration: Seconds the viewers act after all of them loaded the page.
+    :param action_interval: Mean seconds between two actions of one viewer (exponentially distributed).
+    :param settle_timeout: Seconds to wait for the last sent events to arrive after the run.
+    :param max_p95_ms / max_p99_ms / min_delivery_ratio: Budgets checked by ViewerSimulationResult.
+    """
+    viewers: int = 5
+    duration: float = 10.0
+    action_interval: float = 1.0
+    settle_timeout: float = 5.0
+    max_p95_ms: float = 1000.0
+    max_p99_ms: float = 2000.0
+    min_delivery_ratio: float = 0.99
+    seed: int = 0
+
+    @classmethod
+    def from_env(cls) -> "ViewerSimulationConfig":
+        """Overrides the defaults with E2E_LOAD_VIEWERS, E2E_LOAD_DURATION, E2E_LOAD_MAX_P95_MS, ..."""
+        overrides = {}
+        for name, default in vars(cls()).items():
+            value = os.environ.get(f"E2E_LOAD_{name.upper()}")
+            if value is not None:
+                overrides[name] = type(default)(value)
+        return cls(**overrides)
+
+
+@dataclass
+class ViewerSimulationResult:
+    config: ViewerSimulationConfig
+    elapsed: float = 0.0
+    actions: int = 0
+    action_errors: int = 0
+    sent: int = 0
+    ingested: int = 0
+    failed_requests: int = 0
+    truncated: bool = False
+    latencies_ms: list[float] = field(default_factory=list)
+    # How late the actions ran compared to their schedule; high values mean the driver, not the server, is the limit
+    schedule_lag_ms: list[float] = field(default_factory=list)
+
+    @property
+    def delivery_ratio(self) -> float:
+        return self.ingested / self.sent if self.sent else 1.0
+
+    @property
+    def event_rate(self) -> float:
+        return self.ingested / self.elapsed if self.elapsed else 0.0
+
+    def latency(self, p: float) -> float:
+        return percentile(sorted(self.latencies_ms), p)
+
+    def summary(self) -> str:
+        return (
+            f"viewers={self.config.viewers} actions={self.actions} (errors={self.action_errors}) "
+            f"events sent={self.sent} ingested={self.ingested} ({self.delivery_ratio:.2%}) "
+            f"failed requests={self.failed_requests} rate={self.event_rate:.1f}/s "
+            f"p50={self.latency(50):.0f}ms p95={self.latency(95):.0f}ms p99={self.latency(99):.0f}ms "
+            f"schedule lag p95={percentile(sorted(self.schedule_lag_ms), 95):.0f}ms"
+        )
+
+    def budget_violations(self) -> list[str]:
+        c = self.config
+        violations = []
+        if self.delivery_ratio < c.min_delivery_ratio:
+            violations.append(f"delivery {self.delivery_ratio:.2%} < {c.min_delivery_ratio:.2%}")
+        if self.latency(95) > c.max_p95_ms:
+            violations.append(f"p95 {self.latency(95):.0f}ms > {c.max_p95_ms:.0f}ms")
+        if self.latency(99) > c.max_p99_ms:
+            violations.append(f"p99 {self.latency(99):.0f}ms > {c.max_p99_ms:.0f}ms")
+        if self.truncated:
+            violations.append("the server's event buffer overflowed, events could not be counted")
+        return violations
+
+
+class Viewer:
+    """One simulated viewer: a context, its page and the events it sent."""
+
+    def __init__(self, number: int, context: BrowserContext, seed: int):
+        self.user_id = f"viewer-{number}"
+        self.context = context
+        self.page = context.new_page()
+        self.video = VideoPage(self.page)
+        self.collector = EventCollector(self.page)
+        self.rng = random.Random(seed)
+        self.failed_requests = 0
+        self.duration = 0.0
+
+    def _use_own_user_id(self, route):
+        response = route.fetch()
+        route.fulfill(response=response, body=response.text().replace(CLIENT_USER_ID, f"'{self.user_id}'", 1))
+
+    @staticmethod
+    def _is_event_request(request) -> bool:
+        return request.method == "POST" and "/api/event" in request.url
+
+    def _on_response(self, response):
+        if self._is_event_request(response.request) and response.status >= 400:
+            self.failed_requests += 1
+
+    def _on_request_failed(self, request):
+        if self._is_event_request(request):
+            self.failed_requests += 1
+
+    def open(self):
+        self.page.route("**/", self._use_own_user_id)
+        self.page.on("response", self._on_response)
+        self.page.on("requestfailed", self._on_request_failed)
+        self.video.navigate()
+        # userId is a top level const of the page script, visible to evaluate()
+        if self.page.evaluate("() => typeof userId === 'undefined' ? null : userId") != self.user_id:
+            raise RuntimeError(f"❌ Could not give the page its own user id, client/index.html no longer "
+                               f"declares userId = {CLIENT_USER_ID}")
+        self.duration = self.video.get_duration()
+
+    def act(self):
+        action = self.rng.choices(VIEWER_ACTIONS, ACTION_WEIGHTS)[0]
+        if action == "play":
+            self.video.play()
+        elif action == "pause":
+            self.video.pause()
+        elif action == "seek":
+            self.video.seek(round(self.rng.uniform(0, max(self.duration - 1, 0)), 2))
+        else:
+            self.video.scroll(self.rng.choice((-600, -300, 300, 600)))
+
+    def next_delay(self, interval: float) -> float:
+        return self.rng.expovariate(1 / interval)
+
+    def flush(self):
+        self.page.evaluate("() => window.eventTransport.flush()")
+
+    def close(self):
+        self.context.close()
+
+
+def _parse_iso(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _drain(sink: EventSinkClient, cursor: int, viewer_ids: set[str], result: ViewerSimulationResult) -> int:
+    """Counts the viewers' events ingested after `cursor` and records their latency, returns the new cursor."""
+    while True:
+        page = sink.query(since=cursor, limit=QUERY_PAGE_SIZE)
+        result.truncated |= page["truncated"]
+        for record in page["events"]:
+            if record.get("userId") in viewer_ids:
+                result.ingested += 1
+                latency = _parse_iso(record["receivedAt"]) - _parse_iso(record["timestamp"])
+                result.latencies_ms.append(latency.total_seconds() * 1000)
+        cursor = page["cursor"]
+        if len(page["events"]) < QUERY_PAGE_SIZE:
+            return cursor
+
+
+def run_viewer_simulation(new_context: Callable[..., BrowserContext], base_url: str,
+                          config: ViewerSimulationConfig, media_cache=None) -> ViewerSimulationResult:
+    """
+    Opens `config.viewers` pages, lets every viewer act on its own schedule for `config.duration` seconds
+    and then compares the events the pages sent with the events the server ingested.
+    :param new_context: Creates a browser context, e.g. browser.new_context; called with base_url.
+    :param media_cache: Optional MediaCache installed in every context, so the clip isn't downloaded N times.
+    """
+    if config.viewers < 1:
+        raise ValueError("At least one viewer is needed")
+    sink = EventSinkClient(base_url)
+    result = ViewerSimulationResult(config=config)
+    viewers = []
+    try:
+        for number in range(1, config.viewers + 1):
+            context = new_context(base_url=base_url)
+            if media_cache is not None:
+                media_cache.install(context)
+            viewer = Viewer(number, context, seed=config.seed * 100003 + number)
+            viewers.append(viewer)
+            viewer.open()
+        _act(viewers, sink, config, result)
+    finally:
+        for viewer in viewers:
+            try:
+                viewer.close()
+            except PlaywrightError:
+                pass
+    return result
+
+
+def _act(viewers: list[Viewer], sink: EventSinkClient, config: ViewerSimulationConfig,
+         result: ViewerSimulationResult):
+    with ExitStack() as collectors:
+        for viewer in viewers:
+            collectors.enter_context(viewer.collector)
+        logger.info(f"👥 {len(viewers)} viewers loaded the player, acting for {config.duration:.0f}s")
+
+        cursor = sink.cursor()
+        start = time.monotonic()
+        end = start + config.duration
+        # Single-threaded scheduler over all pages: the viewer whose next action is due first goes next
+        schedule = [(start + viewer.next_delay(config.action_interval), index) for index, viewer in enumerate(viewers)]
+        heapq.heapify(schedule)
+        while schedule:
+            due, index = heapq.heappop(schedule)
+            if due >= end:
+                continue
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            result.schedule_lag_ms.append((time.monotonic() - due) * 1000)
+            viewer = viewers[index]
+            result.actions += 1
+            try:
+                viewer.act()
+            except (PlaywrightError, AssertionError) as e:
+                result.action_errors += 1
+                logger.info(f"⚠️ {viewer.user_id} action failed: {e}")
+            heapq.heappush(schedule, (due + viewer.next_delay(config.action_interval), index))
+        result.elapsed = time.monotonic() - start
+
+        # Let throttled scrolls fire, then send what is still queued in the pages and wait for it to arrive
+        driver_page = viewers[0].page
+        driver_page.wait_for_timeout(driver_page.evaluate("() => window.eventTransport.config.scrollThrottleMs") + 50)
+        for viewer in viewers:
+            viewer.flush()
+        viewer_ids = {viewer.user_id for viewer in viewers}
+        deadline = time.monotonic() + config.settle_timeout
+        while True:
+            # Playwright hands out the request events of all pages while we are in one of its calls
+            driver_page.wait_for_timeout(100)
+            result.sent = sum(len(viewer.collector.events) for viewer in viewers)
+            cursor = _drain(sink, cursor, viewer_ids, result)
+            if result.ingested == result.sent or time.monotonic() >= deadline:
+                break
+        result.failed_requests = sum(viewer.failed_requests for viewer in viewers)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Simulate concurrent viewers of the player against a server.")
+    parser.add_argument("--url", default="http://localhost:3000", help="Base URL of the server")
+    parser.add_argument("--viewers", default="5,10,20",
+                        help="Comma separated viewer counts, run in order until one exceeds the budgets")
+    parser.add_argument("--duration", type=float, default=ViewerSimulationConfig.duration)
+    parser.add_argument("--action-interval", type=float, default=ViewerSimulationConfig.action_interval)
+    parser.add_argument("--browser", default="firefox", choices=("chromium", "firefox", "webkit"))
+    parser.add_argument("--remote-media", action="store_true",
+                        help="Load the clip from its original URL instead of test/fixtures/media")
+    args = parser.parse_args(argv)
+
+    from playwright.sync_api import sync_playwright
+    from utils.media_route import MediaCache
+
+    media_cache = None if args.remote_media else MediaCache()
+    sustained = 0
+    with sync_playwright() as p:
+        browser = getattr(p, args.browser).launch(headless=True)
+        try:
+            for viewers in (int(count) for count in args.viewers.split(",")):
+                config = ViewerSimulationConfig.from_env()
+                config.viewers, config.duration, config.action_interval = viewers, args.duration, args.action_interval
+                result = run_viewer_simulation(browser.new_context, args.url, config, media_cache)
+                violations = result.budget_violations()
+                logger.info(f"{'❌' if violations else '✅'} {result.summary()}")
+                if violations:
+                    logger.info(f"Budgets exceeded at {viewers} viewers: {'; '.join(violations)}")
+                    break
+                sustained = viewers
+        finally:
+            browser.close()
+    logger.info(f"📊 The server sustained {sustained} concurrent viewers within the budgets")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())